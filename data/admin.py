@@ -4,6 +4,7 @@ from .models import (
     PropertyListing,
     Booking,
     FavoriteProperty,
+    NightlyRate,
     Review,
 )
 
@@ -51,6 +52,13 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ("is_active", "check_in_date", "check_out_date", "created_at")
 
 
+@admin.register(NightlyRate)
+class NightlyRateAdmin(admin.ModelAdmin):
+    list_display = ("accommodation", "date", "price", "label")
+    search_fields = ("accommodation__title", "label")
+    list_filter = ("date",)
+
+
 @admin.register(FavoriteProperty)
 class FavoritePropertyAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,768 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import close_old_connections, connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+SCENARIOS = {}
+
+FAST_PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def scenario(name, description):
+    """Registra um cenário de benchmark executável via `manage.py benchmark`."""
+
+    def decorator(func):
+        SCENARIOS[name] = (func, description)
+        return func
+
+    return decorator
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Cria um banco de testes temporário em arquivo (não em memória), para que
+    o custo de travas e fsync do SQLite apareça nas medições. O rate limiting
+    fica desligado, já que todas as requisições partem do mesmo IP.
+    """
+    alias = "default"
+    test_settings = settings.DATABASES[alias].setdefault("TEST", {})
+    previous_test_name = test_settings.get("NAME")
+    tmpdir = tempfile.mkdtemp(prefix="quickhost-bench-")
+    if connection.vendor == "sqlite":
+        test_settings["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    rate_limits = {**settings.RATE_LIMITS, "ENABLED": False}
+    try:
+        with override_settings(RATE_LIMITS=rate_limits):
+            yield connection
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = previous_test_name
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, wall_time):
+    """Resume latências (em segundos) em milissegundos e vazão."""
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+class WriteCounter:
+    """`execute_wrapper` que conta instruções de escrita emitidas."""
+
+    WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+    def __init__(self):
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(self.WRITE_PREFIXES):
+            with self._lock:
+                self.writes += 1
+        return execute(sql, params, many, context)
+
+
+def run_concurrently(func, total, concurrency):
+    """
+    Executa `func` `total` vezes em `concurrency` threads, cada uma com sua
+    própria conexão, e retorna as latências individuais e o tempo total.
+    Entre chamadas as conexões seguem o ciclo de uma requisição
+    (`close_old_connections`), respeitando CONN_MAX_AGE.
+    """
+    latencies = []
+    lock = threading.Lock()
+    sequence = iter(range(total))
+    errors = []
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    if next(sequence, None) is None:
+                        return
+                start = time.perf_counter()
+                try:
+                    func()
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    return
+                finally:
+                    close_old_connections()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return latencies, wall_time
+
+
+@scenario("login", "Logins concorrentes em /token/: latência, vazão e escritas.")
+def bench_login(options):
+    User = get_user_model()
+    total = options["requests"]
+    concurrency = options["concurrency"]
+    users = max(1, options.get("users") or concurrency)
+    password = "Benchmark123"
+
+    with override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS):
+        emails = []
+        for index in range(users):
+            email = f"bench{index}@quickhost.test"
+            User.objects.create_user(
+                email=email, username=f"bench{index}", password=password
+            )
+            emails.append(email)
+
+        counter = WriteCounter()
+        local = threading.local()
+        sequence = iter(range(total))
+        sequence_lock = threading.Lock()
+
+        def login():
+            if not hasattr(local, "client"):
+                local.client = Client()
+            with sequence_lock:
+                email = emails[next(sequence) % users]
+            with connection.execute_wrapper(counter):
+                response = local.client.post(
+                    "/token/",
+                    {"email": email, "password": password},
+                    content_type="application/json",
+                )
+            if response.status_code != 200:
+                raise RuntimeError(f"Login falhou: {response.status_code}")
+
+        latencies, wall_time = run_concurrently(login, total, concurrency)
+
+    result = summarize(latencies, wall_time)
+    result["concurrency"] = concurrency
+    result["users"] = users
+    result["writes"] = counter.writes
+    result["writes_per_login"] = round(counter.writes / total, 3) if total else 0
+    return result
+
+
+@scenario("ratelimit", "Custo por verificação dos throttles de balde de fichas.")
+def bench_ratelimit(options):
+    from rest_framework.test import APIRequestFactory
+    from quickhost.api import throttling
+
+    total = options["requests"] * 50
+    factory = APIRequestFactory()
+    requests = [
+        factory.post("/token/", REMOTE_ADDR=f"10.0.{i // 256}.{i % 256}")
+        for i in range(1024)
+    ]
+
+    class View:
+        throttle_scope = "login"
+
+    result = {}
+    for backend in ("local", "cache"):
+        rate_limits = {
+            **settings.RATE_LIMITS,
+            "ENABLED": True,
+            "BACKEND": backend,
+            "SCOPES": {"login": "1000000/min"},
+        }
+        with override_settings(RATE_LIMITS=rate_limits):
+            throttle = throttling.IPTokenBucketThrottle()
+            throttling.get_backend().reset()
+            start = time.perf_counter()
+            for index in range(total):
+                throttle.allow_request(requests[index % 1024], View)
+            elapsed = time.perf_counter() - start
+        result[backend] = {
+            "checks": total,
+            "us_per_check": round(elapsed / total * 1_000_000, 3),
+        }
+    return result
+
+
+def seed_listings(count, reviews_per_listing=0):
+    """Cria `count` acomodações (e avaliações) mínimas para os cenários."""
+    from data.models import PropertyListing, Review
+
+    User = get_user_model()
+    host = User.objects.create_user(
+        email="host@quickhost.test", username="host", password=None
+    )
+    listings = PropertyListing.objects.bulk_create(
+        PropertyListing(
+            creator=host,
+            title=f"Acomodação {index}",
+            description="Descrição de benchmark.",
+            city="Florianópolis",
+            uf="SC",
+            postal_code="88000-000",
+            price=Decimal("250.00"),
+            price_per_night=Decimal("232.50"),
+        )
+        for index in range(count)
+    )
+    Review.objects.bulk_create(
+        Review(
+            accommodation=listing,
+            user_comment=host,
+            rating=1 + index % 5,
+            comment="Ótima estadia. " * 10,
+        )
+        for listing in listings
+        for index in range(reviews_per_listing)
+    )
+    return listings
+
+
+def run_async_concurrently(make_request, total, concurrency):
+    """Equivalente assíncrono de `run_concurrently`, via asyncio.gather."""
+    latencies = []
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def worker(index):
+            async with semaphore:
+                start = time.perf_counter()
+                await make_request(index)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker(index) for index in range(total)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - started
+
+
+@scenario("async_reads", "Leituras via WSGI (threads) versus views ASGI assíncronas.")
+def bench_async_reads(options):
+    from django.test import AsyncClient
+
+    total = options["requests"]
+    concurrency = options["concurrency"]
+    listings = seed_listings(50, reviews_per_listing=5)
+    ids = [str(listing.id_accommodation) for listing in listings]
+
+    endpoints = {
+        "list": ("/accommodations/", "/async/accommodations/"),
+        "search": (
+            "/accommodations/search/?city=Florianópolis",
+            "/async/accommodations/search/?city=Florianópolis",
+        ),
+        "detail": ("/accommodations/{id}/", "/async/accommodations/{id}/"),
+        "reviews": (
+            "/reviews/?accommodation_id={id}",
+            "/async/reviews/?accommodation_id={id}",
+        ),
+    }
+
+    result = {}
+    for name, (sync_path, async_path) in endpoints.items():
+        local = threading.local()
+        counter = iter(range(total))
+        counter_lock = threading.Lock()
+
+        def sync_request():
+            if not hasattr(local, "client"):
+                local.client = Client()
+            with counter_lock:
+                index = next(counter)
+            path = sync_path.format(id=ids[index % len(ids)])
+            response = local.client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: {response.status_code}")
+
+        async_client = AsyncClient()
+
+        async def async_request(index):
+            path = async_path.format(id=ids[index % len(ids)])
+            response = await async_client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: {response.status_code}")
+
+        result[name] = {
+            "wsgi": summarize(*run_concurrently(sync_request, total, concurrency)),
+            "asgi": summarize(
+                *run_async_concurrently(async_request, total, concurrency)
+            ),
+        }
+    return result
+
+
+# Cadeia anterior à separação entre API e admin (sem o UUIDMiddleware,
+# removido junto com a rota que ele validava).
+DEFAULT_MIDDLEWARE = {
+    "quickhost.api.middleware.ApiExemptSessionMiddleware": (
+        "django.contrib.sessions.middleware.SessionMiddleware"
+    ),
+    "quickhost.api.middleware.ApiExemptCsrfViewMiddleware": (
+        "django.middleware.csrf.CsrfViewMiddleware"
+    ),
+    "quickhost.api.middleware.ApiExemptAuthenticationMiddleware": (
+        "django.contrib.auth.middleware.AuthenticationMiddleware"
+    ),
+    "quickhost.api.middleware.ApiExemptMessageMiddleware": (
+        "django.contrib.messages.middleware.MessageMiddleware"
+    ),
+}
+
+
+@scenario(
+    "middleware",
+    "Custo da cadeia de middlewares por requisição, na API e no admin.",
+)
+def bench_middleware(options):
+    from django.test import AsyncClient
+
+    total = options["requests"]
+    chains = {
+        "padrao": [DEFAULT_MIDDLEWARE.get(path, path) for path in settings.MIDDLEWARE],
+        "api_enxuta": list(settings.MIDDLEWARE),
+    }
+    # A raiz do router do DRF não consulta o banco: sobra o custo da cadeia.
+    paths = {"api": "/", "admin": "/admin/login/"}
+
+    result = {}
+    for chain, middleware in chains.items():
+        result[chain] = {}
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            async_client = AsyncClient()
+            for name, path in paths.items():
+
+                def sync_request():
+                    response = client.get(path)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{path}: {response.status_code}")
+
+                async def async_request(index):
+                    response = await async_client.get(path)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{path}: {response.status_code}")
+
+                sync_request()
+                result[chain][name] = {
+                    "wsgi": summarize(*run_concurrently(sync_request, total, 1)),
+                    "asgi": summarize(*run_async_concurrently(async_request, total, 1)),
+                }
+    return result
+
+
+@scenario(
+    "sqlite_mixed", "Carga mista leitura/escrita nos perfis SQLite basic e tuned."
+)
+def bench_sqlite_mixed(options):
+    from data.models import PropertyListing, Review
+    from quickhost.database import sqlite_database
+
+    if connection.vendor != "sqlite":
+        return {"skipped": "banco padrão não é SQLite"}
+
+    total = options["requests"]
+    concurrency = options["concurrency"]
+    listings = seed_listings(20, reviews_per_listing=2)
+    ids = [listing.id_accommodation for listing in listings]
+    author_id = listings[0].creator_id
+    write_every = 5
+
+    profiles = {
+        "basic": {
+            **sqlite_database("", {"DB_PROFILE": "basic"}),
+            "OPTIONS": {
+                "init_command": "PRAGMA journal_mode = DELETE",
+            },
+        },
+        "tuned": sqlite_database(
+            "", {"DB_PROFILE": "tuned", "SQLITE_JOURNAL_MODE": "WAL"}
+        ),
+    }
+
+    result = {}
+    settings_dict = connection.settings_dict
+    original = {key: settings_dict.get(key) for key in ("OPTIONS", "CONN_MAX_AGE")}
+    try:
+        for name, profile in profiles.items():
+            connections.close_all()
+            settings_dict["OPTIONS"] = profile.get("OPTIONS", {})
+            settings_dict["CONN_MAX_AGE"] = profile.get("CONN_MAX_AGE", 0)
+            sequence = iter(range(total))
+            sequence_lock = threading.Lock()
+
+            def operation():
+                with sequence_lock:
+                    index = next(sequence)
+                accommodation_id = ids[index % len(ids)]
+                if index % write_every == 0:
+                    Review.objects.create(
+                        accommodation_id=accommodation_id,
+                        user_comment_id=author_id,
+                        rating=4,
+                        comment="Escrita de benchmark. " * 6,
+                    )
+                else:
+                    PropertyListing.objects.get(id_accommodation=accommodation_id)
+                    list(Review.objects.filter(accommodation_id=accommodation_id))
+
+            result[name] = summarize(*run_concurrently(operation, total, concurrency))
+            result[name]["write_ratio"] = round(1 / write_every, 2)
+    finally:
+        connections.close_all()
+        settings_dict.update(original)
+    return result
+
+
+@scenario(
+    "quotes", "Cotações em lote com calendário de diárias (janelas de 30 e 365 noites)."
+)
+def bench_quotes(options):
+    import json
+
+    from data.models import NightlyRate
+    from quickhost.api import pricing
+
+    listings = seed_listings(200)
+    ids = [listing.id_accommodation for listing in listings]
+    start = date(2030, 1, 1)
+    # Fins de semana (sexta e sábado) com diária diferenciada durante um ano.
+    weekends = [
+        start + timedelta(days=offset)
+        for offset in range(366)
+        if (start + timedelta(days=offset)).weekday() in (4, 5)
+    ]
+    NightlyRate.objects.bulk_create(
+        (
+            NightlyRate(accommodation_id=pk, date=night, price=Decimal("320.00"))
+            for pk in ids
+            for night in weekends
+        ),
+        batch_size=2000,
+    )
+    client = Client()
+
+    result = {"listings": len(ids), "weekend_rates": len(ids) * len(weekends)}
+    for nights in (30, 365):
+        check_out = start + timedelta(days=nights)
+        body = json.dumps(
+            {
+                "accommodations": [str(pk) for pk in ids],
+                "check_in_date": start.isoformat(),
+                "check_out_date": check_out.isoformat(),
+            }
+        )
+
+        def request():
+            response = client.post("/quotes/", body, content_type="application/json")
+            if response.status_code != 200:
+                raise RuntimeError(f"/quotes/: {response.status_code}")
+
+        pricing.calendar_cache().clear()
+        started = time.perf_counter()
+        pricing.load_rate_calendar(ids, start, check_out)
+        cold = time.perf_counter()
+        calendar = pricing.load_rate_calendar(ids, start, check_out)
+        warm = time.perf_counter()
+        rows = [calendar.index[pk] for pk in ids]
+        calendar.quote(rows, [start] * len(ids), [check_out] * len(ids))
+        quoted = time.perf_counter()
+
+        # Referência: soma noite a noite em Decimal, como seria sem o prefix sum.
+        rates = {
+            (pk, night): price
+            for pk, night, price in NightlyRate.objects.filter(
+                date__gte=start, date__lt=check_out
+            ).values_list("accommodation_id", "date", "price")
+        }
+        naive_started = time.perf_counter()
+        for pk in ids:
+            subtotal = sum(
+                rates.get((pk, start + timedelta(days=day)), Decimal("250.00"))
+                for day in range(nights)
+            )
+            (subtotal * pricing.tax_rate(nights)).quantize(pricing.CENT)
+        naive = time.perf_counter() - naive_started
+
+        result[f"{nights}_nights"] = {
+            "endpoint": summarize(*run_concurrently(request, options["requests"], 1)),
+            "calendar_cold_ms": round((cold - started) * 1000, 3),
+            "calendar_cached_ms": round((warm - cold) * 1000, 3),
+            "engine_quote_ms": round((quoted - warm) * 1000, 3),
+            "decimal_loop_ms": round(naive * 1000, 3),
+        }
+    return result
+
+
+# Tamanhos de base para o cenário `endpoints` (quantidades do seed_data).
+DATASETS = {
+    "small": {
+        "users": 200,
+        "listings": 50,
+        "bookings": 2000,
+        "reviews": 250,
+        "favorites": 500,
+    },
+    "medium": {
+        "users": 2000,
+        "listings": 500,
+        "bookings": 20000,
+        "reviews": 2500,
+        "favorites": 5000,
+    },
+    "large": {
+        "users": 20000,
+        "listings": 5000,
+        "bookings": 200000,
+        "reviews": 25000,
+        "favorites": 50000,
+    },
+}
+
+# Métricas comparadas com o baseline. Latência e memória toleram a variação
+# configurada em --threshold; a quantidade de consultas é determinística.
+# p95/p99 ficam registrados, mas com poucas amostras oscilam demais para
+# reprovar uma execução.
+LATENCY_METRICS = ("p50_ms",)
+LATENCY_NOISE_MS = 1.0
+MEMORY_METRICS = ("peak_memory_kib",)
+EXACT_METRICS = ("queries_per_request",)
+
+
+class QueryCounter:
+    """`execute_wrapper` que conta todas as instruções executadas."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def measure_endpoint(request, total, memory_samples=5, warmup=3):
+    """
+    Executa `request(índice)` sequencialmente e retorna latências, consultas
+    por requisição e o pico de memória alocada (tracemalloc) de uma requisição.
+
+    O tracemalloc deixa a execução bem mais lenta, então o pico é medido em
+    algumas requisições separadas, fora da amostra de latência.
+    """
+    import tracemalloc
+
+    for index in range(warmup):
+        request(index)
+
+    counter = QueryCounter()
+    latencies = []
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        for index in range(warmup, warmup + total):
+            start = time.perf_counter()
+            request(index)
+            latencies.append(time.perf_counter() - start)
+    wall_time = time.perf_counter() - started
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for index in range(warmup + total, warmup + total + memory_samples):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            request(index)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(latencies, wall_time)
+    result["queries_per_request"] = round(counter.queries / total, 2) if total else 0
+    result["peak_memory_kib"] = round(peak / 1024, 1)
+    return result
+
+
+def endpoint_requests(client, auth_client, ids, user_id, email, password):
+    """Requisições do cenário `endpoints`, cada uma recebendo um índice único."""
+    comment = "Estadia tranquila, anfitrião atencioso e tudo conforme o anúncio. " * 2
+    first_night = date(2100, 1, 1)
+
+    def expect(response, status_code):
+        if response.status_code != status_code:
+            raise RuntimeError(
+                f"{response.request['PATH_INFO']}: {response.status_code}"
+            )
+
+    def listing(index):
+        return ids[index % len(ids)]
+
+    return {
+        "list": lambda index: expect(client.get("/accommodations/"), 200),
+        "retrieve": lambda index: expect(
+            client.get(f"/accommodations/{listing(index)}/"), 200
+        ),
+        "search": lambda index: expect(
+            client.get("/accommodations/search/", {"city": "São Paulo"}), 200
+        ),
+        "create_booking": lambda index: expect(
+            auth_client.post(
+                "/bookings/",
+                {
+                    "user_booking": user_id,
+                    "accommodation": listing(index),
+                    # Datas distantes e distintas, fora das reservas geradas.
+                    "check_in_date": str(first_night + timedelta(days=3 * index)),
+                    "check_out_date": str(first_night + timedelta(days=3 * index + 2)),
+                    "price": "250.00",
+                },
+                content_type="application/json",
+            ),
+            201,
+        ),
+        "create_review": lambda index: expect(
+            auth_client.post(
+                "/reviews/",
+                {
+                    "accommodation": listing(index),
+                    "user_comment": user_id,
+                    "rating": 4,
+                    "comment": comment,
+                },
+                content_type="application/json",
+            ),
+            201,
+        ),
+        "login": lambda index: expect(
+            client.post(
+                "/token/",
+                {"email": email, "password": password},
+                content_type="application/json",
+            ),
+            200,
+        ),
+        "favorites": lambda index: expect(auth_client.get("/favorites/"), 200),
+    }
+
+
+@scenario(
+    "endpoints",
+    "Endpoints principais em bases de vários tamanhos: latência, consultas e memória.",
+)
+def bench_endpoints(options):
+    from django.core.management import call_command
+
+    from data.models import PropertyListing, UserAccount
+    from data.seeding import seed_data
+
+    sizes = options.get("sizes") or ["small", "medium"]
+    unknown = [size for size in sizes if size not in DATASETS]
+    if unknown:
+        raise ValueError(f"Tamanhos desconhecidos: {', '.join(unknown)}")
+
+    password = "Benchmark123"
+    result = {}
+    with override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS):
+        for size in sizes:
+            call_command("flush", interactive=False, verbosity=0)
+            # Calendários e favoritos em cache do tamanho anterior mudariam a
+            # quantidade de consultas deste.
+            for cache in caches.all():
+                cache.clear()
+            started = time.perf_counter()
+            seed_data(**DATASETS[size], seed=38, password=password)
+            seeded = time.perf_counter() - started
+
+            ids = [
+                str(pk)
+                for pk in PropertyListing.objects.filter(is_active=True)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            ]
+            user_id, email = UserAccount.objects.order_by("pk").values_list(
+                "pk", "email"
+            )[0]
+            client = Client()
+            token = client.post(
+                "/token/",
+                {"email": email, "password": password},
+                content_type="application/json",
+            ).json()["tokens"]["access"]
+            auth_client = Client(headers={"Authorization": f"Bearer {token}"})
+
+            endpoints = endpoint_requests(
+                client, auth_client, ids, str(user_id), email, password
+            )
+            result[size] = {
+                "dataset": {**DATASETS[size], "seed_seconds": round(seeded, 2)},
+                **{
+                    name: measure_endpoint(request, options["requests"])
+                    for name, request in endpoints.items()
+                },
+            }
+    return result
+
+
+def find_regressions(baseline, current, threshold, path=()):
+    """
+    Compara resultados com o baseline e descreve cada métrica que piorou.
+
+    Latência e memória regridem quando crescem mais que `threshold` (fração,
+    ex.: 0.5); diferenças de latência abaixo de LATENCY_NOISE_MS são
+    ignoradas. Qualquer aumento na quantidade de consultas é uma regressão.
+    """
+    regressions = []
+    for key, value in current.items():
+        previous = baseline.get(key) if isinstance(baseline, dict) else None
+        if previous is None:
+            continue
+        name = ".".join(path + (key,))
+        if isinstance(value, dict):
+            regressions += find_regressions(previous, value, threshold, path + (key,))
+        elif key in EXACT_METRICS:
+            if value > previous:
+                regressions.append(f"{name}: {previous} -> {value}")
+        elif key in LATENCY_METRICS or key in MEMORY_METRICS:
+            limit = previous * (1 + threshold)
+            if key in LATENCY_METRICS:
+                limit = max(limit, previous + LATENCY_NOISE_MS)
+            if value > limit:
+                regressions.append(
+                    f"{name}: {previous} -> {value} "
+                    f"(+{(value / previous - 1) * 100 if previous else 100:.0f}%)"
+                )
+    return regressions
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from data.benchmarks import SCENARIOS, benchmark_database, find_regressions
+
+
+class Command(BaseCommand):
+    help = "Executa cenários de benchmark em um banco de testes temporário."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            help="Cenários a executar (padrão: todos). Use --list para ver os disponíveis.",
+        )
+        parser.add_argument("--list", action="store_true", help="Lista os cenários.")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--users", type=int, default=None)
+        parser.add_argument(
+            "--sizes",
+            type=lambda value: [size for size in value.split(",") if size],
+            default=None,
+            help="Tamanhos de base do cenário endpoints (ex.: small,medium,large).",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=None,
+            help="Arquivo JSON com resultados de referência para comparar.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Grava os resultados no --baseline em vez de comparar.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.5,
+            help="Piora relativa tolerada de latência e memória (padrão: 0.5).",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name, (_, description) in SCENARIOS.items():
+                self.stdout.write(f"{name}: {description}")
+            return
+
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Cenários desconhecidos: {', '.join(unknown)}")
+        baseline_path = options["baseline"]
+        if options["update_baseline"] and baseline_path is None:
+            raise CommandError("--update-baseline exige --baseline.")
+
+        results = {}
+        for name in names:
+            func, _ = SCENARIOS[name]
+            with benchmark_database():
+                try:
+                    results[name] = func(options)
+                except ValueError as exc:
+                    raise CommandError(str(exc))
+            self.stderr.write(f"{name}: concluído")
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+        if baseline_path is None:
+            return
+        baseline = (
+            json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        )
+        if options["update_baseline"]:
+            baseline.update(results)
+            baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+            self.stderr.write(f"Baseline atualizado em {baseline_path}.")
+            return
+
+        regressions = find_regressions(baseline, results, options["threshold"])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(f"Regressão: {regression}")
+            raise CommandError(
+                f"{len(regressions)} regressão(ões) acima do limite em relação a "
+                f"{baseline_path}."
+            )
+        self.stderr.write(f"Sem regressões em relação a {baseline_path}.")
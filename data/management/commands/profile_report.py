@@ -0,0 +1,75 @@
+import io
+import json
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quickhost.api.profiling import list_profiles, profile_paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra as funções mais custosas de um perfil gravado pelo ProfilingMiddleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "profile_id",
+            nargs="?",
+            help="Id do perfil (padrão: o mais recente). Use --list para ver os disponíveis.",
+        )
+        parser.add_argument("--list", action="store_true", help="Lista os perfis.")
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls"],
+        )
+        parser.add_argument(
+            "--filter",
+            default=None,
+            help="Restringe às funções cujo caminho contém este texto (ex.: quickhost).",
+        )
+        parser.add_argument("--directory", default=None)
+
+    def handle(self, *args, **options):
+        directory = options["directory"] or settings.PROFILING["DIRECTORY"]
+        profiles = list_profiles(directory)
+
+        if options["list"]:
+            for profile_id in reversed(profiles):
+                meta = self.read_meta(directory, profile_id)
+                self.stdout.write(
+                    f"{profile_id}: {meta.get('method')} {meta.get('path')} "
+                    f"{meta.get('status')} {meta.get('duration_ms')} ms, "
+                    f"{meta.get('query_count')} consultas ({meta.get('trigger')})"
+                )
+            return
+
+        if not profiles:
+            raise CommandError(f"Nenhum perfil em {directory}.")
+        profile_id = options["profile_id"] or profiles[-1]
+        if profile_id not in profiles:
+            raise CommandError(f"Perfil não encontrado: {profile_id}")
+
+        meta = self.read_meta(directory, profile_id)
+        for key, value in meta.items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write("")
+
+        output = io.StringIO()
+        stats = pstats.Stats(profile_paths(directory, profile_id)[0], stream=output)
+        stats.sort_stats(options["sort"])
+        restrictions = [options["filter"]] if options["filter"] else []
+        stats.print_stats(*restrictions, options["top"])
+        self.stdout.write(output.getvalue(), ending="")
+
+    def read_meta(self, directory, profile_id):
+        try:
+            with open(
+                profile_paths(directory, profile_id)[1], encoding="utf-8"
+            ) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
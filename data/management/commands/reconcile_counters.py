@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from quickhost.api import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara os contadores de popularidade das acomodações com as tabelas "
+        "de favoritos e reservas e corrige os desvios."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fields",
+            nargs="+",
+            choices=counters.COUNTERS,
+            default=list(counters.COUNTERS),
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Apenas lista os desvios."
+        )
+        parser.add_argument("--show", type=int, default=20)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        fields = options["fields"]
+        using = options["database"]
+        with transaction.atomic(using=using):
+            drift = counters.find_drift(fields, using=using)
+            for pk, values in list(drift.items())[: options["show"]]:
+                details = ", ".join(
+                    f"{field} {stored} -> {expected}"
+                    for field, (stored, expected) in values.items()
+                )
+                self.stdout.write(f"{pk}: {details}")
+            if len(drift) > options["show"]:
+                self.stdout.write(f"... e mais {len(drift) - options['show']}.")
+
+            if drift and not options["dry_run"]:
+                counters.recount_ids(drift, fields, using=using)
+        action = "encontrados" if options["dry_run"] else "corrigidos"
+        self.stdout.write(f"{len(drift)} acomodações com desvio ({action}).")
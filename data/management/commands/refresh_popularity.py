@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from quickhost.api import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza bookings_last_30_days, retirando da contagem as reservas que "
+        "saíram da janela. Deve rodar periodicamente (ex.: a cada hora, via cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = counters.refresh_recent_bookings(using=options["database"])
+        self.stdout.write(
+            f"{updated} acomodações atualizadas em "
+            f"{time.perf_counter() - started:.2f}s."
+        )
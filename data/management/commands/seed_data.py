@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from data.seeding import seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera usuários, acomodações, reservas, avaliações e favoritos sintéticos "
+        "em larga escala."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--listings", type=int, default=200)
+        parser.add_argument("--bookings", type=int, default=5000)
+        parser.add_argument("--reviews", type=int, default=1000)
+        parser.add_argument("--favorites", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processos que geram os lotes em paralelo à inserção.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Semente para reproduzir os dados (em um banco sem os registros dela).",
+        )
+        parser.add_argument(
+            "--password",
+            default="quickhost123",
+            help="Senha de todos os usuários gerados.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Não pede confirmação.",
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in ("users", "listings", "bookings", "reviews", "favorites")
+        }
+        if any(count < 0 for count in counts.values()):
+            raise CommandError("As quantidades não podem ser negativas.")
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--batch-size e --workers devem ser positivos.")
+
+        database = options["database"]
+        if options["interactive"]:
+            name = connections[database].settings_dict["NAME"]
+            answer = input(
+                f"Serão inseridas {sum(counts.values())} linhas em {name}. "
+                "Continuar? [s/N] "
+            )
+            if answer.strip().lower() not in ("s", "sim", "y", "yes"):
+                self.stderr.write("Cancelado.")
+                return
+
+        try:
+            result = seed_data(
+                **counts,
+                seed=options["seed"],
+                password=options["password"],
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                using=database,
+                log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        elapsed = sum(seconds for _, seconds in result.values())
+        rows = sum(rows for rows, _ in result.values())
+        self.stdout.write(
+            self.style.SUCCESS(f"{rows} linhas inseridas em {elapsed:.1f}s.")
+        )
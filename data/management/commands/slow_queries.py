@@ -0,0 +1,83 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+FULL_SCAN_MARKERS = ("SCAN ", "Seq Scan")
+
+
+class Command(BaseCommand):
+    help = "Resume o log de consultas lentas, das piores para as melhores."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=None,
+            help="Arquivo JSON lines (padrão: SLOW_QUERY_LOG['PATH']).",
+        )
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--sort",
+            choices=["total", "max", "count"],
+            default="total",
+            help="total: tempo estimado (média x ocorrências), max ou count.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or settings.SLOW_QUERY_LOG["PATH"]
+        groups = defaultdict(
+            lambda: {
+                "occurrences": 0,
+                "durations": [],
+                "views": set(),
+                "locations": set(),
+                "plan": [],
+            }
+        )
+        try:
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    group = groups[record["shape"]]
+                    # Ocorrências suprimidas pelo limite por formato também contam.
+                    group["occurrences"] += 1 + record.get("suppressed", 0)
+                    group["durations"].append(record["duration_ms"])
+                    group["views"].add(record.get("view") or "-")
+                    group["locations"].add(record.get("location") or "-")
+                    group["plan"] = record.get("plan") or group["plan"]
+        except FileNotFoundError:
+            raise CommandError(f"Log de consultas lentas não encontrado: {path}")
+
+        def mean(group):
+            return sum(group["durations"]) / len(group["durations"])
+
+        sort_keys = {
+            "total": lambda group: mean(group) * group["occurrences"],
+            "max": lambda group: max(group["durations"]),
+            "count": lambda group: group["occurrences"],
+        }
+        ranked = sorted(
+            groups.items(),
+            key=lambda item: sort_keys[options["sort"]](item[1]),
+            reverse=True,
+        )
+
+        for position, (shape, group) in enumerate(ranked[: options["top"]], start=1):
+            full_scan = any(
+                marker in step for step in group["plan"] for marker in FULL_SCAN_MARKERS
+            )
+            self.stdout.write(
+                f"{position}. {group['occurrences']}x, média {mean(group):.1f} ms, "
+                f"máx {max(group['durations']):.1f} ms"
+                + (" [varredura completa]" if full_scan else "")
+            )
+            self.stdout.write(f"   {shape}")
+            self.stdout.write(f"   views: {', '.join(sorted(group['views']))}")
+            self.stdout.write(f"   código: {', '.join(sorted(group['locations']))}")
+            for step in group["plan"]:
+                self.stdout.write(f"   plano: {step}")
+        if not ranked:
+            self.stdout.write("Nenhuma consulta lenta registrada.")
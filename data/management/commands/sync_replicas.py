@@ -0,0 +1,52 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia o banco SQLite primário para os arquivos das réplicas "
+        "(settings.DATABASE_REPLICAS) usando a API de backup do SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Repete a cópia a cada N segundos em vez de executar uma vez.",
+        )
+
+    def handle(self, *args, **options):
+        primary = connections["default"]
+        if primary.vendor != "sqlite":
+            raise CommandError("sync_replicas só é suportado com SQLite.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("Nenhuma réplica configurada em DB_REPLICA_PATHS.")
+
+        while True:
+            self.sync(primary.settings_dict["NAME"])
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
+
+    def sync(self, primary_path):
+        source = sqlite3.connect(primary_path)
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                replica_path = settings.DATABASES[alias]["NAME"]
+                started = time.perf_counter()
+                target = sqlite3.connect(replica_path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                elapsed = (time.perf_counter() - started) * 1000
+                self.stdout.write(
+                    f"{alias}: {primary_path} -> {replica_path} ({elapsed:.1f} ms)"
+                )
+        finally:
+            source.close()
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from quickhost.api import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza os rollups diários de ocupação e receita (acomodação, cidade "
+        "e UF) com as reservas alteradas desde a última execução. Deve rodar "
+        "periodicamente (ex.: a cada 15 minutos, via cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Descarta os rollups e recalcula todo o histórico.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        started = time.perf_counter()
+        if options["rebuild"]:
+            rollups.rebuild(using=using)
+        result = rollups.update_rollups(using=using)
+        self.stdout.write(
+            f"{result['listings']} acomodações e {result['days']} dias "
+            f"recalculados em {time.perf_counter() - started:.2f}s "
+            f"(marca d'água: {result['high_water_mark'].isoformat()})."
+        )
@@ -0,0 +1,80 @@
+from django.core.management.base import CommandError
+from django.db import migrations
+
+# Índices e restrições exclusivos do PostgreSQL. Ficam fora do estado dos
+# modelos para que o mesmo histórico de migrações continue válido no SQLite.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    # Consultas de contenção em internal_images (internal_images @> ...).
+    "CREATE INDEX IF NOT EXISTS data_propertylisting_images_gin "
+    "ON data_propertylisting USING gin (internal_images jsonb_path_ops)",
+    # Mesma expressão gerada pelo lookup title__icontains do Django.
+    "CREATE INDEX IF NOT EXISTS data_propertylisting_title_trgm "
+    "ON data_propertylisting USING gin (upper(title::text) gin_trgm_ops)",
+    # Impede reservas ativas sobrepostas para a mesma acomodação.
+    "ALTER TABLE data_booking ADD CONSTRAINT data_booking_no_overlap "
+    "EXCLUDE USING gist ("
+    "accommodation_id WITH =, "
+    "daterange(check_in_date, check_out_date, '[)') WITH &&"
+    ") WHERE (is_active)",
+]
+
+POSTGRES_BACKWARD = [
+    "ALTER TABLE data_booking DROP CONSTRAINT IF EXISTS data_booking_no_overlap",
+    "DROP INDEX IF EXISTS data_propertylisting_title_trgm",
+    "DROP INDEX IF EXISTS data_propertylisting_images_gin",
+]
+
+
+# Pares de reservas ativas sobrepostas, que impediriam a criação da
+# restrição data_booking_no_overlap.
+OVERLAPPING_BOOKINGS = (
+    "SELECT a.accommodation_id, a.id_booking, b.id_booking "
+    "FROM data_booking a JOIN data_booking b "
+    "ON a.accommodation_id = b.accommodation_id AND a.id_booking < b.id_booking "
+    "WHERE a.is_active AND b.is_active "
+    "AND a.check_in_date < b.check_out_date AND b.check_in_date < a.check_out_date "
+    "LIMIT 20"
+)
+
+
+def check_overlaps(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPPING_BOOKINGS)
+        pairs = cursor.fetchall()
+    if pairs:
+        details = "\n".join(
+            f"  acomodação {accommodation}: reservas {first} e {second}"
+            for accommodation, first, second in pairs
+        )
+        raise CommandError(
+            "Há reservas ativas sobrepostas; cancele (is_active = false) ou "
+            "corrija uma de cada par antes de migrar (até 20 pares):\n" + details
+        )
+
+
+def run_on_postgres(statements, check=False):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        if check:
+            check_overlaps(schema_editor)
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0002_propertylisting_price"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgres(POSTGRES_FORWARD, check=True),
+            run_on_postgres(POSTGRES_BACKWARD),
+        ),
+    ]
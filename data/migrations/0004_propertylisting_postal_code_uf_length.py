@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0003_postgres_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertylisting',
+            name='postal_code',
+            field=models.CharField(default='Not informed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='propertylisting',
+            name='uf',
+            field=models.CharField(blank=True, default='Not informed', max_length=20),
+        ),
+    ]
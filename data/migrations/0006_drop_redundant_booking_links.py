@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0005_composite_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='propertylisting',
+            name='registered_user_bookings',
+        ),
+        migrations.RemoveField(
+            model_name='useraccount',
+            name='registered_accommodation_bookings',
+        ),
+        migrations.RemoveField(
+            model_name='useraccount',
+            name='registered_accommodations',
+        ),
+    ]
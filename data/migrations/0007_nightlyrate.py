@@ -0,0 +1,58 @@
+# Generated by Django 5.1.3 on 2026-10-19 00:53
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0006_drop_redundant_booking_links"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NightlyRate",
+            fields=[
+                (
+                    "id_nightly_rate",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(Decimal('0'))],
+                    ),
+                ),
+                ("label", models.CharField(blank=True, max_length=50)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "accommodation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nightly_rates",
+                        to="data.propertylisting",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("accommodation", "date"),
+                        name="unique_accommodation_nightly_rate",
+                    )
+                ],
+            },
+        ),
+    ]
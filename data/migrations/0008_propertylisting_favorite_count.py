@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    PropertyListing = apps.get_model("data", "PropertyListing")
+    FavoriteProperty = apps.get_model("data", "FavoriteProperty")
+    favorites = (
+        FavoriteProperty.objects.filter(accommodation=OuterRef("pk"))
+        .order_by()
+        .values("accommodation")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    PropertyListing.objects.using(schema_editor.connection.alias).update(
+        favorite_count=Coalesce(Subquery(favorites), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0007_nightlyrate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="propertylisting",
+            name="favorite_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:38
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def count_bookings(apps, schema_editor):
+    PropertyListing = apps.get_model("data", "PropertyListing")
+    Booking = apps.get_model("data", "Booking")
+
+    def per_listing(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.filter(accommodation=OuterRef("pk"))
+                .order_by()
+                .values("accommodation")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    since = timezone.now() - timedelta(days=30)
+    PropertyListing.objects.using(schema_editor.connection.alias).update(
+        booking_count=per_listing(Booking.objects.all()),
+        bookings_last_30_days=per_listing(
+            Booking.objects.filter(created_at__gte=since)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0008_propertylisting_favorite_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="propertylisting",
+            name="booking_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="propertylisting",
+            name="bookings_last_30_days",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0009_propertylisting_booking_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["user_booking", "check_in_date"],
+                name="booking_user_checkin_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:54
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0010_booking_user_checkin_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CityDailyStats",
+            fields=[
+                (
+                    "id_city_daily_stats",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("uf", models.CharField(max_length=20)),
+                ("city", models.CharField(max_length=100)),
+                ("day", models.DateField()),
+                ("nights", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ListingDailyStats",
+            fields=[
+                (
+                    "id_listing_daily_stats",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("nights", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RollupInvalidation",
+            fields=[
+                (
+                    "id_rollup_invalidation",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("accommodation_id", models.UUIDField()),
+                ("check_in_date", models.DateField()),
+                ("check_out_date", models.DateField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RollupState",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("high_water_mark", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UfDailyStats",
+            fields=[
+                (
+                    "id_uf_daily_stats",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("uf", models.CharField(max_length=20)),
+                ("day", models.DateField()),
+                ("nights", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["updated_at"], name="booking_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="citydailystats",
+            index=models.Index(fields=["day"], name="city_daily_stats_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="citydailystats",
+            constraint=models.UniqueConstraint(
+                fields=("uf", "city", "day"), name="unique_city_daily_stats"
+            ),
+        ),
+        migrations.AddField(
+            model_name="listingdailystats",
+            name="accommodation",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_stats",
+                to="data.propertylisting",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rollupinvalidation",
+            index=models.Index(fields=["created_at"], name="rollup_invalidation_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ufdailystats",
+            index=models.Index(fields=["day"], name="uf_daily_stats_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="ufdailystats",
+            constraint=models.UniqueConstraint(
+                fields=("uf", "day"), name="unique_uf_daily_stats"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listingdailystats",
+            index=models.Index(fields=["day"], name="listing_daily_stats_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="listingdailystats",
+            constraint=models.UniqueConstraint(
+                fields=("accommodation", "day"), name="unique_listing_daily_stats"
+            ),
+        ),
+    ]
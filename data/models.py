@@ -1,4 +1,4 @@
-from django.db.models import UniqueConstraint, Avg
+from django.db.models import UniqueConstraint, Avg, Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
@@ -7,6 +7,7 @@ from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from uuid import uuid4
+from decimal import Decimal
 from .validators import (
     validate_room_count,
     validate_bed_count,
@@ -42,10 +43,6 @@ class UserAccount(AbstractUser):
         upload_to="profile_pictures/", blank=True, null=True
     )
     cpf = models.CharField(max_length=11, blank=True, null=True)
-    registered_accommodations = models.ManyToManyField(
-        "PropertyListing", blank=True, related_name="users_registered"
-    )
-    registered_accommodation_bookings = models.ManyToManyField("Booking", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     USERNAME_FIELD = "email"
@@ -55,11 +52,26 @@ class UserAccount(AbstractUser):
     def __str__(self):
         return f"{self.id_user}"
 
+    @property
+    def registered_accommodations(self):
+        """Acomodações criadas ou reservadas pelo usuário."""
+        return PropertyListing.objects.filter(
+            Q(creator=self) | Q(accommodation_bookings__user_booking=self)
+        ).distinct()
+
+    @property
+    def registered_accommodation_bookings(self):
+        """Reservas feitas pelo usuário."""
+        return self.user_bookings.all()
+
 
 class PropertyListing(models.Model):
     id_accommodation = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     creator = models.ForeignKey(
-        "UserAccount", on_delete=models.CASCADE, related_name="accommodations"
+        "UserAccount",
+        on_delete=models.CASCADE,
+        related_name="accommodations",
+        db_index=False,
     )
     consecutive_days_limit = models.IntegerField(
         blank=True,
@@ -75,9 +87,11 @@ class PropertyListing(models.Model):
     average_rating = models.DecimalField(
         max_digits=3, decimal_places=2, default=0.00, blank=True
     )
-    registered_user_bookings = models.ManyToManyField(
-        "Booking", related_name="registered_accommodations", blank=True
-    )
+    # Contadores desnormalizados, atualizados com F() junto dos favoritos e
+    # das reservas (quickhost/api/counters.py).
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+    booking_count = models.PositiveIntegerField(default=0, editable=False)
+    bookings_last_30_days = models.PositiveIntegerField(default=0, editable=False)
     registered_accommodation_bookings = models.ManyToManyField(
         "PropertyListing", blank=True
     )
@@ -120,8 +134,8 @@ class PropertyListing(models.Model):
     address = models.CharField(max_length=255, default=_("Not informed"))
     city = models.CharField(max_length=100, default=_("Not informed"))
     neighborhood = models.CharField(max_length=100, default=_("Not informed"))
-    postal_code = models.CharField(max_length=10, default=_("Not informed"))
-    uf = models.CharField(max_length=10, default=_("Not informed"), blank=True)
+    postal_code = models.CharField(max_length=20, default=_("Not informed"))
+    uf = models.CharField(max_length=20, default=_("Not informed"), blank=True)
     wifi = models.BooleanField(default=False)
     tv = models.BooleanField(default=False)
     kitchen = models.BooleanField(default=False)
@@ -140,9 +154,21 @@ class PropertyListing(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["creator", "-created_at"], name="listing_creator_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title or _("Accommodation without title")
 
+    @property
+    def registered_user_bookings(self):
+        """Reservas feitas para a acomodação."""
+        return self.accommodation_bookings.all()
+
     def calculate_final_price(self):
         """Calcula o preço final da acomodação com base no preço por noite e a taxa de limpeza."""
         total_cost = self.price_per_night + self.cleaning_fee
@@ -168,6 +194,7 @@ class Booking(models.Model):
         "UserAccount",
         on_delete=models.CASCADE,
         related_name="user_bookings",
+        db_index=False,
     )
     accommodation = models.ForeignKey(
         "PropertyListing",
@@ -179,18 +206,74 @@ class Booking(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Marca d'água dos rollups diários (quickhost/api/rollups.py).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user_booking", "-created_at"], name="booking_user_created_idx"
+            ),
+            models.Index(fields=["updated_at"], name="booking_updated_idx"),
+            models.Index(
+                fields=["user_booking", "check_in_date"],
+                name="booking_user_checkin_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
             f"Reserva de {self.user_booking.username} para {self.accommodation.title}"
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_stay = instance.stay()
+        return instance
+
+    def stay(self):
+        """(acomodação, check-in, check-out), ou None se algum campo foi adiado."""
+        stay = tuple(
+            self.__dict__.get(field)
+            for field in ("accommodation_id", "check_in_date", "check_out_date")
+        )
+        return None if None in stay else stay
+
+
+class NightlyRate(models.Model):
+    """Diária específica de uma acomodação em uma data (fim de semana, feriado, temporada)."""
+
+    id_nightly_rate = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    accommodation = models.ForeignKey(
+        "PropertyListing", on_delete=models.CASCADE, related_name="nightly_rates"
+    )
+    date = models.DateField()
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0"))]
+    )
+    label = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["accommodation", "date"],
+                name="unique_accommodation_nightly_rate",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.accommodation_id} - {self.date}: {self.price}"
+
 
 class FavoriteProperty(models.Model):
     id_favorite_property = models.UUIDField(
         primary_key=True, default=uuid4, editable=False
     )
-    user_favorite_property = models.ForeignKey("UserAccount", on_delete=models.CASCADE)
+    user_favorite_property = models.ForeignKey(
+        "UserAccount", on_delete=models.CASCADE, db_index=False
+    )
     accommodation = models.ForeignKey("PropertyListing", on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -201,6 +284,12 @@ class FavoriteProperty(models.Model):
                 name="unique_user_accommodation_favorite",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user_favorite_property", "-created_at"],
+                name="favorite_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user_favorite_property.username} - {self.accommodation.title}"
@@ -209,7 +298,10 @@ class FavoriteProperty(models.Model):
 class Review(models.Model):
     id_review = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     accommodation = models.ForeignKey(
-        "PropertyListing", on_delete=models.CASCADE, related_name="reviews"
+        "PropertyListing",
+        on_delete=models.CASCADE,
+        related_name="reviews",
+        db_index=False,
     )
     user_comment = models.ForeignKey(
         "UserAccount", on_delete=models.CASCADE, related_name="reviews"
@@ -218,5 +310,104 @@ class Review(models.Model):
     comment = models.TextField(null=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["accommodation", "-created_at"],
+                name="review_listing_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Review {self.id_review} for accommodation {self.accommodation.id_accommodation}"
+
+
+class ListingDailyStats(models.Model):
+    """Noites reservadas e receita de uma acomodação em um dia."""
+
+    id_listing_daily_stats = models.UUIDField(
+        primary_key=True, default=uuid4, editable=False
+    )
+    accommodation = models.ForeignKey(
+        "PropertyListing",
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+        db_index=False,
+    )
+    day = models.DateField()
+    nights = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["accommodation", "day"], name="unique_listing_daily_stats"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="listing_daily_stats_day_idx")]
+
+
+class CityDailyStats(models.Model):
+    """Noites reservadas e receita das acomodações de uma cidade em um dia."""
+
+    id_city_daily_stats = models.UUIDField(
+        primary_key=True, default=uuid4, editable=False
+    )
+    uf = models.CharField(max_length=20)
+    city = models.CharField(max_length=100)
+    day = models.DateField()
+    nights = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["uf", "city", "day"], name="unique_city_daily_stats"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="city_daily_stats_day_idx")]
+
+
+class UfDailyStats(models.Model):
+    """Noites reservadas e receita das acomodações de uma UF em um dia."""
+
+    id_uf_daily_stats = models.UUIDField(
+        primary_key=True, default=uuid4, editable=False
+    )
+    uf = models.CharField(max_length=20)
+    day = models.DateField()
+    nights = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["uf", "day"], name="unique_uf_daily_stats")
+        ]
+        indexes = [models.Index(fields=["day"], name="uf_daily_stats_day_idx")]
+
+
+class RollupState(models.Model):
+    """Marca d'água de cada job de rollup: reservas alteradas até aqui já entraram."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class RollupInvalidation(models.Model):
+    """
+    Período de uma reserva excluída (ou movida) que precisa ser recalculado
+    nos rollups: a reserva não aparece mais na busca por `updated_at`.
+    """
+
+    id_rollup_invalidation = models.UUIDField(
+        primary_key=True, default=uuid4, editable=False
+    )
+    # Sem chave estrangeira: a acomodação pode ter sido excluída junto.
+    accommodation_id = models.UUIDField()
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"], name="rollup_invalidation_idx")]
@@ -0,0 +1,566 @@
+"""
+Geração de dados sintéticos em larga escala (`manage.py seed_data`).
+
+Cada registro é derivado de forma determinística de `(seed, índice)`, então
+os lotes podem ser gerados em processos separados sem compartilhar estado:
+os UUIDs de usuários e acomodações são calculados a partir do índice, e as
+reservas de cada acomodação são geradas em sequência, sem sobreposição.
+Os lotes chegam ao processo principal como tuplas já convertidas para o
+banco e são inseridos com executemany, um lote por transação.
+"""
+
+import multiprocessing
+import random
+import time
+import unicodedata
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Avg, DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from data.models import (
+    Booking,
+    FavoriteProperty,
+    PropertyListing,
+    Review,
+    UserAccount,
+)
+from quickhost.api import counters, fees, pricing
+from quickhost.api.bulk import db_rows, insert_rows
+
+# (cidade, UF, faixa dos 5 primeiros dígitos do CEP, peso)
+CITIES = [
+    ("São Paulo", "SP", (1000, 5999), 14),
+    ("Rio de Janeiro", "RJ", (20000, 23799), 12),
+    ("Salvador", "BA", (40000, 42599), 6),
+    ("Florianópolis", "SC", (88000, 88099), 6),
+    ("Belo Horizonte", "MG", (30000, 31999), 5),
+    ("Fortaleza", "CE", (60000, 61599), 5),
+    ("Recife", "PE", (50000, 52999), 4),
+    ("Porto Alegre", "RS", (90000, 91999), 4),
+    ("Curitiba", "PR", (80000, 82999), 4),
+    ("Brasília", "DF", (70000, 72799), 4),
+    ("Natal", "RN", (59000, 59139), 3),
+    ("Maceió", "AL", (57000, 57099), 3),
+    ("João Pessoa", "PB", (58000, 58099), 2),
+    ("Manaus", "AM", (69000, 69099), 2),
+    ("Belém", "PA", (66000, 66999), 2),
+    ("Goiânia", "GO", (74000, 74899), 2),
+    ("Vitória", "ES", (29000, 29099), 2),
+    ("Campo Grande", "MS", (79000, 79129), 1),
+    ("Cuiabá", "MT", (78000, 78109), 1),
+    ("Gramado", "RS", (95670, 95679), 3),
+    ("Armação dos Búzios", "RJ", (28950, 28959), 3),
+    ("Paraty", "RJ", (23970, 23979), 2),
+    ("Ubatuba", "SP", (11680, 11699), 2),
+    ("Porto Seguro", "BA", (45810, 45819), 2),
+    ("Bonito", "MS", (79290, 79299), 1),
+    ("Jijoca de Jericoacoara", "CE", (62598, 62598), 1),
+]
+CITY_WEIGHTS = [weight for *_, weight in CITIES]
+
+NEIGHBORHOODS = [
+    "Centro",
+    "Jardim América",
+    "Vila Nova",
+    "Boa Vista",
+    "Bela Vista",
+    "Santa Cruz",
+    "São José",
+    "Praia do Canto",
+    "Alto da Serra",
+    "Vila Mariana",
+]
+STREETS = [
+    "Rua das Flores",
+    "Avenida Brasil",
+    "Rua XV de Novembro",
+    "Rua Sete de Setembro",
+    "Avenida Atlântica",
+    "Rua Tiradentes",
+    "Rua Dom Pedro II",
+    "Avenida Beira-Mar",
+]
+FIRST_NAMES = [
+    "Ana",
+    "Bruno",
+    "Camila",
+    "Diego",
+    "Fernanda",
+    "Gabriel",
+    "Helena",
+    "Igor",
+    "Juliana",
+    "Lucas",
+    "Mariana",
+    "Pedro",
+    "Rafaela",
+    "Thiago",
+    "Vitória",
+]
+LAST_NAMES = [
+    "Silva",
+    "Santos",
+    "Oliveira",
+    "Souza",
+    "Lima",
+    "Pereira",
+    "Costa",
+    "Ferreira",
+    "Almeida",
+    "Ribeiro",
+    "Carvalho",
+    "Gomes",
+]
+AREA_CODES = ["11", "21", "31", "41", "47", "48", "51", "61", "71", "81", "85"]
+
+# (categoria, título, faixa da diária em reais)
+CATEGORIES = [
+    ("inn", "Pousada", (120, 450)),
+    ("chalet", "Chalé", (180, 700)),
+    ("apartment", "Apartamento", (150, 900)),
+    ("home", "Casa", (250, 2500)),
+    ("room", "Quarto", (60, 250)),
+]
+ADJECTIVES = ["aconchegante", "com vista", "reformado", "amplo", "charmoso"]
+AMENITIES = [
+    "wifi",
+    "tv",
+    "kitchen",
+    "washing_machine",
+    "parking_included",
+    "air_conditioning",
+    "pool",
+    "jacuzzi",
+    "grill",
+    "private_gym",
+    "beach_access",
+    "smoke_detector",
+    "fire_extinguisher",
+    "first_aid_kit",
+    "outdoor_camera",
+]
+REVIEW_SENTENCES = [
+    "A acomodação estava limpa e exatamente como nas fotos do anúncio.",
+    "O anfitrião respondeu rápido e deu ótimas dicas sobre a região.",
+    "A localização é excelente, perto de restaurantes e do comércio local.",
+    "O check-in foi simples e as instruções de acesso estavam claras.",
+    "A cama era confortável, mas o chuveiro poderia ter mais pressão.",
+    "Tivemos um pequeno problema com o wi-fi, resolvido no mesmo dia.",
+    "Voltaríamos com certeza, a estadia superou as expectativas.",
+    "O barulho da rua à noite atrapalhou um pouco o descanso.",
+]
+RATINGS = [1, 2, 3, 4, 5]
+RATING_WEIGHTS = [3, 5, 12, 35, 45]
+
+
+USER_FIELDS = (
+    "id_user",
+    "email",
+    "username",
+    "password",
+    "first_name",
+    "last_name",
+    "birth_date",
+    "phone_number",
+    "cpf",
+)
+LISTING_FIELDS = (
+    "id_accommodation",
+    "creator",
+    "title",
+    "description",
+    "category",
+    "space_type",
+    "room_count",
+    "bed_count",
+    "bathroom_count",
+    "guest_capacity",
+    "address",
+    "city",
+    "neighborhood",
+    "uf",
+    "postal_code",
+    "price",
+    "price_per_night",
+    "cleaning_fee",
+    "final_price",
+    "consecutive_days_limit",
+    "is_active",
+    *AMENITIES,
+)
+BOOKING_FIELDS = (
+    "id_booking",
+    "user_booking",
+    "accommodation",
+    "check_in_date",
+    "check_out_date",
+    "price",
+    "is_active",
+)
+REVIEW_FIELDS = ("id_review", "accommodation", "user_comment", "rating", "comment")
+FAVORITE_FIELDS = ("id_favorite_property", "user_favorite_property", "accommodation")
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    seed: int
+    users: int
+    listings: int
+    bookings: int
+    reviews: int
+    favorites: int
+    password_hash: str
+    today: date
+    using: str
+
+    @property
+    def hosts(self):
+        """Os primeiros 20% dos usuários são anfitriões."""
+        return max(1, self.users // 5)
+
+
+def namespace(seed, model):
+    """Prefixo aleatório (96 bits) dos UUIDs de um modelo nesta semente."""
+    return random.Random(f"{seed}:{model}").getrandbits(96)
+
+
+def indexed_uuid(prefix, index):
+    return uuid.UUID(int=(prefix << 32) | index, version=4)
+
+
+def random_uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def share(total, parts, index):
+    """Quantidade do item `index` ao dividir `total` igualmente entre `parts`."""
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def ascii_slug(text):
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return normalized.encode("ascii", "ignore").decode()
+
+
+def make_cpf(rng):
+    """CPF com dígitos verificadores válidos."""
+    digits = [rng.randrange(10) for _ in range(9)]
+    for length in (9, 10):
+        total = sum(d * w for d, w in zip(digits, range(length + 1, 1, -1)))
+        digits.append(total * 10 % 11 % 10)
+    return "".join(map(str, digits))
+
+
+def listing_price_cents(config, index):
+    """Diária anunciada da acomodação `index`, também usada nas reservas."""
+    rng = random.Random(f"{config.seed}:price:{index}")
+    _, _, (low, high) = CATEGORIES[index % len(CATEGORIES)]
+    return rng.randrange(low, high + 1) * 100 + rng.choice((0, 0, 50, 90))
+
+
+def listing_cleaning_cents(config, index):
+    """Taxa de limpeza da acomodação `index`, também somada às reservas."""
+    rng = random.Random(f"{config.seed}:cleaning:{index}")
+    return rng.choice((0, 50, 80, 120, 150)) * 100
+
+
+def generate_users(config, start, stop):
+    rng = random.Random(f"{config.seed}:users:{start}")
+    prefix = namespace(config.seed, "users")
+    tag = f"{prefix:024x}"[:6]
+    rows = []
+    for index in range(start, stop):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        handle = f"{ascii_slug(first)}_{ascii_slug(last)}_{tag}{index}"
+        rows.append(
+            (
+                indexed_uuid(prefix, index),
+                f"{handle.replace('_', '.')}@exemplo.com.br",
+                handle,
+                config.password_hash,
+                first,
+                last,
+                date(rng.randrange(1950, 2005), rng.randrange(1, 13), 1),
+                f"+55{rng.choice(AREA_CODES)}9{rng.randrange(10**8):08d}",
+                make_cpf(rng),
+            )
+        )
+    return rows
+
+
+def generate_listings(config, start, stop):
+    rng = random.Random(f"{config.seed}:listings:{start}")
+    users = namespace(config.seed, "users")
+    prefix = namespace(config.seed, "listings")
+    price_cents = [listing_price_cents(config, index) for index in range(start, stop)]
+    # bulk insert não passa por PropertyListing.save(): os preços derivados
+    # são calculados aqui, com as mesmas regras.
+    net_cents = fees.net_prices(price_cents).tolist()
+
+    rows = []
+    for offset, index in enumerate(range(start, stop)):
+        category, label, _ = CATEGORIES[index % len(CATEGORIES)]
+        city, uf, (cep_low, cep_high), _ = rng.choices(CITIES, CITY_WEIGHTS)[0]
+        neighborhood = rng.choice(NEIGHBORHOODS)
+        rooms = rng.randrange(1, 6)
+        guests = min(20, rooms * 2 + rng.randrange(0, 3))
+        net = Decimal(net_cents[offset]) / 100
+        cleaning_fee = Decimal(listing_cleaning_cents(config, index)) / 100
+        rows.append(
+            (
+                indexed_uuid(prefix, index),
+                indexed_uuid(users, rng.randrange(config.hosts)),
+                f"{label} {rng.choice(ADJECTIVES)} em {neighborhood}, {city}",
+                f"{label} com {rooms} quarto(s) para até {guests} hóspedes "
+                f"no bairro {neighborhood}, em {city}/{uf}.",
+                category,
+                "limited_space" if category == "room" else "full_space",
+                rooms,
+                min(20, rooms + rng.randrange(0, 3)),
+                max(1, rooms - rng.randrange(0, 2)),
+                guests,
+                f"{rng.choice(STREETS)}, {rng.randrange(1, 3000)}",
+                city,
+                neighborhood,
+                uf,
+                f"{rng.randint(cep_low, cep_high):05d}-{rng.randrange(1000):03d}",
+                Decimal(price_cents[offset]) / 100,
+                net,
+                cleaning_fee,
+                net + cleaning_fee,
+                rng.choice((None, None, 7, 15, 30)),
+                rng.random() < 0.95,
+                *(rng.random() < 0.5 for _ in AMENITIES),
+            )
+        )
+    return rows
+
+
+def generate_bookings(config, start, stop):
+    """Reservas de um intervalo de acomodações, em sequência e sem sobreposição."""
+    rng = random.Random(f"{config.seed}:bookings:{start}")
+    users = namespace(config.seed, "users")
+    listings = namespace(config.seed, "listings")
+
+    stays = []
+    for index in range(start, stop):
+        listing_id = indexed_uuid(listings, index)
+        price = listing_price_cents(config, index)
+        cleaning = listing_cleaning_cents(config, index)
+        cursor = config.today - timedelta(days=rng.randrange(0, 400))
+        for _ in range(share(config.bookings, config.listings, index)):
+            cursor += timedelta(days=rng.randrange(0, 15))
+            nights = rng.choice((1, 2, 2, 3, 3, 4, 5, 7, 7, 10, 14))
+            stays.append((listing_id, price, cleaning, cursor, nights))
+            cursor += timedelta(days=nights)
+    if not stays:
+        return []
+
+    # O mesmo total de pricing.stay_price: as acomodações geradas não têm
+    # NightlyRate, então o calendário é a diária anunciada em todas as noites,
+    # com a taxa por duração e a limpeza.
+    totals = (
+        pricing.stay_totals(
+            [price for _, price, *_ in stays], [nights for *_, nights in stays]
+        )
+        + np.array([cleaning for _, _, cleaning, *_ in stays], dtype=np.int64)
+    ).tolist()
+    return [
+        (
+            random_uuid(rng),
+            indexed_uuid(users, rng.randrange(config.users)),
+            listing_id,
+            check_in,
+            check_in + timedelta(days=nights),
+            Decimal(total) / 100,
+            rng.random() < 0.97,
+        )
+        for (listing_id, _, _, check_in, nights), total in zip(stays, totals)
+    ]
+
+
+def generate_reviews(config, start, stop):
+    rng = random.Random(f"{config.seed}:reviews:{start}")
+    users = namespace(config.seed, "users")
+    listings = namespace(config.seed, "listings")
+    return [
+        (
+            random_uuid(rng),
+            indexed_uuid(listings, index),
+            indexed_uuid(users, rng.randrange(config.users)),
+            rng.choices(RATINGS, RATING_WEIGHTS)[0],
+            # Entre 100 e 500 caracteres, como exige validate_comment.
+            " ".join(rng.sample(REVIEW_SENTENCES, rng.randrange(3, 6))),
+        )
+        for index in range(start, stop)
+        for _ in range(share(config.reviews, config.listings, index))
+    ]
+
+
+def generate_favorites(config, start, stop):
+    """Favoritos de um intervalo de usuários; cada par é único por construção."""
+    rng = random.Random(f"{config.seed}:favorites:{start}")
+    users = namespace(config.seed, "users")
+    listings = namespace(config.seed, "listings")
+    return [
+        (
+            random_uuid(rng),
+            indexed_uuid(users, index),
+            indexed_uuid(listings, listing),
+        )
+        for index in range(start, stop)
+        for listing in rng.sample(
+            range(config.listings), share(config.favorites, config.users, index)
+        )
+    ]
+
+
+# rótulo: (modelo, campos gerados, gerador)
+GENERATORS = {
+    "usuários": (UserAccount, USER_FIELDS, generate_users),
+    "acomodações": (PropertyListing, LISTING_FIELDS, generate_listings),
+    "reservas": (Booking, BOOKING_FIELDS, generate_bookings),
+    "avaliações": (Review, REVIEW_FIELDS, generate_reviews),
+    "favoritos": (FavoriteProperty, FAVORITE_FIELDS, generate_favorites),
+}
+
+
+def build_batch(task):
+    """Gera e prepara um lote; roda nos processos filhos quando há workers."""
+    label, config, start, stop = task
+    model, names, generate = GENERATORS[label]
+    return db_rows(model, names, generate(config, start, stop), config.using)
+
+
+def chunks(count, per_chunk):
+    """Divide `range(count)` em intervalos `(início, fim)`."""
+    per_chunk = max(1, per_chunk)
+    return [
+        (start, min(start + per_chunk, count)) for start in range(0, count, per_chunk)
+    ]
+
+
+def run_tasks(func, tasks, pool, window):
+    """
+    Executa as tarefas em ordem, no pool quando houver, mantendo no máximo
+    `window` lotes prontos aguardando inserção.
+    """
+    if pool is None:
+        yield from map(func, tasks)
+        return
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def update_average_ratings(using):
+    average = (
+        Review.objects.using(using)
+        .filter(accommodation=OuterRef("pk"))
+        .values("accommodation")
+        .annotate(average=Avg("rating"))
+        .values("average")
+    )
+    PropertyListing.objects.using(using).filter(
+        pk__in=Review.objects.using(using).values("accommodation")
+    ).update(
+        average_rating=Coalesce(
+            Round(Subquery(average), 2),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        )
+    )
+
+
+def seed_data(
+    users,
+    listings,
+    bookings=0,
+    reviews=0,
+    favorites=0,
+    seed=None,
+    password="quickhost123",
+    batch_size=5000,
+    workers=1,
+    using=DEFAULT_DB_ALIAS,
+    log=None,
+):
+    """
+    Gera e insere os dados; retorna `{rótulo: (linhas, segundos)}`.
+
+    Com `workers > 1`, os lotes são gerados e preparados em processos filhos
+    enquanto o processo principal insere os anteriores.
+    """
+    if listings and not users:
+        raise ValueError("Acomodações precisam de pelo menos um usuário.")
+    if (bookings or reviews) and not listings:
+        raise ValueError("Reservas e avaliações precisam de acomodações.")
+    if favorites > users * listings:
+        raise ValueError("Há mais favoritos do que pares usuário/acomodação.")
+
+    config = SeedConfig(
+        seed=random.randrange(2**32) if seed is None else seed,
+        users=users,
+        listings=listings,
+        bookings=bookings,
+        reviews=reviews,
+        favorites=favorites,
+        # Um único hash para todos: o hasher padrão leva centenas de ms.
+        password_hash=make_password(password),
+        today=timezone.localdate(),
+        using=using,
+    )
+    per_listing = max(1, (bookings + reviews) // max(1, listings))
+    per_user = max(1, favorites // max(1, users))
+    ranges = {
+        "usuários": chunks(users, batch_size),
+        "acomodações": chunks(listings, batch_size),
+        "reservas": chunks(listings if bookings else 0, batch_size // per_listing),
+        "avaliações": chunks(listings if reviews else 0, batch_size // per_listing),
+        "favoritos": chunks(users if favorites else 0, batch_size // per_user),
+    }
+
+    pool = None
+    if workers > 1:
+        # Conexões abertas não devem ser herdadas pelos processos filhos.
+        connections.close_all()
+        pool = multiprocessing.get_context().Pool(workers, initializer=django.setup)
+
+    result = {}
+    try:
+        for label, (model, _, _) in GENERATORS.items():
+            started = time.perf_counter()
+            count = 0
+            tasks = [(label, config, start, stop) for start, stop in ranges[label]]
+            for columns, rows in run_tasks(build_batch, tasks, pool, 2 * workers):
+                insert_rows(model, columns, rows, using, batch_size)
+                count += len(rows)
+            elapsed = time.perf_counter() - started
+            result[label] = (count, elapsed)
+            if log:
+                rate = count / elapsed if elapsed else 0
+                log(f"{label}: {count} linhas em {elapsed:.1f}s ({rate:.0f}/s)")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if reviews:
+        update_average_ratings(using)
+    if bookings or favorites:
+        counters.recount(using=using)
+    return result
@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from quickhost.api import counters, dashboard
+from quickhost.api.favorites import invalidate_favorite_ids
+from quickhost.api.pricing import invalidate_rate_calendar
+
+from .models import (
+    Booking,
+    FavoriteProperty,
+    NightlyRate,
+    PropertyListing,
+    Review,
+    RollupInvalidation,
+)
+
+
+@receiver(post_save, sender=NightlyRate)
+@receiver(post_delete, sender=NightlyRate)
+def nightly_rate_changed(sender, instance, **kwargs):
+    """Mantém o cache do calendário de diárias coerente com o banco."""
+    invalidate_rate_calendar(instance.accommodation_id, [instance.date])
+
+
+@receiver(post_save, sender=FavoriteProperty)
+def favorite_saved(sender, instance, created, raw=False, **kwargs):
+    """Favoritos criados em lote não passam por aqui: veja quickhost/api/favorites.py."""
+    if created and not raw:
+        counters.adjust_favorite_counts([instance.accommodation_id], 1)
+    invalidate_favorite_ids([instance.user_favorite_property_id])
+
+
+@receiver(post_delete, sender=FavoriteProperty)
+def favorite_deleted(sender, instance, **kwargs):
+    counters.adjust_favorite_counts([instance.accommodation_id], -1)
+    invalidate_favorite_ids([instance.user_favorite_property_id])
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.booking_added(instance)
+    dashboard.invalidate_for(instance)
+    # O período novo entra nos rollups pelo updated_at; o antigo, se a
+    # reserva mudou de acomodação ou de datas, precisa ser recalculado.
+    loaded = getattr(instance, "loaded_stay", None)
+    current = instance.stay()
+    if loaded and loaded != current:
+        invalidate_rollups(*loaded)
+    instance.loaded_stay = current
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    counters.booking_removed(instance)
+    dashboard.invalidate_for(instance)
+    stay = instance.stay() or getattr(instance, "loaded_stay", None)
+    if stay:
+        invalidate_rollups(*stay)
+
+
+def invalidate_rollups(accommodation_id, check_in_date, check_out_date):
+    RollupInvalidation.objects.create(
+        accommodation_id=accommodation_id,
+        check_in_date=check_in_date,
+        check_out_date=check_out_date,
+    )
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    dashboard.invalidate_for(instance)
+
+
+@receiver(post_save, sender=PropertyListing)
+@receiver(post_delete, sender=PropertyListing)
+def listing_changed(sender, instance, **kwargs):
+    dashboard.invalidate_dashboards([instance.creator_id])
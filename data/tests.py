@@ -1 +1,1554 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from data import benchmarks, seeding
+from data.models import (
+    UserAccount,
+    PropertyListing,
+    Review,
+    Booking,
+    FavoriteProperty,
+    NightlyRate,
+    ListingDailyStats,
+    CityDailyStats,
+    UfDailyStats,
+    RollupInvalidation,
+)
+from quickhost import caching, database, log, routers
+from quickhost.api import (
+    fees,
+    instrumentation,
+    metrics,
+    pricing,
+    profiling,
+    rollups,
+    serializers,
+)
+from quickhost.api.middleware import ReplicaRoutingMiddleware, replica_pin_key
+from quickhost.api.throttling import (
+    CacheTokenBucketBackend,
+    LocalTokenBucketBackend,
+    get_backend,
+)
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginTests(TestCase):
+    def setUp(self):
+        get_backend().reset()
+        self.user = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password="Senha1234"
+        )
+
+    def login(self):
+        return self.client.post(
+            "/token/",
+            {"email": "host@quickhost.test", "password": "Senha1234"},
+            content_type="application/json",
+        )
+
+    def test_login_updates_last_login_once_per_interval(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["tokens"]["user"]["authenticated"])
+        updates = [q["sql"] for q in first if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"last_login"', updates[0])
+        self.assertNotIn('"username"', updates[0])
+
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.login().status_code, 200)
+        writes = [q for q in second if not q["sql"].startswith("SELECT")]
+        self.assertEqual(writes, [])
+
+    @override_settings(
+        RATE_LIMITS={"ENABLED": True, "BACKEND": "local", "SCOPES": {"login": "2/min"}}
+    )
+    def test_login_is_rate_limited_per_ip(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login().status_code, 200)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        self.host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        self.accommodation = PropertyListing.objects.create(
+            creator=self.host,
+            title="Casa na praia",
+            description="Casa com vista para o mar.",
+            city="Florianópolis",
+            uf="SC",
+            postal_code="88000-000",
+            price=250,
+        )
+        Review.objects.create(
+            accommodation=self.accommodation,
+            user_comment=self.host,
+            rating=5,
+            comment="Excelente estadia. " * 8,
+        )
+
+    async def test_async_endpoints_match_sync_responses(self):
+        pk = self.accommodation.id_accommodation
+        pairs = [
+            ("/accommodations/", "/async/accommodations/"),
+            ("/accommodations/search/?uf=sc", "/async/accommodations/search/?uf=sc"),
+            (f"/accommodations/{pk}/", f"/async/accommodations/{pk}/"),
+            (
+                f"/reviews/?accommodation_id={pk}",
+                f"/async/reviews/?accommodation_id={pk}",
+            ),
+        ]
+        for sync_path, async_path in pairs:
+            expected = await self.async_client.get(sync_path)
+            response = await self.async_client.get(async_path)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected.json())
+
+        response = await self.async_client.post(
+            "/async/details/", {"uuid": str(pk)}, content_type="application/json"
+        )
+        self.assertEqual(response.json()["title"], "Casa na praia")
+
+    async def test_async_listings_mark_the_users_favorites(self):
+        await FavoriteProperty.objects.acreate(
+            user_favorite_property=self.host, accommodation=self.accommodation
+        )
+        token = RefreshToken.for_user(self.host).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        pk = self.accommodation.id_accommodation
+        for sync_path, async_path in [
+            ("/accommodations/", "/async/accommodations/"),
+            ("/accommodations/search/?uf=sc", "/async/accommodations/search/?uf=sc"),
+            (f"/accommodations/{pk}/", f"/async/accommodations/{pk}/"),
+        ]:
+            expected = await self.async_client.get(sync_path, headers=headers)
+            response = await self.async_client.get(async_path, headers=headers)
+            self.assertEqual(response.json(), expected.json())
+            data = response.json()
+            item = data if isinstance(data, dict) else data[0]
+            self.assertIs(item["is_favorited"], True)
+
+        response = await self.async_client.get(
+            "/async/accommodations/", headers={"Authorization": "Bearer invalid"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+
+    def test_reads_use_replica_only_when_allowed(self):
+        self.assertEqual(self.router.db_for_read(PropertyListing), "default")
+        with routers.request_scope():
+            self.assertEqual(self.router.db_for_read(PropertyListing), "default")
+            routers.allow_replica_reads()
+            self.assertEqual(self.router.db_for_read(PropertyListing), "replica1")
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        with routers.request_scope() as state:
+            routers.allow_replica_reads()
+            self.assertEqual(self.router.db_for_write(Review), "default")
+            self.assertEqual(self.router.db_for_read(PropertyListing), "default")
+            self.assertTrue(state.wrote)
+
+    def test_pinned_scope_reads_from_primary(self):
+        with routers.request_scope(pinned=True):
+            routers.allow_replica_reads()
+            self.assertEqual(self.router.db_for_read(PropertyListing), "default")
+
+    def test_write_pins_the_users_next_requests_to_primary(self):
+        def view(request):
+            if request.method == "POST":
+                self.router.db_for_write(Review)
+            routers.allow_replica_reads()
+            return HttpResponse(self.router.db_for_read(PropertyListing))
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        token = AccessToken.for_user(UserAccount(email="pin@quickhost.test"))
+        headers = {"Authorization": f"Bearer {token}"}
+        cache.delete(replica_pin_key("pin@quickhost.test"))
+
+        self.assertEqual(
+            middleware(factory.get("/", headers=headers)).content, b"replica1"
+        )
+        self.assertNotIn("Set-Cookie", middleware(factory.post("/", headers=headers)))
+        self.assertEqual(
+            middleware(factory.get("/", headers=headers)).content, b"default"
+        )
+        # Outro usuário (ou um cliente anônimo) continua lendo das réplicas.
+        self.assertEqual(middleware(factory.get("/")).content, b"replica1")
+
+
+class CacheSettingsTests(SimpleTestCase):
+    def test_process_local_cache_is_refused_with_several_workers(self):
+        self.assertFalse(caching.is_shared(caching.caches_from_env({})["default"]))
+        with self.assertRaises(ImproperlyConfigured):
+            caching.caches_from_env({"WEB_CONCURRENCY": "4"})
+        caches = caching.caches_from_env(
+            {"WEB_CONCURRENCY": "4", "CACHE_BACKEND": "redis"}
+        )
+        self.assertTrue(caching.is_shared(caches["default"]))
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_wal_is_enabled_only_when_requested(self):
+        self.assertEqual(database.sqlite_pragmas({})["journal_mode"], "DELETE")
+        tuned = database.sqlite_database("db.sqlite3", {"SQLITE_JOURNAL_MODE": "WAL"})
+        self.assertIn("PRAGMA journal_mode = WAL", tuned["OPTIONS"]["init_command"])
+
+
+class LocalTokenBucketTests(SimpleTestCase):
+    def test_least_recently_used_buckets_are_evicted(self):
+        backend = LocalTokenBucketBackend()
+        backend.MAX_KEYS = 2
+        for key in ("a", "b", "a", "c"):
+            backend.consume(key, 5, 1.0)
+        self.assertEqual(list(backend.buckets), ["a", "c"])
+        self.assertLess(backend.buckets["a"][0], 4)
+
+
+class CacheTokenBucketTests(SimpleTestCase):
+    def test_reset_refills_buckets_without_clearing_the_cache(self):
+        backend = CacheTokenBucketBackend("default")
+        cache.set("favorite-ids:outro", {1})
+        self.addCleanup(cache.delete_many, ["favorite-ids:outro", backend.RESET_KEY])
+        key = "ratelimit:test:reset"
+        self.assertTrue(backend.consume(key, 1, 0.001)[0])
+        self.assertFalse(backend.consume(key, 1, 0.001)[0])
+
+        backend.reset()
+        self.assertTrue(backend.consume(key, 1, 0.001)[0])
+        self.assertEqual(cache.get("favorite-ids:outro"), {1})
+
+
+class BookingCreateTests(TestCase):
+    def setUp(self):
+        get_backend().reset()
+        self.user = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        self.accommodation = PropertyListing.objects.create(
+            creator=self.user,
+            title="Pousada",
+            description="Pousada no litoral.",
+            uf="BA",
+            postal_code="40000-000",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_booking_is_a_single_insert_exposed_through_the_foreign_keys(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/bookings/",
+                {
+                    "user_booking": str(self.user.id_user),
+                    "accommodation": str(self.accommodation.id_accommodation),
+                    "check_in_date": "2030-02-01",
+                    "check_out_date": "2030-02-03",
+                    "price": "100.00",
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        writes = [q["sql"] for q in queries if not q["sql"].startswith("SELECT")]
+        inserts = [sql for sql in writes if sql.startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('"data_booking"', inserts[0])
+
+        booking_id = response.json()["id_booking"]
+        self.assertEqual(
+            [
+                str(pk)
+                for pk in self.user.registered_accommodation_bookings.values_list(
+                    "pk", flat=True
+                )
+            ],
+            [booking_id],
+        )
+        self.assertEqual(
+            list(self.user.registered_accommodations), [self.accommodation]
+        )
+
+        detail = self.client.get(
+            f"/accommodations/{self.accommodation.id_accommodation}/"
+        )
+        self.assertEqual(detail.json()["registered_user_bookings"], [booking_id])
+
+    def test_price_comes_from_the_rate_calendar_not_the_client(self):
+        PropertyListing.objects.filter(pk=self.accommodation.pk).update(
+            price=Decimal("200.00"), cleaning_fee=Decimal("50.00")
+        )
+        NightlyRate.objects.create(
+            accommodation=self.accommodation,
+            date=date(2030, 2, 2),
+            price=Decimal("300.00"),
+        )
+        response = self.client.post(
+            "/bookings/",
+            {
+                "user_booking": str(self.user.id_user),
+                "accommodation": str(self.accommodation.id_accommodation),
+                "check_in_date": "2030-02-01",
+                "check_out_date": "2030-02-03",
+                "price": "1.00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        # (200 + 300) x 1,05 + 50 de limpeza.
+        self.assertEqual(response.json()["price"], "575.00")
+
+        response = self.client.patch(
+            f"/bookings/{response.json()['id_booking']}/",
+            {"check_out_date": "2030-02-02", "price": "1.00"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["price"], "260.00")
+
+
+class BookingListTests(TestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        self.accommodation = PropertyListing.objects.create(
+            creator=self.user,
+            title="Pousada",
+            description="Pousada no litoral.",
+            uf="BA",
+            postal_code="40000-000",
+        )
+        today = timezone.localdate()
+        self.bookings = {}
+        for name, start, end, active in [
+            ("past", -10, -5, True),
+            ("cancelled", -4, -2, False),
+            ("active", -1, 2, True),
+            ("cancelled_next", 3, 5, False),
+        ] + [(f"upcoming_{n}", 10 + n, 12 + n, True) for n in range(12)]:
+            self.bookings[name] = Booking.objects.create(
+                user_booking=self.user,
+                accommodation=self.accommodation,
+                check_in_date=today + timedelta(days=start),
+                check_out_date=today + timedelta(days=end),
+                price=Decimal("100.00"),
+                is_active=active,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [booking["id_booking"] for booking in response.json()["results"]]
+
+    def expected(self, *names):
+        return [str(self.bookings[name].pk) for name in names]
+
+    def test_period_filters(self):
+        self.assertEqual(
+            self.ids(self.client.get("/bookings/?period=past")),
+            self.expected("cancelled", "past"),
+        )
+        self.assertEqual(
+            self.ids(self.client.get("/bookings/?period=active")),
+            self.expected("active"),
+        )
+        self.assertEqual(
+            self.ids(self.client.get("/bookings/?period=upcoming")),
+            self.expected(*(f"upcoming_{n}" for n in range(10))),
+        )
+        response = self.client.get("/bookings/?period=soon")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("period", response.json())
+
+    def test_pages_follow_the_cursor_with_constant_queries(self):
+        path = "/bookings/?period=upcoming&expand=accommodation"
+        seen, counts = [], []
+        while path:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path)
+            counts.append(len(queries))
+            seen += self.ids(response)
+            body = response.json()
+            self.assertNotIn("count", body)
+            self.assertEqual(
+                body["results"][0]["accommodation_card"]["title"], "Pousada"
+            )
+            path = body["next"]
+        self.assertEqual(seen, self.expected(*(f"upcoming_{n}" for n in range(12))))
+        self.assertEqual(counts, [1, 1])
+
+        response = self.client.get("/bookings/")
+        self.assertNotIn("accommodation_card", response.json()["results"][0])
+        self.assertEqual(len(self.ids(response)), 10)
+        response = self.client.get("/bookings/?expand=owner")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_keeps_ties_on_the_ordering_field(self):
+        # Várias reservas com o mesmo check-in, em acomodações diferentes.
+        check_in = self.bookings["upcoming_0"].check_in_date
+        ties = [self.bookings["upcoming_0"]]
+        for index in range(11):
+            listing = PropertyListing.objects.create(
+                creator=self.user,
+                title=f"Chalé {index}",
+                description="Chalé.",
+                uf="BA",
+                postal_code="40000-000",
+            )
+            ties.append(
+                Booking.objects.create(
+                    user_booking=self.user,
+                    accommodation=listing,
+                    check_in_date=check_in,
+                    check_out_date=check_in + timedelta(days=2),
+                    price=Decimal("100.00"),
+                )
+            )
+        expected = [str(booking.pk) for booking in sorted(ties, key=lambda b: b.pk)]
+        expected += self.expected(*(f"upcoming_{n}" for n in range(1, 12)))
+
+        path, pages = "/bookings/?period=upcoming", []
+        while path:
+            body = self.client.get(path).json()
+            pages.append([booking["id_booking"] for booking in body["results"]])
+            path = body["next"]
+        self.assertEqual(sum(pages, []), expected)
+
+        body = self.client.get(body["previous"]).json()
+        self.assertEqual(
+            [booking["id_booking"] for booking in body["results"]], pages[-2]
+        )
+        self.assertEqual(self.client.get("/bookings/?cursor=cD14").status_code, 404)
+
+
+class QuoteTests(TestCase):
+    def setUp(self):
+        host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        listing = dict(
+            creator=host, description="Anúncio.", uf="MG", cleaning_fee=Decimal("0")
+        )
+        self.cabin = PropertyListing.objects.create(
+            title="Cabana",
+            postal_code="37000-000",
+            price=Decimal("250.00"),
+            price_per_night=Decimal("232.50"),
+            **listing,
+        )
+        # Sem `price`, a cotação usa `price_per_night`.
+        self.loft = PropertyListing.objects.create(
+            title="Loft",
+            postal_code="30000-000",
+            price=None,
+            price_per_night=Decimal("199.99"),
+            **listing,
+        )
+
+    def test_quotes_match_decimal_total_price(self):
+        check_in = date(2030, 3, 1)
+        stays = [
+            (listing, check_in, check_in + timedelta(days=nights))
+            for listing in (self.cabin, self.loft)
+            for nights in (1, 3, 4, 7, 8, 30)
+        ]
+        payload = {
+            "stays": [
+                {
+                    "accommodation": str(listing.id_accommodation),
+                    "check_in_date": str(check_in),
+                    "check_out_date": str(check_out),
+                }
+                for listing, check_in, check_out in stays
+            ]
+        }
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/quotes/", payload, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+        for (listing, check_in, check_out), quote in zip(
+            stays, response.json()["quotes"]
+        ):
+            price = listing.price or listing.price_per_night
+            expected = pricing.stay_total(price, (check_out - check_in).days)
+            self.assertEqual(quote["total_price"], str(expected))
+
+    def test_one_range_across_many_listings(self):
+        response = self.client.post(
+            "/quotes/",
+            {
+                "accommodations": [
+                    str(self.cabin.id_accommodation),
+                    str(self.loft.id_accommodation),
+                ],
+                "check_in_date": "2030-03-01",
+                "check_out_date": "2030-03-06",
+            },
+            content_type="application/json",
+        )
+        quotes = response.json()["quotes"]
+        self.assertEqual([q["total_price"] for q in quotes], ["1375.00", "1099.94"])
+        self.assertEqual(quotes[0]["tax_rate"], "1.10")
+
+        response = self.client.post(
+            "/quotes/",
+            {
+                "accommodations": [str(self.cabin.id_accommodation)],
+                "check_in_date": "2030-03-06",
+                "check_out_date": "2030-03-06",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_quotes_use_nightly_rates_and_cleaning_fee(self):
+        PropertyListing.objects.filter(pk=self.cabin.pk).update(
+            cleaning_fee=Decimal("80.00")
+        )
+        client = APIClient()
+        client.force_authenticate(self.cabin.creator)
+        weekend = [
+            {"date": "2030-03-08", "price": "400.00", "label": "Fim de semana"},
+            {"date": "2030-03-09", "price": "400.00", "label": "Fim de semana"},
+        ]
+        rates_url = f"/accommodations/{self.cabin.id_accommodation}/rates/"
+        self.assertEqual(
+            client.post(rates_url, weekend, format="json").status_code, 200
+        )
+        weekend[1]["price"] = "420.00"
+        self.assertEqual(
+            client.post(rates_url, weekend, format="json").status_code, 200
+        )
+        self.assertEqual(len(client.get(rates_url).json()), 2)
+
+        def quote():
+            response = self.client.post(
+                "/quotes/",
+                {
+                    "accommodations": [str(self.cabin.id_accommodation)],
+                    "check_in_date": "2030-03-05",
+                    "check_out_date": "2030-03-12",
+                },
+                content_type="application/json",
+            )
+            return response.json()["quotes"][0]
+
+        subtotal = Decimal("250.00") * 5 + Decimal("400.00") + Decimal("420.00")
+        self.assertEqual(quote()["subtotal"], str(subtotal))
+        self.assertEqual(
+            quote()["total_price"],
+            str((subtotal * Decimal("1.10")).quantize(Decimal("0.01")) + 80),
+        )
+
+        # Alterações fora da API (admin, shell) invalidam o cache via sinal.
+        NightlyRate.objects.get(accommodation=self.cabin, date="2030-03-09").delete()
+        self.assertEqual(quote()["subtotal"], str(Decimal("250.00") * 6 + 400))
+
+    def test_vectorized_totals_match_decimal_path(self):
+        rng = random.Random(7)
+        prices = [Decimal(rng.randrange(1, 10**7)) / 100 for _ in range(2000)]
+        nights = [rng.randrange(1, 400) for _ in prices]
+        totals = pricing.stay_totals(pricing.to_cents(prices), nights)
+        for price, count, total in zip(prices, nights, totals):
+            self.assertEqual(
+                pricing.format_cents(total), str(pricing.stay_total(price, count))
+            )
+
+
+class FeeScheduleTests(TestCase):
+    def test_batch_path_matches_decimal_path(self):
+        cents = list(range(0, 300_001, 3)) + [9_999_999_999]
+        net = fees.net_prices(cents)
+        for price, net_cents in zip(cents, net.tolist()):
+            expected = fees.net_price(Decimal(price) / 100)
+            self.assertEqual(pricing.format_cents(net_cents), str(expected))
+
+    def test_simulate_endpoint(self):
+        response = self.client.post(
+            "/pricing/simulate/",
+            {"min_price": "990.00", "max_price": "1010.00", "step": "10.00"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"price": "990.00", "fee": "147.31", "net_price": "842.69"},
+                {"price": "1000.00", "fee": "150.00", "net_price": "850.00"},
+                {"price": "1010.00", "fee": "151.50", "net_price": "858.50"},
+            ],
+        )
+
+        with override_settings(FEE_SIMULATION_MAX_PRICES=2):
+            response = self.client.post(
+                "/pricing/simulate/",
+                {"prices": ["10.00", "20.00", "30.00"]},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+
+
+class FavoritesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        listing = dict(
+            creator=self.guest, description="Anúncio.", uf="SC", city="Floripa"
+        )
+        self.listings = [
+            PropertyListing.objects.create(
+                title=f"Casa {index}", postal_code="88000-000", **listing
+            )
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.guest)
+
+    def favorited(self):
+        response = self.client.get("/accommodations/")
+        return {item["title"] for item in response.json() if item["is_favorited"]}
+
+    def test_favorites_embed_cards_and_flag_listings(self):
+        for listing in self.listings[:2]:
+            response = self.client.post(
+                "/favorites/",
+                {
+                    "accommodation": str(listing.id_accommodation),
+                    "user_favorite_property": str(self.guest.pk),
+                },
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(
+                response.json()["accommodation_card"]["title"], listing.title
+            )
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/favorites/")
+        cards = [favorite["accommodation_card"] for favorite in response.json()]
+        self.assertEqual([card["title"] for card in cards], ["Casa 1", "Casa 0"])
+        self.assertEqual(cards[0]["city"], "Floripa")
+
+        self.assertEqual(self.favorited(), {"Casa 0", "Casa 1"})
+        # Segunda listagem: ids vêm do cache.
+        with CaptureQueriesContext(connection) as queries:
+            self.favorited()
+        self.assertFalse([q for q in queries if "data_favoriteproperty" in q["sql"]])
+
+        favorite = response.json()[0]["id_favorite_property"]
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f"/favorites/{favorite}/")
+        self.assertEqual(response.status_code, 204)
+        # O cache só é descartado depois do commit.
+        self.assertEqual(self.favorited(), {"Casa 0", "Casa 1"})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.favorited(), {"Casa 0"})
+        counts = dict(PropertyListing.objects.values_list("title", "favorite_count"))
+        self.assertEqual(counts, {"Casa 0": 1, "Casa 1": 0, "Casa 2": 0})
+
+    def test_bulk_adds_and_removes_in_single_statements(self):
+        ids = [str(listing.id_accommodation) for listing in self.listings]
+        FavoriteProperty.objects.create(
+            user_favorite_property=self.guest, accommodation=self.listings[0]
+        )
+        PropertyListing.objects.filter(pk=self.listings[0].pk).update(favorite_count=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/favorites/bulk/", {"add": ids}, format="json")
+        self.assertEqual(response.status_code, 200)
+        # O favorito existente não é inserido nem contado de novo.
+        self.assertEqual(response.json()["added"], ids[1:])
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        counts = dict(PropertyListing.objects.values_list("title", "favorite_count"))
+        self.assertEqual(counts, {"Casa 0": 1, "Casa 1": 1, "Casa 2": 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/favorites/bulk/", {"remove": ids[:2]}, format="json"
+            )
+        self.assertEqual(sorted(response.json()["removed"]), sorted(ids[:2]))
+        deletes = [q for q in queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+
+        counts = dict(PropertyListing.objects.values_list("title", "favorite_count"))
+        self.assertEqual(counts, {"Casa 0": 0, "Casa 1": 0, "Casa 2": 1})
+        self.assertEqual(self.favorited(), {"Casa 2"})
+
+        response = self.client.post(
+            "/favorites/bulk/", {"add": [ids[0]], "remove": [ids[0]]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class PopularityCounterTests(TestCase):
+    def setUp(self):
+        self.guest = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        listing = dict(creator=self.guest, description="Anúncio.", uf="SC")
+        self.calm, self.busy = [
+            PropertyListing.objects.create(
+                title=title, postal_code="88000-000", **listing
+            )
+            for title in ("Calma", "Movimentada")
+        ]
+
+    def book(self, listing, days_from_now):
+        check_in = date.today() + timedelta(days=days_from_now)
+        return Booking.objects.create(
+            user_booking=self.guest,
+            accommodation=listing,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=2),
+            price=Decimal("100.00"),
+        )
+
+    def counts(self, listing):
+        listing.refresh_from_db()
+        return (
+            listing.favorite_count,
+            listing.booking_count,
+            listing.bookings_last_30_days,
+        )
+
+    def test_counters_follow_writes_refresh_and_reconcile(self):
+        old = self.book(self.calm, 10)
+        for offset in (20, 30):
+            self.book(self.busy, offset)
+        FavoriteProperty.objects.create(
+            user_favorite_property=self.guest, accommodation=self.busy
+        )
+        self.assertEqual(self.counts(self.busy), (1, 2, 2))
+
+        response = self.client.get("/accommodations/search/?ordering=popular")
+        self.assertEqual(
+            [item["title"] for item in response.json()], ["Movimentada", "Calma"]
+        )
+
+        # A reserva sai da janela de 30 dias sem nenhuma escrita.
+        Booking.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        self.assertEqual(self.counts(self.calm), (0, 1, 1))
+        call_command("refresh_popularity", stdout=StringIO())
+        self.assertEqual(self.counts(self.calm), (0, 1, 0))
+
+        old.refresh_from_db()
+        old.delete()
+        self.assertEqual(self.counts(self.calm), (0, 0, 0))
+
+        PropertyListing.objects.filter(pk=self.busy.pk).update(booking_count=9)
+        out = StringIO()
+        call_command("reconcile_counters", "--dry-run", stdout=out)
+        self.assertIn("booking_count 9 -> 2", out.getvalue())
+        self.assertEqual(self.counts(self.busy), (1, 9, 2))
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(self.counts(self.busy), (1, 2, 2))
+
+
+class HostDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        self.guest = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        listing = dict(creator=self.host, description="Anúncio.", uf="SC")
+        self.beach, self.cabin = [
+            PropertyListing.objects.create(
+                title=title, postal_code="88000-000", **listing
+            )
+            for title in ("Casa na praia", "Chalé")
+        ]
+        today = timezone.localdate()
+        for accommodation, start, end, price, active in [
+            (self.beach, -40, -25, "1500.00", True),
+            (self.beach, -3, 2, "500.00", True),
+            (self.beach, 5, 7, "200.00", True),
+            (self.beach, 9, 12, "900.00", False),
+            (self.cabin, 1, 3, "300.00", True),
+        ]:
+            Booking.objects.create(
+                user_booking=self.guest,
+                accommodation=accommodation,
+                check_in_date=today + timedelta(days=start),
+                check_out_date=today + timedelta(days=end),
+                price=Decimal(price),
+                is_active=active,
+            )
+        for rating in (4, 5):
+            Review.objects.create(
+                accommodation=self.beach,
+                user_comment=self.guest,
+                rating=rating,
+                comment="Ótimo.",
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.host)
+        self.path = f"/users/{self.host.pk}/dashboard/"
+
+    def test_dashboard_is_one_query_and_cached_until_a_booking_changes(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        data = response.json()
+        self.assertEqual(
+            data["totals"],
+            {
+                "listings": 2,
+                "bookings": 4,
+                "revenue": "2500.00",
+                # 5 noites da primeira reserva e 3 da segunda caem na janela.
+                "nights_booked": 8,
+                "occupancy_rate": round(8 / 60, 4),
+                "upcoming_check_ins": 2,
+                "next_check_in": str(timezone.localdate() + timedelta(days=1)),
+                "review_count": 2,
+                "average_rating": 4.5,
+            },
+        )
+        beach = next(row for row in data["listings"] if row["title"] == "Casa na praia")
+        self.assertEqual(beach["average_rating"], 4.5)
+        self.assertEqual(beach["revenue"], "2200.00")
+
+        with self.assertNumQueries(0):
+            self.client.get(self.path)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Booking.objects.create(
+                user_booking=self.guest,
+                accommodation=self.cabin,
+                check_in_date=timezone.localdate() + timedelta(days=20),
+                check_out_date=timezone.localdate() + timedelta(days=22),
+                price=Decimal("100.00"),
+            )
+        # Até o commit, o painel em cache continua valendo.
+        self.assertEqual(self.client.get(self.path).json()["totals"]["bookings"], 4)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.path).json()["totals"]["bookings"], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                accommodation=self.cabin,
+                user_comment=self.guest,
+                rating=3,
+                comment="Ok.",
+            )
+        self.assertEqual(self.client.get(self.path).json()["totals"]["review_count"], 3)
+
+    def test_only_the_host_sees_the_dashboard(self):
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.client.get(self.path).status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.path).status_code, 401)
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        self.guest = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        listing = dict(creator=self.host, description="Anúncio.", uf="SC")
+        self.beach = PropertyListing.objects.create(
+            title="Casa", city="Floripa", postal_code="88000-000", **listing
+        )
+        self.cabin = PropertyListing.objects.create(
+            title="Chalé", city="Urubici", postal_code="88650-000", **listing
+        )
+        self.day = date(2030, 1, 10)
+        self.first = self.book(self.beach, 0, 3, "100.00")
+        self.second = self.book(self.cabin, 1, 3, "300.00")
+        self.cancelled = self.book(self.cabin, 5, 6, "50.00", is_active=False)
+        # Reservas gravadas bem antes da marca d'água.
+        Booking.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def book(self, accommodation, start, end, price, **extra):
+        return Booking.objects.create(
+            user_booking=self.guest,
+            accommodation=accommodation,
+            check_in_date=self.day + timedelta(days=start),
+            check_out_date=self.day + timedelta(days=end),
+            price=Decimal(price),
+            **extra,
+        )
+
+    def rows(self, model, *fields):
+        return list(
+            model.objects.order_by("day", *fields).values_list(
+                "day", *fields, "nights", "revenue"
+            )
+        )
+
+    def test_incremental_updates_follow_changes_and_deletions(self):
+        self.assertEqual(rollups.update_rollups()["listings"], 2)
+        d = [self.day + timedelta(days=n) for n in range(4)]
+        self.assertEqual(
+            self.rows(ListingDailyStats, "accommodation__title"),
+            [
+                (d[0], "Casa", 1, Decimal("33.33")),
+                (d[1], "Casa", 1, Decimal("33.33")),
+                (d[1], "Chalé", 1, Decimal("150.00")),
+                (d[2], "Casa", 1, Decimal("33.34")),
+                (d[2], "Chalé", 1, Decimal("150.00")),
+            ],
+        )
+        self.assertEqual(
+            self.rows(UfDailyStats, "uf"),
+            [
+                (d[0], "SC", 1, Decimal("33.33")),
+                (d[1], "SC", 2, Decimal("183.33")),
+                (d[2], "SC", 2, Decimal("183.34")),
+            ],
+        )
+        self.assertEqual(rollups.update_rollups()["listings"], 0)
+
+        self.first.delete()
+        self.second.check_in_date = d[2]
+        self.second.check_out_date = d[3]
+        self.second.save()
+        self.assertEqual(RollupInvalidation.objects.count(), 2)
+        rollups.update_rollups()
+        self.assertEqual(
+            self.rows(CityDailyStats, "city"),
+            [(d[2], "Urubici", 1, Decimal("300.00"))],
+        )
+        self.assertEqual(
+            self.rows(UfDailyStats, "uf"), [(d[2], "SC", 1, Decimal("300.00"))]
+        )
+        self.assertFalse(RollupInvalidation.objects.exists())
+
+    def test_report_reads_rollups(self):
+        rollups.update_rollups()
+        client = APIClient()
+        client.force_authenticate(self.host)
+        params = {"start": "2030-01-01", "end": "2030-01-11"}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/reports/daily/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("data_booking", " ".join(q["sql"] for q in queries))
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "accommodation_id": str(self.beach.pk),
+                    "nights": 1,
+                    "revenue": "33.33",
+                    "occupancy_rate": 0.1,
+                }
+            ],
+        )
+
+        params.update(level="city", end="2030-02-01")
+        self.assertEqual(client.get("/reports/daily/", params).status_code, 403)
+        self.guest.is_staff = True
+        self.guest.save()
+        client.force_authenticate(self.guest)
+        response = client.get("/reports/daily/", {**params, "city": "urubici"})
+        self.assertEqual(
+            response.json()["results"],
+            [{"uf": "SC", "city": "Urubici", "nights": 2, "revenue": "300.00"}],
+        )
+        response = client.get(
+            "/reports/daily/", {**params, "accommodation_id": self.beach.pk}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("accommodation_id", str(response.json()))
+
+
+class ApiMiddlewareTests(TestCase):
+    def test_api_skips_session_csrf_and_messages_but_admin_keeps_them(self):
+        client = Client(enforce_csrf_checks=True)
+        api = client.get("/")
+        self.assertEqual(api.status_code, 200)
+        self.assertFalse(hasattr(api.wsgi_request, "session"))
+        self.assertFalse(hasattr(api.wsgi_request, "_messages"))
+        self.assertNotIn("csrftoken", api.cookies)
+
+        admin = client.get("/admin/login/")
+        self.assertTrue(hasattr(admin.wsgi_request, "session"))
+        self.assertIn("csrftoken", admin.cookies)
+        self.assertEqual(client.post("/admin/login/", {}).status_code, 403)
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        for index in range(3):
+            PropertyListing.objects.create(
+                creator=host, title=f"Casa {index}", description="Casa."
+            )
+
+    def test_headers_report_query_count_and_db_time(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/accommodations/")
+        self.assertEqual(response["X-Query-Count"], str(len(queries)))
+        self.assertRegex(
+            response["Server-Timing"],
+            rf'^db;dur=[\d.]+;desc="{len(queries)} consultas", total;dur=[\d.]+$',
+        )
+
+    def test_requests_over_the_limit_log_query_shapes(self):
+        config = {**settings.QUERY_INSTRUMENTATION, "MAX_QUERIES": 1}
+        with override_settings(QUERY_INSTRUMENTATION=config), self.assertLogs(
+            "my_logger", "WARNING"
+        ) as logs:
+            response = self.client.get("/accommodations/")
+        # As reservas das acomodações listadas vêm de uma única consulta.
+        self.assertEqual(response["X-Query-Count"], "2")
+        (message,) = [line for line in logs.output if "Requisição lenta" in line]
+        self.assertRegex(message, r'1x \([\d.]+ ms\) SELECT .* FROM "data_booking"')
+
+    def test_slow_queries_are_logged_once_per_shape_with_plan(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "slow.jsonl")
+        config = {
+            **settings.SLOW_QUERY_LOG,
+            "THRESHOLD_MS": 0,
+            "INTERVAL_SECONDS": 60,
+            "PATH": path,
+        }
+        instrumentation.slow_query_log.reset()
+        self.addCleanup(instrumentation.slow_query_log.reset)
+        self.addCleanup(instrumentation.slow_query_log.close)
+        listing = PropertyListing.objects.first()
+
+        with override_settings(SLOW_QUERY_LOG=config), self.assertLogs("my_logger"):
+            first = self.client.get(f"/reviews/?accommodation_id={listing.pk}")
+            self.client.get(f"/reviews/?accommodation_id={listing.pk}")
+        # O registro é gravado pela thread do QueueListener.
+        instrumentation.slow_query_log.close()
+
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+        # O EXPLAIN não entra na contagem da requisição.
+        self.assertEqual(first["X-Query-Count"], "1")
+        self.assertEqual(len(records), 1)
+        (record,) = records
+        self.assertEqual(record["view"], "ReviewViewSet.list")
+        self.assertEqual(record["param_types"], ["str"])
+        self.assertTrue(record["location"].startswith("quickhost/api/viewsets.py:"))
+        self.assertTrue(record["plan"])
+        self.assertNotIn("EXPLAIN falhou", record["plan"][0])
+
+        with override_settings(SLOW_QUERY_LOG=config):
+            self.client.get(f"/reviews/?accommodation_id={listing.pk}")
+        instrumentation.slow_query_log.close()
+        output = StringIO()
+        call_command("slow_queries", path=path, stdout=output)
+        self.assertIn('FROM "data_review"', output.getvalue())
+
+    def test_slow_query_log_rotates(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "slow.jsonl")
+        config = {
+            **settings.SLOW_QUERY_LOG,
+            "THRESHOLD_MS": 0,
+            "PATH": path,
+            "MAX_BYTES": 100,
+            "BACKUP_COUNT": 1,
+        }
+        instrumentation.slow_query_log.reset()
+        self.addCleanup(instrumentation.slow_query_log.reset)
+        self.addCleanup(instrumentation.slow_query_log.close)
+
+        with override_settings(SLOW_QUERY_LOG=config), self.assertLogs("my_logger"):
+            self.client.get("/accommodations/")
+            self.client.get("/reviews/")
+        instrumentation.slow_query_log.close()
+
+        self.assertEqual(sorted(os.listdir(directory)), ["slow.jsonl", "slow.jsonl.1"])
+
+    def test_sql_shape_groups_values(self):
+        self.assertEqual(
+            instrumentation.sql_shape(
+                "SELECT * FROM t WHERE id IN (%s, %s, %s) AND kind = 'a' LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE id IN (...) AND kind = ? LIMIT ?",
+        )
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(
+            METRICS={**settings.METRICS, "DIRECTORY": directory, "TOKEN": "secret"}
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        self.directory = directory
+
+    def scrape(self):
+        return self.client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer secret"
+        ).content.decode()
+
+    def test_metrics_merge_snapshots_from_every_process(self):
+        self.client.get("/accommodations/")
+        self.client.get("/accommodations/")
+        labels = ["AccommodationViewSet.list", "accommodations/", "GET"]
+        # Snapshot gravado por outro worker.
+        with open(os.path.join(self.directory, "999-other.json"), "w") as file:
+            json.dump(
+                {
+                    "counters": [["quickhost_requests_total", labels + ["200"], 3]],
+                    "histograms": [
+                        [
+                            "quickhost_request_duration_seconds",
+                            labels,
+                            [1] + [0] * len(metrics.LATENCY_BUCKETS),
+                            0.004,
+                        ]
+                    ],
+                },
+                file,
+            )
+
+        body = self.scrape()
+        selector = (
+            'view="AccommodationViewSet.list",route="accommodations/",method="GET"'
+        )
+        self.assertIn(f'quickhost_requests_total{{{selector},status="200"}} 5.0', body)
+        self.assertIn(f"quickhost_request_duration_seconds_count{{{selector}}} 3", body)
+        self.assertIn(
+            f'quickhost_request_duration_seconds_bucket{{{selector},le="+Inf"}} 3', body
+        )
+        self.assertRegex(body, rf"quickhost_db_queries_total{{{selector}}} \d")
+
+    def test_cache_hits_are_recorded_per_view(self):
+        host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        listing = PropertyListing.objects.create(
+            creator=host,
+            title="Casa",
+            description="Casa.",
+            price_per_night=Decimal("100.00"),
+            cleaning_fee=Decimal("0.00"),
+        )
+        pricing.calendar_cache().clear()
+        stay = {
+            "stays": [
+                {
+                    "accommodation": str(listing.pk),
+                    "check_in_date": "2031-01-01",
+                    "check_out_date": "2031-01-03",
+                }
+            ]
+        }
+        for _ in range(3):
+            self.client.post("/quotes/", stay, content_type="application/json")
+
+        body = self.scrape()
+        selector = 'view="QuoteView.post",cache="rate_calendar"'
+        self.assertIn(
+            f'quickhost_cache_requests_total{{{selector},result="hit"}} 2.0', body
+        )
+        self.assertIn(
+            f'quickhost_cache_requests_total{{{selector},result="miss"}} 1.0', body
+        )
+
+    def test_metrics_require_a_token_outside_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(METRICS={**settings.METRICS, "TOKEN": ""}):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            with override_settings(DEBUG=True):
+                self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_flush_failures_are_logged(self):
+        blocked = os.path.join(self.directory, "file")
+        open(blocked, "w").close()
+        with override_settings(
+            METRICS={**settings.METRICS, "DIRECTORY": blocked}
+        ), self.assertLogs("quickhost.api.metrics", "WARNING"):
+            metrics.registry.flush()
+
+
+class ProfilingTests(TestCase):
+    def test_authorized_header_profiles_request_and_rotates_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        host = UserAccount.objects.create_user(
+            email="host@quickhost.test", username="host", password=None
+        )
+        PropertyListing.objects.create(creator=host, title="Casa", description="Casa.")
+        config = {
+            "TOKEN": "segredo",
+            "SAMPLE_RATE": 0,
+            "DIRECTORY": directory,
+            "MAX_FILES": 2,
+        }
+
+        with override_settings(PROFILING=config):
+            self.assertNotIn(
+                "X-Profile-Id", self.client.get("/accommodations/", HTTP_X_PROFILE="x")
+            )
+            ids = [
+                self.client.get("/accommodations/", HTTP_X_PROFILE="segredo")[
+                    "X-Profile-Id"
+                ]
+                for _ in range(3)
+            ]
+            self.assertEqual(profiling.list_profiles(directory), sorted(ids)[1:])
+
+            with open(os.path.join(directory, f"{ids[-1]}.json")) as file:
+                meta = json.load(file)
+            self.assertEqual(meta["view"], "AccommodationViewSet.list")
+            self.assertEqual(meta["route"], "accommodations/")
+            self.assertEqual(meta["query_count"], 2)
+
+            output = StringIO()
+            call_command("profile_report", filter="quickhost", stdout=output)
+        self.assertIn(f"id: {ids[-1]}", output.getvalue())
+        self.assertIn("viewsets.py", output.getvalue())
+
+    async def test_async_handler_profiles_sync_views(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        config = {
+            "TOKEN": "segredo",
+            "SAMPLE_RATE": 0,
+            "DIRECTORY": directory,
+            "MAX_FILES": 2,
+        }
+        with override_settings(PROFILING=config):
+            response = await self.async_client.get(
+                "/accommodations/", headers={"X-Profile": "segredo"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(profiling.list_profiles(directory), [response["X-Profile-Id"]])
+        stats = pstats.Stats(
+            os.path.join(directory, f"{response['X-Profile-Id']}.prof")
+        )
+        self.assertTrue(
+            any(filename.endswith("viewsets.py") for filename, _, _ in stats.stats)
+        )
+
+    def test_concurrent_request_is_served_without_profile(self):
+        config = {
+            "TOKEN": "segredo",
+            "SAMPLE_RATE": 0,
+            "DIRECTORY": tempfile.mkdtemp(),
+            "MAX_FILES": 2,
+        }
+        self.addCleanup(shutil.rmtree, config["DIRECTORY"])
+        with override_settings(PROFILING=config), profiling._active:
+            response = self.client.get("/accommodations/", HTTP_X_PROFILE="segredo")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(profiling.list_profiles(config["DIRECTORY"]), [])
+
+
+class QueueLogHandlerTests(SimpleTestCase):
+    def test_records_are_sampled_then_dropped_when_queue_backs_up(self):
+        class BlockingStream(StringIO):
+            def __init__(self):
+                super().__init__()
+                self.writing = threading.Event()
+                self.release = threading.Event()
+
+            def write(self, text):
+                self.writing.set()
+                self.release.wait(5)
+                return super().write(text)
+
+        class Probe:
+            formatted = 0
+
+            def __str__(self):
+                Probe.formatted += 1
+                return "probe"
+
+        stream = BlockingStream()
+        handler = log.QueueLogHandler(
+            stream, maxsize=4, sample_above=0.5, sample_rate=10**9
+        )
+        handler.setFormatter(log.JsonFormatter())
+        logger = logging.getLogger("quickhost.tests.queue")
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+        logger.info("a")
+        # O listener está preso escrevendo "a"; a fila começa vazia.
+        self.assertTrue(stream.writing.wait(5))
+        logger.info("b %s", 1)
+        logger.info("c")
+        logger.info("d %s", Probe())  # fila na metade: amostrado
+        logger.warning("e")
+        logger.warning("f", extra={"booking": "x"})
+        logger.warning("g")  # fila cheia
+        stream.release.set()
+        handler.stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(
+            [line["message"] for line in lines], ["a", "b 1", "c", "e", "f"]
+        )
+        self.assertEqual(lines[-1]["level"], "WARNING")
+        self.assertEqual(lines[-1]["booking"], "x")
+        self.assertEqual(Probe.formatted, 0)
+        self.assertEqual(
+            handler.dropped, {("INFO", "sampled"): 1, ("WARNING", "full"): 1}
+        )
+        counters = {
+            (name, tuple(labels)): value
+            for name, labels, value in metrics.registry.snapshot()["counters"]
+        }
+        self.assertEqual(
+            counters[("quickhost_log_records_dropped_total", ("INFO", "sampled"))], 1
+        )
+
+
+class BenchmarkRegressionTests(SimpleTestCase):
+    def test_regressions_respect_threshold_and_query_counts(self):
+        baseline = {
+            "endpoints": {
+                "small": {
+                    "list": {"p50_ms": 10.0, "p95_ms": 20.0, "queries_per_request": 2},
+                    "login": {"p50_ms": 0.5, "peak_memory_kib": 100.0},
+                }
+            }
+        }
+        current = {
+            "endpoints": {
+                "small": {
+                    "list": {"p50_ms": 13.0, "p95_ms": 40.0, "queries_per_request": 3},
+                    # Abaixo do ruído de 1 ms, mesmo sendo 3x mais lento.
+                    "login": {"p50_ms": 1.5, "peak_memory_kib": 110.0},
+                    "search": {"p50_ms": 50.0},
+                },
+            }
+        }
+        regressions = benchmarks.find_regressions(baseline, current, threshold=0.25)
+        self.assertEqual(
+            [regression.split(":")[0] for regression in regressions],
+            [
+                "endpoints.small.list.p50_ms",
+                "endpoints.small.list.queries_per_request",
+            ],
+        )
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SeedDataTests(TestCase):
+    def test_generated_rows_are_consistent(self):
+        result = seeding.seed_data(
+            users=30, listings=12, bookings=120, reviews=24, favorites=60, seed=7
+        )
+        self.assertEqual(
+            {label: rows for label, (rows, _) in result.items()},
+            {
+                "usuários": 30,
+                "acomodações": 12,
+                "reservas": 120,
+                "avaliações": 24,
+                "favoritos": 60,
+            },
+        )
+
+        user = UserAccount.objects.first()
+        self.assertTrue(user.check_password("quickhost123"))
+        self.assertRegex(user.cpf, r"^\d{11}$")
+
+        for listing in PropertyListing.objects.all():
+            self.assertEqual(listing.price_per_night, fees.net_price(listing.price))
+            self.assertEqual(
+                listing.final_price, listing.price_per_night + listing.cleaning_fee
+            )
+            self.assertRegex(listing.postal_code, r"^\d{5}-\d{3}$")
+
+            previous_check_out = None
+            for booking in listing.accommodation_bookings.order_by("check_in_date"):
+                if previous_check_out:
+                    self.assertGreaterEqual(booking.check_in_date, previous_check_out)
+                nights = (booking.check_out_date - booking.check_in_date).days
+                self.assertEqual(
+                    booking.price,
+                    pricing.stay_total(listing.price, nights) + listing.cleaning_fee,
+                )
+                if listing.is_active:
+                    self.assertEqual(
+                        booking.price,
+                        pricing.stay_price(
+                            listing, booking.check_in_date, booking.check_out_date
+                        ),
+                    )
+                previous_check_out = booking.check_out_date
+
+        rated = PropertyListing.objects.exclude(average_rating=0).first()
+        ratings = list(rated.reviews.values_list("rating", flat=True))
+        self.assertEqual(
+            rated.average_rating,
+            round(Decimal(sum(ratings)) / len(ratings), 2),
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "restrição exclusiva do PostgreSQL")
+class PostgresBookingOverlapTests(TestCase):
+    def test_overlapping_active_bookings_are_rejected(self):
+        user = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        accommodation = PropertyListing.objects.create(
+            creator=user,
+            title="Chalé",
+            description="Chalé na serra.",
+            uf="RS",
+            postal_code="95670-000",
+        )
+        stay = dict(
+            user_booking=user,
+            accommodation=accommodation,
+            price=100,
+        )
+        Booking.objects.create(
+            check_in_date=date(2030, 1, 1), check_out_date=date(2030, 1, 5), **stay
+        )
+        Booking.objects.create(
+            check_in_date=date(2030, 1, 5), check_out_date=date(2030, 1, 8), **stay
+        )
+        with self.assertRaises(IntegrityError) as caught, transaction.atomic():
+            Booking.objects.create(
+                check_in_date=date(2030, 1, 4), check_out_date=date(2030, 1, 6), **stay
+            )
+        self.assertEqual(
+            serializers.violated_constraint(caught.exception),
+            serializers.BOOKING_OVERLAP_CONSTRAINT,
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "usa EXPLAIN QUERY PLAN do SQLite")
+class QueryPlanTests(TestCase):
+    """Garante que os endpoints registrados não fazem varredura completa de tabelas."""
+
+    SCAN = re.compile(r"^SCAN (\w+)")
+
+    def setUp(self):
+        self.user = UserAccount.objects.create_user(
+            email="guest@quickhost.test", username="guest", password=None
+        )
+        self.accommodation = PropertyListing.objects.create(
+            creator=self.user,
+            title="Apartamento",
+            description="Apartamento no centro.",
+            uf="SP",
+            postal_code="01000-000",
+        )
+        Review.objects.create(
+            accommodation=self.accommodation,
+            user_comment=self.user,
+            rating=4,
+            comment="Bom apartamento. " * 8,
+        )
+        Booking.objects.create(
+            user_booking=self.user,
+            accommodation=self.accommodation,
+            check_in_date=date(2030, 1, 1),
+            check_out_date=date(2030, 1, 3),
+            price=100,
+        )
+        FavoriteProperty.objects.create(
+            user_favorite_property=self.user, accommodation=self.accommodation
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertNoFullScans(self, path, allowed=()):
+        """Executa EXPLAIN QUERY PLAN em cada SELECT feito pelo endpoint."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+
+        for query in queries:
+            if not query["sql"].startswith("SELECT"):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = [row[-1] for row in cursor.fetchall()]
+            for detail in plan:
+                match = self.SCAN.match(detail)
+                if match and match.group(1) not in allowed:
+                    self.fail(
+                        f"{path}: varredura completa ({detail}) em {query['sql']}"
+                    )
+
+    def test_endpoints_use_indexes(self):
+        user_id = self.user.id_user
+        accommodation_id = self.accommodation.id_accommodation
+        endpoints = {
+            f"/accommodations/?user_id={user_id}": (),
+            f"/reviews/?accommodation_id={accommodation_id}": (),
+            f"/reviews/{accommodation_id}/": (),
+            "/bookings/": (),
+            "/bookings/?period=upcoming&expand=accommodation": (),
+            "/bookings/?period=past": (),
+            f"/users/{user_id}/dashboard/": (),
+            "/favorites/": (),
+            # Listagens sem filtro percorrem a tabela inteira por definição.
+            "/accommodations/": ("data_propertylisting",),
+            "/reviews/": ("data_review",),
+        }
+        for path, allowed in endpoints.items():
+            with self.subTest(path=path):
+                self.assertNoFullScans(path, allowed)
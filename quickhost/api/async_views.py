@@ -0,0 +1,232 @@
+"""
+Variantes assíncronas dos endpoints de leitura mais acessados.
+
+Estas views usam o ORM assíncrono do Django (`aget`, `async for`) e devem
+ser servidas por um servidor ASGI (`quickhost.asgi:application`), onde uma
+requisição aguardando o banco não prende uma thread do worker. As respostas
+têm o mesmo formato das views síncronas correspondentes, inclusive o
+`is_favorited` das acomodações para quem envia o token JWT.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions, serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from uuid import UUID
+import json
+
+from data import models
+from quickhost.routers import replica_reads
+from .favorites import favorite_ids, with_cards
+from .filters import filter_accommodations
+from .serializers import (
+    AccommodationSerializer,
+    ReviewSerializer,
+    FavoritePropertySerializer,
+    booking_id_rows,
+    group_booking_ids,
+)
+
+accommodations = models.PropertyListing.objects.all()
+reviews = models.Review.objects.select_related("user_comment")
+
+
+def render(data, status=status.HTTP_200_OK):
+    """Renderiza a resposta com o mesmo JSONRenderer usado pelo DRF."""
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def with_favorites(view):
+    """
+    Autentica o token JWT, como as views síncronas, e guarda em
+    `request.serializer_context` os `favorite_ids` do usuário (vazio para
+    requisições anônimas). Um token inválido responde 401.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(JWTAuthentication().authenticate)(
+                request
+            )
+        except exceptions.AuthenticationFailed as e:
+            return render(e.detail, status=e.status_code)
+        request.serializer_context = {}
+        if authenticated is not None:
+            user, _ = authenticated
+            request.serializer_context["favorite_ids"] = await sync_to_async(
+                favorite_ids
+            )(user.pk)
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def accommodation_list_data(items, context):
+    """Serializa acomodações já carregadas, com os ids das reservas em uma consulta."""
+    rows = booking_id_rows([item.pk for item in items])
+    booking_ids = group_booking_ids([row async for row in rows])
+    data = AccommodationSerializer(
+        items, many=True, context={**context, "booking_ids": booking_ids}
+    ).data
+    for item, original in zip(data, items):
+        item["internal_images"] = original.internal_images or []
+    return data
+
+
+@require_GET
+@replica_reads
+@with_favorites
+async def accommodation_list(request):
+    """Lista as acomodações, filtrando por `user_id` quando fornecido."""
+    queryset = accommodations.all()
+    user_id = request.GET.get("user_id")
+    if user_id:
+        try:
+            queryset = queryset.filter(creator__id_user=UUID(user_id)).order_by(
+                "-created_at"
+            )
+        except ValueError:
+            return render(
+                {"detail": "O ID do usuário deve estar no formato UUID."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    items = [item async for item in queryset]
+    return render(await accommodation_list_data(items, request.serializer_context))
+
+
+@require_GET
+@replica_reads
+@with_favorites
+async def accommodation_search(request):
+    """Busca acomodações ativas pelos filtros de `filter_accommodations`."""
+    try:
+        queryset = filter_accommodations(accommodations, request.GET)
+    except serializers.ValidationError as e:
+        return render(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+    items = [item async for item in queryset]
+    return render(await accommodation_list_data(items, request.serializer_context))
+
+
+@require_GET
+@replica_reads
+@with_favorites
+async def accommodation_detail(request, id_accommodation):
+    """Retorna uma acomodação específica."""
+    try:
+        accommodation = await accommodations.aget(id_accommodation=id_accommodation)
+    except models.PropertyListing.DoesNotExist:
+        return render(
+            {"detail": "Acomodação não encontrada."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    (data,) = await accommodation_list_data([accommodation], request.serializer_context)
+    return render(data)
+
+
+@require_GET
+@replica_reads
+async def review_list(request):
+    """Lista as avaliações, opcionalmente de uma acomodação específica."""
+    queryset = reviews.all()
+    accommodation_id = request.GET.get("accommodation_id")
+    if accommodation_id:
+        try:
+            queryset = queryset.filter(
+                accommodation_id=UUID(accommodation_id)
+            ).order_by("-created_at")
+        except ValueError:
+            return render(
+                {"detail": "O ID da acomodação deve estar no formato UUID."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    items = [review async for review in queryset]
+    return render(ReviewSerializer(items, many=True).data)
+
+
+@csrf_exempt
+@require_POST
+async def details(request):
+    """Resolve um UUID para usuário, acomodação ou reserva."""
+    if request.content_type == "application/json":
+        try:
+            uuid_str = json.loads(request.body or b"{}").get("uuid")
+        except (ValueError, AttributeError):
+            uuid_str = None
+    else:
+        uuid_str = request.POST.get("uuid")
+
+    if not uuid_str:
+        return render(
+            {"error": "UUID não fornecido"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        uuid = UUID(uuid_str)
+    except ValueError:
+        return render({"error": "UUID inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = await models.UserAccount.objects.filter(id_user=uuid).afirst()
+    if user:
+        favorites = with_cards(
+            models.FavoriteProperty.objects.filter(user_favorite_property=user)
+        )
+        return render(
+            {
+                "id_user": str(user.id_user),
+                "email": user.email,
+                "username": user.username,
+                "profile_picture": (
+                    user.profile_picture.url if user.profile_picture else None
+                ),
+                "phone_number": user.phone_number,
+                "favorites": FavoritePropertySerializer(
+                    [favorite async for favorite in favorites], many=True
+                ).data,
+            }
+        )
+
+    accommodation = (
+        await models.PropertyListing.objects.filter(id_accommodation=uuid)
+        .only("id_accommodation", "title")
+        .afirst()
+    )
+    if accommodation:
+        return render(
+            {
+                "id_accommodation": str(accommodation.id_accommodation),
+                "title": accommodation.title,
+            }
+        )
+
+    booking = await models.Booking.objects.filter(id_booking=uuid).afirst()
+    if booking:
+        return render(
+            {
+                "booking": str(booking.id_booking),
+                "accommodation": str(booking.accommodation_id),
+                "user": str(booking.user_booking_id),
+                "check_in_date": str(booking.check_in_date),
+                "check_out_date": str(booking.check_out_date),
+            }
+        )
+
+    return render(
+        {
+            "error": "Nenhum dado relacionado a (usuário, acomodação, reservas) encontrado com este UUID"
+        },
+        status=status.HTTP_404_NOT_FOUND,
+    )
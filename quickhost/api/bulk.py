@@ -0,0 +1,57 @@
+"""
+Inserção em lote sem instanciar modelos.
+
+Usada pela geração de dados sintéticos (data/seeding.py) e pelos rollups
+(quickhost/api/rollups.py), que inserem milhares de linhas por execução.
+"""
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+def db_rows(model, names, rows, using):
+    """
+    Converte as linhas (tuplas na ordem de `names`) em valores do banco e
+    completa os demais campos com o default (ou o horário atual, nos campos
+    auto_now e auto_now_add).
+
+    Retorna `(colunas, linhas)`. É o mesmo preparo feito pelo bulk_create,
+    sem instanciar modelos nem compilar um INSERT por lote.
+    """
+    connection = connections[using]
+    now = timezone.now()
+    fields = [model._meta.get_field(name) for name in names]
+    others = [field for field in model._meta.concrete_fields if field not in fields]
+    constants = tuple(
+        field.get_db_prep_save(
+            (
+                now
+                if getattr(field, "auto_now", False)
+                or getattr(field, "auto_now_add", False)
+                else field.get_default()
+            ),
+            connection,
+        )
+        for field in others
+    )
+    prepare = [field.get_db_prep_save for field in fields]
+    columns = [field.column for field in fields + others]
+    return columns, [
+        tuple([prep(value, connection) for prep, value in zip(prepare, row)])
+        + constants
+        for row in rows
+    ]
+
+
+def insert_rows(model, columns, rows, using, batch_size):
+    """Insere as linhas de `db_rows` com executemany, em uma transação."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} "
+        f"({', '.join(map(quote, columns))}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[offset : offset + batch_size])
@@ -0,0 +1,165 @@
+"""
+Contadores desnormalizados de PropertyListing, usados na ordenação por
+popularidade sem GROUP BY sobre favoritos e reservas a cada busca.
+
+- favorite_count: favoritos da acomodação;
+- booking_count: reservas registradas (inclusive canceladas);
+- bookings_last_30_days: reservas criadas nos últimos RECENT_DAYS dias.
+
+Os contadores são atualizados com `F()` (sinais em data/signals.py e
+escritas em lote), então duas requisições simultâneas não perdem
+incrementos. O `delete()` do Django já envia o post_delete dentro da sua
+transação, mas o post_save é enviado depois do INSERT: por isso as escritas
+que criam reservas e favoritos (BookingSerializer, FavoritePropertyViewSet,
+`favorites.add_favorites`) abrem um `transaction.atomic()`, e o contador é
+gravado junto com a linha ou não é gravado. Escritas fora desses caminhos
+(shell, scripts) podem divergir e são corrigidas pelo `recount`. bookings_last_30_days só
+cresce nas escritas: a saída das reservas antigas da janela é feita por
+`refresh_recent_bookings` (`manage.py refresh_popularity`, periódico).
+`find_drift` e `recount` partem das tabelas de origem e corrigem desvios
+(`manage.py reconcile_counters`).
+"""
+
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from data.models import Booking, FavoriteProperty, PropertyListing
+
+RECENT_DAYS = 30
+
+COUNTERS = ("favorite_count", "booking_count", "bookings_last_30_days")
+
+# Linhas lidas por vez nas varreduras de todas as acomodações e acomodações
+# por UPDATE em `recount_ids`.
+BATCH_SIZE = 1000
+
+
+def recent_since():
+    return timezone.now() - timedelta(days=RECENT_DAYS)
+
+
+def adjust(accommodation_ids, using=None, **deltas):
+    """Soma os `deltas` aos contadores das acomodações, em um só UPDATE."""
+    if not accommodation_ids or not deltas:
+        return
+    PropertyListing.objects.using(using).filter(pk__in=accommodation_ids).update(
+        **{
+            # Um contador já desviado para baixo não pode violar o CHECK >= 0
+            # e derrubar a escrita; reconcile_counters corrige o valor.
+            field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        }
+    )
+
+
+def adjust_favorite_counts(accommodation_ids, delta, using=None):
+    adjust(accommodation_ids, using, favorite_count=delta)
+
+
+def booking_deltas(booking, sign):
+    deltas = {"booking_count": sign}
+    if booking.created_at is None or booking.created_at >= recent_since():
+        deltas["bookings_last_30_days"] = sign
+    return deltas
+
+
+def booking_added(booking, using=None):
+    adjust([booking.accommodation_id], using, **booking_deltas(booking, 1))
+
+
+def booking_removed(booking, using=None):
+    adjust([booking.accommodation_id], using, **booking_deltas(booking, -1))
+
+
+def booking_moved(booking, previous_accommodation_id, using=None):
+    """Transfere a reserva entre os contadores de duas acomodações."""
+    deltas = booking_deltas(booking, 1)
+    adjust([booking.accommodation_id], using, **deltas)
+    adjust(
+        [previous_accommodation_id],
+        using,
+        **{field: -delta for field, delta in deltas.items()},
+    )
+
+
+def count_per_listing(queryset):
+    """Subconsulta com a contagem de `queryset` para cada acomodação."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(accommodation=OuterRef("pk"))
+            .order_by()
+            .values("accommodation")
+            .annotate(total=Count("*"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def expected_counts():
+    """Expressões que recalculam cada contador a partir das tabelas de origem."""
+    return {
+        "favorite_count": count_per_listing(FavoriteProperty.objects.all()),
+        "booking_count": count_per_listing(Booking.objects.all()),
+        "bookings_last_30_days": count_per_listing(
+            Booking.objects.filter(created_at__gte=recent_since())
+        ),
+    }
+
+
+def recount(fields=COUNTERS, listings=None, using=None):
+    """Recalcula os contadores das acomodações (todas, por padrão)."""
+    if listings is None:
+        listings = PropertyListing.objects.using(using)
+    expected = expected_counts()
+    return listings.update(**{field: expected[field] for field in fields})
+
+
+def recount_ids(accommodation_ids, fields=COUNTERS, using=None):
+    """`recount` das acomodações indicadas, em lotes de BATCH_SIZE."""
+    accommodation_ids = list(accommodation_ids)
+    updated = 0
+    for start in range(0, len(accommodation_ids), BATCH_SIZE):
+        batch = accommodation_ids[start : start + BATCH_SIZE]
+        updated += recount(
+            fields, PropertyListing.objects.using(using).filter(pk__in=batch)
+        )
+    return updated
+
+
+def refresh_recent_bookings(using=None):
+    """
+    Atualiza bookings_last_30_days apenas nas acomodações que podem ter
+    mudado: as que ainda contam reservas e as que têm reservas na janela.
+    """
+    recent = Booking.objects.filter(created_at__gte=recent_since())
+    listings = PropertyListing.objects.using(using).filter(
+        Q(bookings_last_30_days__gt=0) | Q(pk__in=recent.values("accommodation"))
+    )
+    return recount(["bookings_last_30_days"], listings)
+
+
+def find_drift(fields=COUNTERS, using=None):
+    """`{pk: {campo: (gravado, esperado)}}` das acomodações com desvio."""
+    expected = expected_counts()
+    listings = (
+        PropertyListing.objects.using(using)
+        .annotate(**{f"expected_{field}": expected[field] for field in fields})
+        .filter(
+            reduce(or_, (~Q(**{field: F(f"expected_{field}")}) for field in fields))
+        )
+        .values("pk", *fields, *(f"expected_{field}" for field in fields))
+    )
+    drift = {}
+    for row in listings.iterator(chunk_size=BATCH_SIZE):
+        drift[row["pk"]] = {
+            field: (row[field], row[f"expected_{field}"])
+            for field in fields
+            if row[field] != row[f"expected_{field}"]
+        }
+    return drift
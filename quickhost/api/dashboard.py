@@ -0,0 +1,216 @@
+"""
+Painel do anfitrião: ocupação, receita, próximos check-ins e avaliações de
+todas as acomodações que ele criou (`PropertyListing.creator`).
+
+Os agregados de cada acomodação são subconsultas correlacionadas sobre
+Booking e Review anotadas na mesma consulta das acomodações: um JOIN com as
+duas tabelas multiplicaria as linhas (reservas × avaliações) e distorceria
+somas e médias. Os totais são calculados em Python a partir dessas linhas.
+
+O resultado fica em cache por anfitrião e por dia (a janela de ocupação
+muda à meia-noite). Os sinais em data/signals.py descartam a entrada, após o
+commit, quando uma reserva, avaliação ou acomodação do anfitrião é gravada ou
+excluída.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    DecimalField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from data.models import Booking, PropertyListing, Review
+
+from . import metrics
+
+# Janela da taxa de ocupação: os últimos OCCUPANCY_DAYS dias, até ontem.
+OCCUPANCY_DAYS = 30
+
+LISTING_FIELDS = ("id_accommodation", "title", "city", "uf", "is_active")
+
+CENTS = Decimal("0.01")
+
+
+def dashboard_cache():
+    return caches[settings.DASHBOARD_CACHE["ALIAS"]]
+
+
+def dashboard_key(user_id, today):
+    return f"host-dashboard:{user_id}:{today.isoformat()}"
+
+
+def per_listing(queryset, aggregate, output_field, default=None):
+    """Subconsulta com `aggregate` sobre `queryset` para cada acomodação."""
+    value = Subquery(
+        queryset.filter(accommodation=OuterRef("pk"))
+        .order_by()
+        .values("accommodation")
+        .annotate(value=aggregate)
+        .values("value"),
+        output_field=output_field,
+    )
+    if default is None:
+        return value
+    return Coalesce(value, Value(default), output_field=output_field)
+
+
+def listing_aggregates(today):
+    bookings = Booking.objects.filter(is_active=True)
+    start = today - timedelta(days=OCCUPANCY_DAYS)
+    # Noites de cada reserva que caem em [start, today).
+    nights = ExpressionWrapper(
+        Least(F("check_out_date"), Value(today))
+        - Greatest(F("check_in_date"), Value(start)),
+        output_field=DurationField(),
+    )
+    return {
+        "bookings": per_listing(bookings, Count("*"), IntegerField(), 0),
+        "revenue": per_listing(
+            bookings,
+            Sum("price"),
+            DecimalField(max_digits=14, decimal_places=2),
+            Decimal("0.00"),
+        ),
+        "occupied": per_listing(
+            bookings.filter(check_in_date__lt=today, check_out_date__gt=start),
+            Sum(nights),
+            DurationField(),
+            timedelta(0),
+        ),
+        "upcoming_check_ins": per_listing(
+            bookings.filter(check_in_date__gte=today), Count("*"), IntegerField(), 0
+        ),
+        "next_check_in": per_listing(
+            bookings.filter(check_in_date__gte=today),
+            Min("check_in_date"),
+            Booking._meta.get_field("check_in_date"),
+        ),
+        "review_count": per_listing(
+            Review.objects.all(), Count("*"), IntegerField(), 0
+        ),
+        "rating": per_listing(
+            Review.objects.all(),
+            Avg("rating"),
+            DecimalField(max_digits=4, decimal_places=2),
+        ),
+    }
+
+
+def occupancy_rate(nights, listings):
+    if not listings:
+        return 0.0
+    return round(nights / (listings * OCCUPANCY_DAYS), 4)
+
+
+def build_dashboard(user_id, today=None):
+    """Calcula o painel do anfitrião em uma única consulta."""
+    today = today or timezone.localdate()
+    aggregates = listing_aggregates(today)
+    rows = (
+        PropertyListing.objects.filter(creator_id=user_id)
+        .annotate(**aggregates)
+        .order_by("-created_at")
+        .values(*LISTING_FIELDS, *aggregates)
+    )
+
+    listings = []
+    revenue = Decimal("0.00")
+    total_nights = total_reviews = 0
+    rating_sum = 0.0
+    for row in rows:
+        row["revenue"] = Decimal(row["revenue"]).quantize(CENTS)
+        nights = row.pop("occupied").days
+        rating = row.pop("rating")
+        revenue += row["revenue"]
+        total_nights += nights
+        total_reviews += row["review_count"]
+        rating_sum += float(rating or 0) * row["review_count"]
+        listings.append(
+            {
+                **row,
+                "revenue": str(row["revenue"]),
+                "nights_booked": nights,
+                "occupancy_rate": occupancy_rate(nights, 1),
+                "average_rating": round(float(rating), 2) if rating else None,
+            }
+        )
+
+    next_check_ins = [row["next_check_in"] for row in listings if row["next_check_in"]]
+    return {
+        "host": str(user_id),
+        "date": today,
+        "occupancy_days": OCCUPANCY_DAYS,
+        "totals": {
+            "listings": len(listings),
+            "bookings": sum(row["bookings"] for row in listings),
+            "revenue": str(revenue),
+            "nights_booked": total_nights,
+            "occupancy_rate": occupancy_rate(total_nights, len(listings)),
+            "upcoming_check_ins": sum(row["upcoming_check_ins"] for row in listings),
+            "next_check_in": min(next_check_ins, default=None),
+            "review_count": total_reviews,
+            "average_rating": (
+                round(rating_sum / total_reviews, 2) if total_reviews else None
+            ),
+        },
+        "listings": listings,
+    }
+
+
+def host_dashboard(user_id):
+    """Painel do anfitrião, do cache quando possível."""
+    today = timezone.localdate()
+    cache = dashboard_cache()
+    key = dashboard_key(user_id, today)
+    data = cache.get(key)
+    hit = data is not None
+    metrics.record_cache("host_dashboard", int(hit), int(not hit))
+    if not hit:
+        data = build_dashboard(user_id, today)
+        cache.set(key, data, settings.DASHBOARD_CACHE["TIMEOUT"])
+    return data
+
+
+def invalidate_dashboards(user_ids):
+    """
+    Descarta os painéis depois do commit: antes dele, uma leitura concorrente
+    ainda veria os dados antigos e os recolocaria no cache.
+    """
+    today = timezone.localdate()
+    keys = {dashboard_key(pk, today) for pk in user_ids}
+    transaction.on_commit(lambda: dashboard_cache().delete_many(keys))
+
+
+def invalidate_for(instance):
+    """Descarta o painel do anfitrião da acomodação de uma reserva ou avaliação."""
+    if type(instance).accommodation.is_cached(instance):
+        # Nas escritas pela API, a acomodação já foi carregada na validação.
+        invalidate_dashboards([instance.accommodation.creator_id])
+    else:
+        invalidate_for_listings([instance.accommodation_id])
+
+
+def invalidate_for_listings(accommodation_ids):
+    """Descarta o painel dos anfitriões das acomodações."""
+    invalidate_dashboards(
+        PropertyListing.objects.filter(pk__in=accommodation_ids)
+        .values_list("creator_id", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,154 @@
+"""
+Favoritos do usuário.
+
+O conjunto de ids das acomodações favoritadas por cada usuário fica em
+cache, para marcar `is_favorited` nas listagens sem uma consulta extra por
+requisição. A entrada é descartada (não editada), após o commit, quando um
+favorito é criado ou excluído: duas requisições simultâneas editando o mesmo conjunto
+poderiam perder uma das alterações, enquanto a releitura é uma consulta
+simples pelo índice (usuário, data).
+
+`add_favorites` grava vários favoritos em um único INSERT e ajusta os
+favorite_count das acomodações na mesma transação; a contagem antes e depois
+do INSERT confirma quantas linhas foram de fato inseridas. `remove_favorites`
+apaga em um único DELETE, e o post_delete de cada favorito ajusta o contador.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from data.models import FavoriteProperty, UserAccount
+
+from . import counters, metrics
+
+logger = logging.getLogger("my_logger")
+
+# Campos da acomodação embutidos nos favoritos e nas reservas
+# (AccommodationCardSerializer).
+CARD_FIELDS = (
+    "id_accommodation",
+    "title",
+    "city",
+    "neighborhood",
+    "uf",
+    "category",
+    "main_cover_image",
+    "price",
+    "price_per_night",
+    "average_rating",
+    "guest_capacity",
+    "is_active",
+)
+
+
+def favorites_cache():
+    return caches[settings.FAVORITES_CACHE["ALIAS"]]
+
+
+def favorite_ids_key(user_id):
+    return f"favorite-ids:{user_id}"
+
+
+def favorite_ids(user_id):
+    """Ids das acomodações favoritadas pelo usuário."""
+    cache = favorites_cache()
+    key = favorite_ids_key(user_id)
+    ids = cache.get(key)
+    hit = ids is not None
+    metrics.record_cache("favorite_ids", int(hit), int(not hit))
+    if not hit:
+        ids = frozenset(
+            FavoriteProperty.objects.filter(
+                user_favorite_property_id=user_id
+            ).values_list("accommodation_id", flat=True)
+        )
+        cache.set(key, ids, settings.FAVORITES_CACHE["TIMEOUT"])
+    return ids
+
+
+def invalidate_favorite_ids(user_ids):
+    """
+    Descarta os conjuntos depois do commit: antes dele, uma leitura
+    concorrente ainda veria os favoritos antigos e os recolocaria no cache.
+    """
+    keys = {favorite_ids_key(pk) for pk in user_ids}
+    transaction.on_commit(lambda: favorites_cache().delete_many(keys))
+
+
+def with_cards(queryset):
+    """
+    Carrega, no mesmo JOIN, os campos do modelo (favorito ou reserva) e só
+    os campos da acomodação usados no card.
+    """
+    return queryset.select_related("accommodation").only(
+        *(field.name for field in queryset.model._meta.concrete_fields),
+        *(f"accommodation__{field}" for field in CARD_FIELDS),
+    )
+
+
+def lock_user(user_id):
+    """
+    Serializa as escritas de favoritos do mesmo usuário (no PostgreSQL), para
+    que a leitura dos favoritos existentes continue válida até o commit.
+    """
+    list(UserAccount.objects.select_for_update().filter(pk=user_id).values("pk"))
+
+
+@transaction.atomic
+def add_favorites(user_id, accommodation_ids):
+    """Favorita as acomodações e retorna os ids que ainda não eram favoritos."""
+    lock_user(user_id)
+    requested = list(dict.fromkeys(accommodation_ids))
+    favorites = FavoriteProperty.objects.filter(
+        user_favorite_property_id=user_id, accommodation_id__in=requested
+    )
+    existing = set(favorites.values_list("accommodation_id", flat=True))
+    added = [pk for pk in requested if pk not in existing]
+    # bulk_create não dispara post_save: o contador e o cache são
+    # ajustados aqui.
+    FavoriteProperty.objects.bulk_create(
+        [
+            FavoriteProperty(user_favorite_property_id=user_id, accommodation_id=pk)
+            for pk in added
+        ],
+        ignore_conflicts=True,
+    )
+    inserted = favorites.count() - len(existing)
+    if inserted == len(added):
+        counters.adjust_favorite_counts(added, 1)
+    else:
+        # Um favorito criado por outra requisição entre a leitura e o INSERT
+        # caiu no ignore_conflicts e já foi contado pelo post_save dela.
+        logger.warning(
+            "Favoritos concorrentes do usuário %s: %s de %s inseridos.",
+            user_id,
+            inserted,
+            len(added),
+        )
+        counters.recount_ids(added, ["favorite_count"])
+    invalidate_favorite_ids([user_id])
+    return added
+
+
+@transaction.atomic
+def remove_favorites(user_id, accommodation_ids):
+    """Remove os favoritos e retorna os ids que de fato estavam favoritados."""
+    lock_user(user_id)
+    favorites = FavoriteProperty.objects.filter(
+        user_favorite_property_id=user_id, accommodation_id__in=accommodation_ids
+    )
+    removed = list(favorites.values_list("accommodation_id", flat=True))
+    if removed:
+        # O post_delete de cada favorito ajusta o contador e o cache.
+        deleted, _ = favorites.delete()
+        if deleted != len(removed):
+            logger.warning(
+                "Favoritos concorrentes do usuário %s: %s de %s removidos.",
+                user_id,
+                deleted,
+                len(removed),
+            )
+    return removed
@@ -0,0 +1,71 @@
+"""
+Comissão da plataforma sobre a diária anunciada pelo anfitrião.
+
+A taxa cresce linearmente de 3% (diária próxima de zero) até 15% (diária de
+1000); acima disso fica fixa em 15%. `net_price` é o caminho com Decimal
+usado ao salvar acomodações; `net_prices` avalia milhares de diárias de uma
+vez em centavos inteiros e produz exatamente os mesmos valores.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from .pricing import format_cents, round_half_even
+
+
+MIN_RATE = Decimal("0.03")
+MAX_RATE = Decimal("0.15")
+MAX_RATE_PRICE = Decimal("1000")
+
+# Para uma diária de `c` centavos até MAX_RATE_PRICE, o líquido em centavos é
+#   c * (1 - MIN_RATE - (MAX_RATE - MIN_RATE) * c / (100 * MAX_RATE_PRICE))
+# = c * (NET_BASE - NET_SLOPE * c) / NET_SCALE, com constantes inteiras.
+NET_SCALE = int(100 * MAX_RATE_PRICE * 100)
+NET_BASE = int((1 - MIN_RATE) * NET_SCALE)
+NET_SLOPE = int((MAX_RATE - MIN_RATE) * 100)
+MAX_RATE_CENTS = int(MAX_RATE_PRICE * 100)
+MAX_RATE_NET_PERCENT = int((1 - MAX_RATE) * 100)
+
+
+def commission_rate(price):
+    """Taxa de comissão para uma diária positiva."""
+    if price <= MAX_RATE_PRICE:
+        return MIN_RATE + (MAX_RATE - MIN_RATE) * (price / MAX_RATE_PRICE)
+    return MAX_RATE
+
+
+def net_price(price):
+    """Diária líquida para o anfitrião, arredondada em centavos."""
+    price = Decimal(price)
+    if price > 0:
+        price *= 1 - commission_rate(price)
+    return round(price, 2)
+
+
+def net_prices(price_cents):
+    """Versão vetorizada de `net_price`; recebe e retorna centavos."""
+    price_cents = np.asarray(price_cents, dtype=np.int64)
+    # Limitado à faixa deslizante para não estourar int64 nas diárias altas.
+    capped = np.minimum(price_cents, MAX_RATE_CENTS)
+    sliding = round_half_even(capped * (NET_BASE - NET_SLOPE * capped), NET_SCALE)
+    flat = round_half_even(price_cents * MAX_RATE_NET_PERCENT, 100)
+    return np.where(
+        price_cents <= 0,
+        price_cents,
+        np.where(price_cents <= MAX_RATE_CENTS, sliding, flat),
+    )
+
+
+def simulate(price_cents):
+    """Comissão e líquido do anfitrião para cada diária (em centavos)."""
+    price_cents = np.asarray(price_cents, dtype=np.int64)
+    net_cents = net_prices(price_cents)
+    return [
+        {
+            "price": format_cents(price),
+            "fee": format_cents(price - net),
+            "net_price": format_cents(net),
+        }
+        for price, net in zip(price_cents.tolist(), net_cents.tolist())
+    ]
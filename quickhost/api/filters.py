@@ -0,0 +1,104 @@
+from decimal import Decimal, InvalidOperation
+from django.utils import timezone
+from rest_framework import serializers
+
+# Ordenações por popularidade, a partir dos contadores desnormalizados.
+ORDERINGS = {
+    "popular": ("-bookings_last_30_days", "-booking_count", "-favorite_count"),
+    "most_booked": ("-booking_count",),
+    "most_favorited": ("-favorite_count",),
+}
+
+
+def filter_accommodations(queryset, params):
+    """
+    Aplica os filtros de busca de acomodações a partir dos parâmetros da query.
+
+    Filtros suportados: `q` (título), `city`, `uf`, `category`, `guests`
+    (capacidade mínima), `min_price` e `max_price`. Apenas acomodações
+    ativas são retornadas. `ordering` aceita uma das chaves de ORDERINGS.
+    """
+    errors = {}
+    queryset = queryset.filter(is_active=True)
+
+    q = params.get("q")
+    if q:
+        queryset = queryset.filter(title__icontains=q)
+
+    city = params.get("city")
+    if city:
+        queryset = queryset.filter(city__iexact=city)
+
+    uf = params.get("uf")
+    if uf:
+        queryset = queryset.filter(uf__iexact=uf)
+
+    category = params.get("category")
+    if category:
+        queryset = queryset.filter(category=category)
+
+    guests = params.get("guests")
+    if guests:
+        try:
+            queryset = queryset.filter(guest_capacity__gte=int(guests))
+        except ValueError:
+            errors["guests"] = "O número de hóspedes deve ser um inteiro."
+
+    for param, lookup in (("min_price", "price__gte"), ("max_price", "price__lte")):
+        value = params.get(param)
+        if value:
+            try:
+                queryset = queryset.filter(**{lookup: Decimal(value)})
+            except InvalidOperation:
+                errors[param] = "O preço deve ser um número válido."
+
+    ordering = params.get("ordering")
+    if ordering:
+        if ordering in ORDERINGS:
+            queryset = queryset.order_by(*ORDERINGS[ordering], "-created_at")
+        else:
+            errors["ordering"] = f"Use uma destas ordenações: {', '.join(ORDERINGS)}."
+
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    return queryset
+
+
+# Ordenação das reservas para cada período; as três usam o índice
+# (user_booking, check_in_date). Sem período, as mais recentes primeiro.
+BOOKING_PERIODS = {
+    "upcoming": ("check_in_date", "id_booking"),
+    "active": ("-check_in_date", "-id_booking"),
+    "past": ("-check_in_date", "-id_booking"),
+}
+
+
+def filter_bookings(queryset, params):
+    """
+    Aplica o filtro `period` às reservas do usuário:
+
+    - upcoming: reservas ativas com check-in depois de hoje;
+    - active: reservas ativas em andamento (check-in até hoje, check-out depois);
+    - past: reservas com check-out até hoje, canceladas ou não.
+    """
+    period = params.get("period")
+    if not period:
+        return queryset
+    if period not in BOOKING_PERIODS:
+        raise serializers.ValidationError(
+            {"period": f"Use um destes períodos: {', '.join(BOOKING_PERIODS)}."}
+        )
+
+    today = timezone.localdate()
+    if period == "upcoming":
+        queryset = queryset.filter(is_active=True, check_in_date__gt=today)
+    elif period == "active":
+        queryset = queryset.filter(
+            is_active=True, check_in_date__lte=today, check_out_date__gt=today
+        )
+    else:
+        # O check-in é anterior ao check-out: a condição redundante restringe
+        # a faixa lida no índice.
+        queryset = queryset.filter(check_in_date__lt=today, check_out_date__lte=today)
+    return queryset.order_by(*BOOKING_PERIODS[period])
@@ -0,0 +1,335 @@
+"""
+Contagem e tempo das consultas SQL de cada requisição.
+
+O QueryInstrumentationMiddleware instala um `execute_wrapper` em todas as
+conexões durante a requisição, então funciona com DEBUG = False e também
+conta as consultas enviadas às réplicas. A resposta recebe os cabeçalhos
+`X-Query-Count` e `Server-Timing` (tempo no banco e tempo total), e as
+requisições acima dos limites de QUERY_INSTRUMENTATION são registradas no
+log com os formatos de SQL mais repetidos, o sinal típico de um N+1.
+
+Consultas individuais acima de SLOW_QUERY_LOG["THRESHOLD_MS"] vão para o
+log de consultas lentas (JSON lines): SQL normalizado, tipos dos
+parâmetros, view, linha do código que disparou a consulta e o plano de
+execução (EXPLAIN QUERY PLAN no SQLite, EXPLAIN no PostgreSQL). Cada
+formato de SQL é registrado no máximo uma vez por INTERVAL_SECONDS; as
+ocorrências suprimidas entram na contagem do registro seguinte. O comando
+`manage.py slow_queries` resume o arquivo.
+
+A requisição só enfileira o registro (o QueueLogHandler de quickhost/log.py):
+o EXPLAIN, em uma conexão própria, e a escrita acontecem na thread do
+QueueListener. O arquivo é rotacionado pelo RotatingFileHandler ao passar de
+MAX_BYTES, mantendo BACKUP_COUNT cópias. A rotação é feita por processo: com
+vários workers, um deles pode continuar escrevendo no arquivo já rotacionado
+até a sua própria verificação de tamanho.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from quickhost.log import QueueLogHandler
+
+from . import metrics
+
+logger = logging.getLogger("my_logger")
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_VALUES_ROWS = re.compile(r"(\((?:%s, )*%s\))(?:, \1)+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def sql_shape(sql):
+    """Normaliza o SQL para agrupar consultas que só diferem nos valores."""
+    shape = _SPACES.sub(" ", sql.strip())
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _VALUES_ROWS.sub(r"\1, ...", shape)
+
+
+class SlowQueryFormatter(logging.Formatter):
+    """
+    Completa o registro com o plano de execução e o serializa em uma linha
+    JSON. Roda na thread do QueueListener, fora da requisição.
+    """
+
+    def format(self, record):
+        data = dict(record.slow_query)
+        data["plan"] = explain(*data.pop("explain"))
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SlowQueryLog:
+    """Registro de consultas lentas, limitado por formato de SQL."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handler = None
+        self.handler_config = None
+        self.reset()
+
+    def reset(self):
+        self.last_logged = {}
+        self.suppressed = Counter()
+
+    def get_handler(self, config):
+        """Handler do arquivo em PATH, recriado se a configuração mudar."""
+        handler_config = (config["PATH"], config["MAX_BYTES"], config["BACKUP_COUNT"])
+        with self.lock:
+            if self.handler_config != handler_config:
+                self.close_handler()
+                target = RotatingFileHandler(
+                    config["PATH"],
+                    maxBytes=config["MAX_BYTES"],
+                    backupCount=config["BACKUP_COUNT"],
+                    encoding="utf-8",
+                    delay=True,
+                )
+                self.handler = QueueLogHandler(
+                    maxsize=config["QUEUE_SIZE"], target=target
+                )
+                self.handler.setFormatter(SlowQueryFormatter())
+                self.handler_config = handler_config
+            return self.handler
+
+    def close(self):
+        """Grava os registros ainda na fila e fecha o arquivo."""
+        with self.lock:
+            self.close_handler()
+
+    def close_handler(self):
+        if self.handler is not None:
+            self.handler.stop()
+            self.handler.target.close()
+            self.handler.close()
+        self.handler = self.handler_config = None
+
+    def capture(self, sql, params, duration, connection, view):
+        config = settings.SLOW_QUERY_LOG
+        shape = sql_shape(sql)
+        now = time.monotonic()
+        with self.lock:
+            last = self.last_logged.get(shape)
+            if last is not None and now - last < config["INTERVAL_SECONDS"]:
+                self.suppressed[shape] += 1
+                return
+            self.last_logged[shape] = now
+            suppressed = self.suppressed.pop(shape, 0)
+
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "shape": shape,
+            "duration_ms": round(duration * 1000, 3),
+            "param_types": [type(param).__name__ for param in params or ()],
+            "view": view,
+            "location": code_location(),
+            "database": connection.alias,
+            "vendor": connection.vendor,
+            "suppressed": suppressed,
+            # O EXPLAIN e a escrita no arquivo ficam para a thread do
+            # QueueListener.
+            "explain": (connection.alias, sql, params),
+        }
+        self.get_handler(config).handle(
+            logging.makeLogRecord(
+                {
+                    "name": "quickhost.slow_queries",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "slow_query": record,
+                }
+            )
+        )
+        logger.warning(
+            "Consulta lenta (%.1f ms) em %s [%s]: %s",
+            record["duration_ms"],
+            view,
+            record["location"],
+            shape,
+        )
+
+
+slow_query_log = SlowQueryLog()
+
+
+def explain(alias, sql, params):
+    """
+    Plano de execução da consulta, uma linha por item. Usa a conexão da
+    thread que chama (a do QueueListener), fechada ao final.
+    """
+    if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+        return []
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+    except Exception as exc:
+        return [f"EXPLAIN falhou: {exc}"]
+    finally:
+        connection.close()
+
+
+def code_location():
+    """Primeira linha do código do projeto (fora deste módulo) na pilha."""
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            path = os.path.relpath(filename, base)
+            return f"{path}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return ""
+
+
+class QueryStats:
+    """
+    `execute_wrapper` que acumula quantidade e tempo das consultas.
+
+    O SQL é agrupado pelo texto exato (barato); a normalização em formatos
+    só acontece quando a requisição precisa ser registrada.
+    """
+
+    def __init__(self, view=""):
+        self.count = 0
+        self.duration = 0.0
+        self.by_sql = defaultdict(lambda: [0, 0.0])
+        self.view = view
+        config = settings.SLOW_QUERY_LOG
+        self.slow_threshold = (
+            config["THRESHOLD_MS"] / 1000 if config["ENABLED"] else None
+        )
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            entry = self.by_sql[sql]
+            entry[0] += 1
+            entry[1] += elapsed
+        slow = self.slow_threshold is not None and elapsed >= self.slow_threshold
+        if slow and not many:
+            slow_query_log.capture(
+                sql,
+                params,
+                elapsed,
+                context["connection"],
+                metrics.current_view.get() or self.view,
+            )
+        return result
+
+    def top_shapes(self, limit):
+        """Formatos mais repetidos: `[(formato, quantidade, segundos)]`."""
+        counts = Counter()
+        durations = Counter()
+        for sql, (count, duration) in self.by_sql.items():
+            shape = sql_shape(sql)
+            counts[shape] += count
+            durations[shape] += duration
+        return [
+            (shape, count, durations[shape])
+            for shape, count in counts.most_common(limit)
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Mede as consultas de cada requisição e publica o resultado nos
+    cabeçalhos da resposta e em `request.query_stats`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_INSTRUMENTATION["ENABLED"]:
+            return self.get_response(request)
+        stats, started = self.start(request)
+        with self.wrap_connections(stats):
+            response = self.get_response(request)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        if not settings.QUERY_INSTRUMENTATION["ENABLED"]:
+            return await self.get_response(request)
+        stats, started = self.start(request)
+        # As conexões são locais à thread: o ORM das views assíncronas roda
+        # na thread do sync_to_async, então os wrappers são instalados lá.
+        stack = await sync_to_async(self.wrap_connections)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, stats, started)
+
+    def start(self, request):
+        request.query_stats = QueryStats(f"{request.method} {request.path}")
+        return request.query_stats, time.perf_counter()
+
+    def wrap_connections(self, stats):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        return stack
+
+    def finish(self, request, response, stats, started):
+        config = settings.QUERY_INSTRUMENTATION
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+
+        if config["HEADERS"]:
+            timing = (
+                f'db;dur={db_ms:.1f};desc="{stats.count} consultas", '
+                f"total;dur={total_ms:.1f}"
+            )
+            if response.has_header("Server-Timing"):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response["Server-Timing"] = timing
+            response["X-Query-Count"] = str(stats.count)
+
+        if total_ms >= config["SLOW_REQUEST_MS"] or stats.count > config["MAX_QUERIES"]:
+            shapes = "".join(
+                f"\n  {count}x ({duration * 1000:.1f} ms) {shape}"
+                for shape, count, duration in stats.top_shapes(config["TOP_SHAPES"])
+            )
+            logger.warning(
+                "Requisição lenta %s %s (%s): %.1f ms, %s consultas (%.1f ms no banco). Consultas mais repetidas:%s",
+                request.method,
+                request.path,
+                response.status_code,
+                total_ms,
+                stats.count,
+                db_ms,
+                shapes,
+            )
+        return response
@@ -0,0 +1,374 @@
+"""
+Métricas por rota no formato de texto do Prometheus.
+
+Cada processo acumula contadores e histogramas em memória, e uma thread em
+segundo plano grava a cada METRICS["FLUSH_SECONDS"] um snapshot JSON em
+METRICS["DIRECTORY"] (um arquivo por processo), além de uma última gravação
+na saída do processo. As requisições nunca escrevem em disco. A view `/metrics` soma os snapshots de todos os processos, então
+o resultado é o mesmo independentemente de qual worker atende a coleta.
+Os arquivos de processos encerrados continuam somando: contadores do
+Prometheus só podem crescer. Limpe o diretório a cada deploy.
+
+O MetricsMiddleware registra, por view (`ViewSet.ação`), rota e método:
+quantidade de requisições por status, latência e tempo no banco (a partir
+de `request.query_stats`, do QueryInstrumentationMiddleware). Acertos e
+falhas de cache são registrados com `record_cache`, e os registros de log
+descartados pelo QueueLogHandler com `record_log_drop`.
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LABELS = ("view", "route", "method")
+
+# nome: (tipo, descrição, labels, buckets)
+DEFINITIONS = {
+    "quickhost_requests_total": (
+        "counter",
+        "Requisições atendidas.",
+        REQUEST_LABELS + ("status",),
+        None,
+    ),
+    "quickhost_request_duration_seconds": (
+        "histogram",
+        "Latência das requisições.",
+        REQUEST_LABELS,
+        LATENCY_BUCKETS,
+    ),
+    "quickhost_db_duration_seconds": (
+        "histogram",
+        "Tempo gasto no banco por requisição.",
+        REQUEST_LABELS,
+        LATENCY_BUCKETS,
+    ),
+    "quickhost_db_queries_total": (
+        "counter",
+        "Consultas SQL executadas.",
+        REQUEST_LABELS,
+        None,
+    ),
+    "quickhost_cache_requests_total": (
+        "counter",
+        "Leituras de cache por resultado (hit/miss).",
+        ("view", "cache", "result"),
+        None,
+    ),
+    "quickhost_log_records_dropped_total": (
+        "counter",
+        "Registros de log descartados por amostragem ou fila cheia.",
+        ("level", "reason"),
+        None,
+    ),
+}
+
+current_view = ContextVar("metrics_view", default="")
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """Contadores e histogramas do processo atual, protegidos por um lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flusher_pid = None
+        self.reset()
+
+    def reset(self):
+        # Após um fork, o processo filho começa do zero com um arquivo próprio.
+        self.pid = os.getpid()
+        self.name = f"{self.pid}-{uuid.uuid4().hex[:8]}"
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def check_fork(self):
+        if os.getpid() != self.pid:
+            self.reset()
+        if self.flusher_pid != self.pid:
+            # A thread é iniciada no primeiro registro, e de novo após um
+            # fork: o processo filho não herda a thread.
+            self.flusher_pid = self.pid
+            threading.Thread(
+                target=self.run_flusher, name="metrics-flush", daemon=True
+            ).start()
+
+    def run_flusher(self):
+        """Grava o snapshot a cada FLUSH_SECONDS, fora das requisições."""
+        while True:
+            time.sleep(settings.METRICS["FLUSH_SECONDS"])
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Falha ao gravar as métricas.")
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.check_fork()
+            self.counters[name, labels] += value
+
+    def observe(self, name, labels, value):
+        buckets = DEFINITIONS[name][3]
+        with self.lock:
+            self.check_fork()
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = [
+                    [0] * (len(buckets) + 1),
+                    0.0,
+                ]
+            position = next(
+                (i for i, bound in enumerate(buckets) if value <= bound), len(buckets)
+            )
+            histogram[0][position] += 1
+            histogram[1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            "counters": [
+                [name, list(labels), value]
+                for (name, labels), value in self.counters.items()
+            ],
+            "histograms": [
+                [name, list(labels), list(counts), total]
+                for (name, labels), (counts, total) in self.histograms.items()
+            ],
+        }
+
+    def flush(self):
+        """
+        Grava o snapshot do processo. O lock das métricas só é mantido para
+        copiar os valores; `flush_lock` impede que um snapshot mais antigo
+        seja renomeado sobre um mais novo. Falhas de disco são registradas no
+        log.
+        """
+        directory = settings.METRICS["DIRECTORY"]
+        with self.flush_lock:
+            snapshot = self.snapshot()
+            temporary = None
+            try:
+                os.makedirs(directory, exist_ok=True)
+                descriptor, temporary = tempfile.mkstemp(
+                    dir=directory, prefix=f"{self.name}.", suffix=".tmp"
+                )
+                with os.fdopen(descriptor, "w") as file:
+                    json.dump(snapshot, file)
+                os.replace(temporary, os.path.join(directory, f"{self.name}.json"))
+            except OSError as e:
+                logger.warning("Falha ao gravar as métricas em %s: %s", directory, e)
+                if temporary is not None:
+                    try:
+                        os.unlink(temporary)
+                    except OSError:
+                        pass
+
+
+registry = MetricsRegistry()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        if settings.METRICS["ENABLED"] and os.getpid() == registry.pid:
+            registry.flush()
+    except Exception:
+        pass
+
+
+def record_cache(cache, hits, misses):
+    """Registra acertos e falhas de um cache na view da requisição atual."""
+    if not settings.METRICS["ENABLED"]:
+        return
+    view = current_view.get()
+    if hits:
+        registry.inc("quickhost_cache_requests_total", (view, cache, "hit"), hits)
+    if misses:
+        registry.inc("quickhost_cache_requests_total", (view, cache, "miss"), misses)
+
+
+def record_log_drop(level, reason):
+    """Conta um registro de log descartado pelo QueueLogHandler."""
+    if settings.METRICS["ENABLED"]:
+        registry.inc("quickhost_log_records_dropped_total", (level, reason))
+
+
+def collect():
+    """Soma os snapshots de todos os processos (incluindo o atual)."""
+    registry.flush()
+    counters = defaultdict(float)
+    histograms = {}
+    directory = settings.METRICS["DIRECTORY"]
+    try:
+        filenames = sorted(os.listdir(directory))
+    except OSError:
+        filenames = []
+    for filename in filenames:
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot["counters"]:
+            counters[name, tuple(labels)] += value
+        for name, labels, counts, total in snapshot["histograms"]:
+            key = (name, tuple(labels))
+            if key not in histograms:
+                histograms[key] = [[0] * len(counts), 0.0]
+            merged = histograms[key]
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+    return counters, histograms
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def format_number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(counters, histograms):
+    """Formata as métricas no formato de texto 0.0.4 do Prometheus."""
+    lines = []
+    for name, (kind, description, names, buckets) in DEFINITIONS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(
+                        f"{name}{format_labels(names, labels)} {format_number(value)}"
+                    )
+            continue
+        for (metric, labels), (counts, total) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, math.inf), counts):
+                cumulative += count
+                le = format_labels(names, labels, [("le", format_number(bound))])
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(names, labels)} {total!r}")
+            lines.append(f"{name}_count{format_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Endpoint `/metrics`, protegido por METRICS["TOKEN"]. Sem token, só
+    responde com DEBUG ativo.
+    """
+    token = settings.METRICS["TOKEN"]
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(*collect()), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def view_label(view_func, method):
+    """`Classe.ação` para ViewSets, `Classe.método` para APIViews."""
+    actions = getattr(view_func, "actions", None)
+    cls = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    if cls is None:
+        return getattr(view_func, "__name__", "unknown")
+    if actions:
+        return f"{cls.__name__}.{actions.get(method.lower(), method.lower())}"
+    return f"{cls.__name__}.{method.lower()}"
+
+
+class MetricsMiddleware:
+    """
+    Registra as métricas de cada requisição. Deve vir logo após o
+    QueryInstrumentationMiddleware para incluir o tempo no banco.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS["ENABLED"]:
+            return self.get_response(request)
+        started = time.perf_counter()
+        token = current_view.set("")
+        try:
+            response = self.get_response(request)
+        finally:
+            current_view.reset(token)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS["ENABLED"]:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        token = current_view.set("")
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_view.reset(token)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.METRICS["ENABLED"]:
+            request.metrics_view = view_label(view_func, request.method)
+            current_view.set(request.metrics_view)
+
+    def record(self, request, response, elapsed):
+        match = request.resolver_match
+        # Rotas do router do DRF são expressões regulares ("^reviews/$").
+        route = match.route.lstrip("^").rstrip("$") if match else "<unmatched>"
+        labels = (
+            getattr(request, "metrics_view", "<unmatched>"),
+            route,
+            request.method,
+        )
+        registry.inc("quickhost_requests_total", labels + (str(response.status_code),))
+        registry.observe("quickhost_request_duration_seconds", labels, elapsed)
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            registry.observe("quickhost_db_duration_seconds", labels, stats.duration)
+            registry.inc("quickhost_db_queries_total", labels, stats.count)
@@ -1,20 +1,167 @@
-import uuid
-from django.http import JsonResponse
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
 
+from quickhost import routers
+
+
+def is_api_request(request):
+    """Tudo fora de BROWSER_URL_PREFIXES (o admin) é tratado como API."""
+    return not request.path_info.startswith(settings.BROWSER_URL_PREFIXES)
+
+
+class ApiExemptMixin:
+    """
+    Desvia o middleware nas requisições da API: autenticadas por JWT, elas
+    não usam sessão, cookie de CSRF nem mensagens. Sem o desvio, cada um
+    desses middlewares custa uma troca de thread por requisição no ASGI.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class ApiExemptSessionMiddleware(ApiExemptMixin, SessionMiddleware):
+    pass
+
+
+class ApiExemptCsrfViewMiddleware(ApiExemptMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Chamado pelo handler, fora de __call__.
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class ApiExemptAuthenticationMiddleware(ApiExemptMixin, AuthenticationMiddleware):
+    """Na API, `request.user` é definido pela autenticação do DRF."""
+
+
+class ApiExemptMessageMiddleware(ApiExemptMixin, MessageMiddleware):
+    pass
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise compatível com ASGI.
+
+    O WhiteNoiseMiddleware original é apenas síncrono, o que força o Django a
+    executar toda a cadeia de uma view assíncrona dentro de uma thread. Aqui
+    apenas o envio do arquivo estático sai do event loop, e só caminhos sob
+    STATIC_URL são procurados entre os arquivos.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path_info.startswith(self.static_prefix):
+            return self.get_response(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if not request.path_info.startswith(self.static_prefix):
+            return await self.get_response(request)
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(
+                static_file, request
+            )
+        return await self.get_response(request)
+
+
+def token_user_id(request):
+    """
+    Id do usuário no token JWT da requisição, sem consultar o banco; None
+    sem token ou com um token inválido (a view responde o erro).
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+def replica_pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Abre o escopo de roteamento do banco para cada requisição.
+
+    Requisições com métodos de escrita, ou de usuários que escreveram há
+    menos de REPLICA_PIN_SECONDS, leem apenas do primário, garantindo leitura
+    após escrita mesmo com réplicas atrasadas. A marca fica no cache, pelo
+    usuário do token JWT: um cookie não acompanharia as requisições
+    cross-origin do front-end (SameSite) e, com CORS_ALLOW_ALL_ORIGINS, não
+    pode ser enviado com credenciais. Escritas anônimas não fixam as
+    requisições seguintes.
+    """
+
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS")
 
-class UUIDMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        if "user/accommodation/create/" in request.path:
-            try:
-                id_user = request.path.split("/")[-2]
-                uuid.UUID(str(id_user))
-            except (ValueError, IndexError):
-                return JsonResponse(
-                    {"error": "O ID fornecido não corresponde ao formato UUID."},
-                    status=400,
-                )
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self.pin_key(request)
+        pinned = request.method not in self.safe_methods or (
+            key is not None and cache.get(key) is not None
+        )
+        with routers.request_scope(pinned=pinned) as state:
+            response = self.get_response(request)
+        if state.wrote and key is not None:
+            cache.set(key, 1, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = self.pin_key(request)
+        pinned = request.method not in self.safe_methods or (
+            key is not None and await cache.aget(key) is not None
+        )
+        with routers.request_scope(pinned=pinned) as state:
+            response = await self.get_response(request)
+        if state.wrote and key is not None:
+            await cache.aset(key, 1, settings.REPLICA_PIN_SECONDS)
         return response
+
+    def pin_key(self, request):
+        """Chave da marca no cache; None sem réplicas ou sem usuário no token."""
+        if not settings.DATABASE_REPLICAS:
+            return None
+        user_id = token_user_id(request)
+        return None if user_id is None else replica_pin_key(user_id)
@@ -0,0 +1,348 @@
+"""
+Cálculo do preço total de estadias.
+
+Os valores são tratados em centavos inteiros para que o caminho vetorizado
+(NumPy), usado nas cotações em lote, produza exatamente o mesmo resultado
+do caminho com Decimal usado na criação de reservas.
+
+As cotações consideram o calendário de diárias (NightlyRate): a soma
+acumulada das diárias de cada acomodação é pré-calculada por ano e mantida
+em cache, e o subtotal de qualquer estadia é uma diferença O(1).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_EVEN
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import serializers
+
+from data.models import NightlyRate, PropertyListing
+
+CENT = Decimal("0.01")
+
+# Taxa aplicada sobre o total conforme a duração da estadia, em pontos
+# percentuais: até 3 noites, de 4 a 7 noites e acima de 7 noites.
+TAX_TIERS = ((3, 105), (7, 110), (None, 115))
+
+
+def tax_rate(nights):
+    """Retorna o multiplicador de taxa (ex.: 1.05) para a quantidade de noites."""
+    for limit, percent in TAX_TIERS:
+        if limit is None or nights <= limit:
+            return Decimal(percent) / 100
+
+
+def stay_total(nightly_price, nights):
+    """Total da estadia (diária x noites x taxa), arredondado em centavos."""
+    total = Decimal(nightly_price) * nights * tax_rate(nights)
+    return total.quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+def to_cents(values):
+    """Converte valores decimais em um array de centavos inteiros."""
+    return np.array(
+        [int(Decimal(value).quantize(CENT) * 100) for value in values],
+        dtype=np.int64,
+    )
+
+
+def format_cents(cents):
+    """Formata centavos inteiros como string decimal ("1234.50")."""
+    cents = int(cents)
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def tax_percents(nights):
+    """Versão vetorizada de `tax_rate`, em pontos percentuais."""
+    conditions = [nights <= limit for limit, _ in TAX_TIERS[:-1]]
+    choices = [percent for _, percent in TAX_TIERS[:-1]]
+    return np.select(conditions, choices, default=TAX_TIERS[-1][1])
+
+
+def round_half_even(numerator, denominator):
+    """Divisão inteira com arredondamento bancário, igual ao ROUND_HALF_EVEN."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    round_up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+def taxed_totals(subtotal_cents, nights):
+    """Aplica a taxa por duração sobre a soma das diárias, em centavos."""
+    subtotal_cents = np.asarray(subtotal_cents, dtype=np.int64)
+    nights = np.asarray(nights, dtype=np.int64)
+    return round_half_even(subtotal_cents * tax_percents(nights), 100)
+
+
+def stay_totals(price_cents, nights):
+    """Versão vetorizada de `stay_total`; recebe e retorna centavos."""
+    price_cents = np.asarray(price_cents, dtype=np.int64)
+    nights = np.asarray(nights, dtype=np.int64)
+    return taxed_totals(price_cents * nights, nights)
+
+
+class RateCalendar:
+    """
+    Diárias acumuladas por acomodação a partir da data `start`.
+
+    `cumulative[i, d]` é a soma, em centavos, das diárias da acomodação `i`
+    desde `start` até a noite anterior a `start + d`. Assim, o subtotal de
+    qualquer estadia coberta pelo calendário é a diferença de duas posições.
+
+    `cache_hits` e `cache_misses` contam os anos lidos do cache e os
+    recalculados na montagem, para que a camada HTTP registre as métricas.
+    """
+
+    def __init__(
+        self,
+        start,
+        accommodation_ids,
+        cumulative,
+        cleaning_cents,
+        cache_hits=0,
+        cache_misses=0,
+    ):
+        self.start = np.datetime64(start, "D")
+        self.index = {pk: row for row, pk in enumerate(accommodation_ids)}
+        self.cumulative = cumulative
+        self.cleaning_cents = np.asarray(cleaning_cents, dtype=np.int64)
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+
+    def quote(self, rows, check_ins, check_outs):
+        """
+        Calcula noites, subtotal e total (com taxa e limpeza) de cada estadia.
+
+        Retorna arrays em centavos; `rows` são as linhas de `self.index`.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        first = (np.asarray(check_ins, dtype="datetime64[D]") - self.start).astype(
+            np.int64
+        )
+        last = (np.asarray(check_outs, dtype="datetime64[D]") - self.start).astype(
+            np.int64
+        )
+        nights = last - first
+        subtotals = self.cumulative[rows, last] - self.cumulative[rows, first]
+        totals = taxed_totals(subtotals, nights) + self.cleaning_cents[rows]
+        return nights, subtotals, totals
+
+
+def year_cumulative(year, base_cents, rates):
+    """
+    Soma acumulada das diárias de um ano (`days + 1` posições, começando em 0).
+
+    `rates` são pares `(data, centavos)` que substituem a diária padrão.
+    """
+    first = date(year, 1, 1)
+    nightly = np.full((date(year + 1, 1, 1) - first).days, base_cents, dtype=np.int64)
+    if rates:
+        nights, prices = zip(*rates)
+        nightly[[(night - first).days for night in nights]] = prices
+    cumulative = np.zeros(nightly.size + 1, dtype=np.int64)
+    np.cumsum(nightly, out=cumulative[1:])
+    return cumulative
+
+
+def calendar_cache():
+    return caches[settings.RATE_CALENDAR_CACHE["ALIAS"]]
+
+
+def calendar_key(accommodation_id, year):
+    return f"rate-calendar:{accommodation_id}:{year}"
+
+
+def invalidate_rate_calendar(accommodation_id, dates):
+    """Descarta os anos em cache afetados por mudanças nas diárias."""
+    calendar_cache().delete_many(
+        {calendar_key(accommodation_id, night.year) for night in dates}
+    )
+
+
+def year_cumulatives(base_cents, years):
+    """
+    Retorna `{(id, ano): soma acumulada}` para as acomodações em `base_cents`
+    e a quantidade de anos que não estavam em cache.
+
+    Os anos já calculados vêm do cache; os demais são montados a partir de
+    uma única consulta às NightlyRate e guardados para as próximas cotações.
+    A diária padrão faz parte do valor em cache, então uma mudança de preço
+    da acomodação invalida a entrada automaticamente.
+    """
+    cache = calendar_cache()
+    keys = {calendar_key(pk, year): (pk, year) for pk in base_cents for year in years}
+    cumulatives = {}
+    for key, (cached_base, cumulative) in cache.get_many(keys).items():
+        pk, year = keys[key]
+        if cached_base == base_cents[pk]:
+            cumulatives[pk, year] = cumulative
+
+    missing = [pair for pair in keys.values() if pair not in cumulatives]
+    if not missing:
+        return cumulatives, 0
+
+    missing_ids = {pk for pk, _ in missing}
+    missing_years = {year for _, year in missing}
+    rates = {}
+    for pk, night, price in NightlyRate.objects.filter(
+        accommodation_id__in=missing_ids,
+        date__gte=date(min(missing_years), 1, 1),
+        date__lt=date(max(missing_years) + 1, 1, 1),
+    ).values_list("accommodation_id", "date", "price"):
+        rates.setdefault((pk, night.year), []).append((night, int(price * 100)))
+
+    computed = {}
+    for pk, year in missing:
+        cumulative = year_cumulative(year, base_cents[pk], rates.get((pk, year)))
+        cumulatives[pk, year] = cumulative
+        computed[calendar_key(pk, year)] = (base_cents[pk], cumulative)
+    cache.set_many(computed, settings.RATE_CALENDAR_CACHE["TIMEOUT"])
+    return cumulatives, len(missing)
+
+
+def load_rate_calendar(accommodation_ids, start, end):
+    """
+    Monta o RateCalendar das acomodações ativas cobrindo `[start, end)`.
+
+    A diária padrão é `price` (valor anunciado ao hóspede) ou, quando ele
+    não está definido, `price_per_night`; as datas com NightlyRate a
+    substituem. O calendário começa em 1º de janeiro do ano de `start`.
+    """
+    rows = PropertyListing.objects.filter(
+        id_accommodation__in=set(accommodation_ids), is_active=True
+    ).values_list("id_accommodation", "price", "price_per_night", "cleaning_fee")
+    return build_rate_calendar(list(rows), start, end)
+
+
+def build_rate_calendar(rows, start, end):
+    """
+    RateCalendar de `rows` (`(id, price, price_per_night, cleaning_fee)`)
+    cobrindo `[start, end)`.
+    """
+    ids = [pk for pk, *_ in rows]
+    base_cents = dict(
+        zip(ids, to_cents(price or ppn for _, price, ppn, _ in rows).tolist())
+    )
+    years = range(start.year, (end - timedelta(days=1)).year + 1)
+    cumulatives, misses = year_cumulatives(base_cents, years)
+
+    # Emenda os anos: cada segmento continua a soma do anterior.
+    matrix = np.zeros(
+        (len(ids), (date(years[-1] + 1, 1, 1) - date(start.year, 1, 1)).days + 1),
+        dtype=np.int64,
+    )
+    offset = 0
+    for year in years:
+        days = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        if ids:
+            segment = np.stack([cumulatives[pk, year] for pk in ids])
+            matrix[:, offset + 1 : offset + days + 1] = (
+                segment[:, 1:] + matrix[:, offset, None]
+            )
+        offset += days
+
+    return RateCalendar(
+        date(start.year, 1, 1),
+        ids,
+        matrix,
+        to_cents(cleaning_fee or 0 for *_, cleaning_fee in rows),
+        cache_hits=len(cumulatives) - misses,
+        cache_misses=misses,
+    )
+
+
+def quote_stays(stays, record_cache=None):
+    """
+    Cota uma lista de estadias `(id_acomodação, check_in, check_out)`.
+
+    Retorna uma cotação por estadia, na mesma ordem da entrada. Se informado,
+    `record_cache(acertos, faltas)` recebe o uso do cache do calendário.
+    """
+    if not stays:
+        return []
+
+    accommodation_ids, check_ins, check_outs = zip(*stays)
+    invalid = [
+        str(position)
+        for position, (check_in, check_out) in enumerate(zip(check_ins, check_outs))
+        if check_out <= check_in
+    ]
+    if invalid:
+        raise serializers.ValidationError(
+            {
+                "stays": "A data de check-out deve ser após a data de check-in "
+                f"(posições {', '.join(invalid)})."
+            }
+        )
+
+    start, end = min(check_ins), max(check_outs)
+    if (end - start).days > settings.QUOTE_MAX_WINDOW_DAYS:
+        raise serializers.ValidationError(
+            {
+                "stays": "As estadias devem caber em uma janela de "
+                f"{settings.QUOTE_MAX_WINDOW_DAYS} dias."
+            }
+        )
+
+    calendar = load_rate_calendar(accommodation_ids, start, end)
+    if record_cache is not None:
+        record_cache(calendar.cache_hits, calendar.cache_misses)
+    missing = sorted({str(pk) for pk in accommodation_ids if pk not in calendar.index})
+    if missing:
+        raise serializers.ValidationError(
+            {"accommodations": f"Acomodações não encontradas: {', '.join(missing)}."}
+        )
+
+    rows = [calendar.index[pk] for pk in accommodation_ids]
+    nights, subtotals, totals = calendar.quote(rows, check_ins, check_outs)
+    percents = tax_percents(nights)
+
+    return [
+        {
+            "accommodation": str(accommodation_id),
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": check_out.isoformat(),
+            "nights": int(nights[i]),
+            "subtotal": format_cents(subtotals[i]),
+            "tax_rate": format_cents(percents[i]),
+            "cleaning_fee": format_cents(calendar.cleaning_cents[rows[i]]),
+            "total_price": format_cents(totals[i]),
+        }
+        for i, (accommodation_id, check_in, check_out) in enumerate(stays)
+    ]
+
+
+def stay_price(accommodation, check_in_date, check_out_date, record_cache=None):
+    """
+    Total de uma estadia pelo calendário de diárias, como em `quote_stays`,
+    a partir da acomodação já carregada.
+    """
+    if not accommodation.is_active:
+        raise serializers.ValidationError(
+            {"accommodation": "A acomodação não está ativa."}
+        )
+    if (check_out_date - check_in_date).days > settings.QUOTE_MAX_WINDOW_DAYS:
+        raise serializers.ValidationError(
+            {
+                "check_out_date": "A estadia deve caber em uma janela de "
+                f"{settings.QUOTE_MAX_WINDOW_DAYS} dias."
+            }
+        )
+    calendar = build_rate_calendar(
+        [
+            (
+                accommodation.pk,
+                accommodation.price,
+                accommodation.price_per_night,
+                accommodation.cleaning_fee,
+            )
+        ],
+        check_in_date,
+        check_out_date,
+    )
+    if record_cache is not None:
+        record_cache(calendar.cache_hits, calendar.cache_misses)
+    _, _, totals = calendar.quote([0], [check_in_date], [check_out_date])
+    return Decimal(format_cents(totals[0]))
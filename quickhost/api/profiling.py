@@ -0,0 +1,202 @@
+"""
+Perfil (cProfile) de requisições individuais em produção, sob demanda.
+
+Uma requisição é perfilada quando traz o cabeçalho `X-Profile` com o valor
+de PROFILING["TOKEN"] ou quando é sorteada pela amostragem de 1 em
+PROFILING["SAMPLE_RATE"]. O perfil é gravado em PROFILING["DIRECTORY"]
+(`<id>.prof`, legível pelo pstats) junto de um `<id>.json` com rota, view,
+status, duração e consultas SQL. Apenas os MAX_FILES perfis mais recentes
+são mantidos. A resposta recebe `X-Profile-Id`, e `manage.py profile_report`
+mostra as funções com maior tempo acumulado.
+
+Sob ASGI, o cProfile do Python 3.11 só observa a thread em que foi ligado.
+Por isso o `process_view` liga o profiler na thread do sync_to_async que
+executa a view síncrona, e o `__acall__` o desliga nessa mesma thread depois
+da resposta. Views assíncronas não são perfiladas: o cProfile veria apenas o
+event loop, intercalando outras requisições.
+
+O cProfile registra um único profiler por processo (no Python 3.12, a
+ferramenta do sys.monitoring), então só uma requisição é perfilada por vez:
+as que chegam enquanto outra está sendo perfilada seguem sem perfil, assim
+como quando `enable()` falha porque outro profiler já está ativo.
+"""
+
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger("my_logger")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+_active = threading.Lock()
+
+
+def profile_paths(directory, profile_id):
+    base = os.path.join(directory, profile_id)
+    return f"{base}.prof", f"{base}.json"
+
+
+def list_profiles(directory):
+    """Ids dos perfis gravados, do mais antigo para o mais recente."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".prof"))
+
+
+def rotate(directory, keep):
+    for profile_id in list_profiles(directory)[:-keep]:
+        for path in profile_paths(directory, profile_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Executa sob cProfile as requisições autorizadas ou sorteadas."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = self.trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        if not _active.acquire(blocking=False):
+            logger.debug("Perfil ignorado: outra requisição está sendo perfilada.")
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                logger.warning("Perfil ignorado: %s", e)
+                return self.get_response(request)
+            started = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _active.release()
+        elapsed = time.perf_counter() - started
+        response["X-Profile-Id"] = self.save(
+            request, response, profiler, elapsed, trigger
+        )
+        return response
+
+    async def __acall__(self, request):
+        trigger = self.trigger(request)
+        if trigger is None:
+            return await self.get_response(request)
+
+        if not _active.acquire(blocking=False):
+            logger.debug("Perfil ignorado: outra requisição está sendo perfilada.")
+            return await self.get_response(request)
+        try:
+            request.profiler = cProfile.Profile()
+            request.profiling = False
+            started = time.perf_counter()
+            try:
+                response = await self.get_response(request)
+            finally:
+                if request.profiling:
+                    # Mesma thread (thread_sensitive) em que process_view ligou.
+                    await sync_to_async(request.profiler.disable)()
+        finally:
+            _active.release()
+        elapsed = time.perf_counter() - started
+        if request.profiling:
+            response["X-Profile-Id"] = await sync_to_async(self.save)(
+                request, response, request.profiler, elapsed, trigger
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Liga o profiler do `__acall__` na thread que vai executar a view."""
+        profiler = getattr(request, "profiler", None)
+        if profiler is None or iscoroutinefunction(view_func):
+            return None
+        try:
+            profiler.enable()
+        except ValueError as e:
+            logger.warning("Perfil ignorado: %s", e)
+            return None
+        request.profiling = True
+        return None
+
+    def trigger(self, request):
+        config = settings.PROFILING
+        header = request.headers.get("X-Profile")
+        if header and config["TOKEN"] and hmac.compare_digest(header, config["TOKEN"]):
+            return "header"
+        if config["SAMPLE_RATE"] and random.randrange(config["SAMPLE_RATE"]) == 0:
+            return "sample"
+        return None
+
+    def save(self, request, response, profiler, elapsed, trigger):
+        config = settings.PROFILING
+        directory = config["DIRECTORY"]
+        os.makedirs(directory, exist_ok=True)
+        match = request.resolver_match
+        route = match.route.lstrip("^").rstrip("$") if match else ""
+        # O prefixo com data e hora mantém a ordem cronológica dos arquivos.
+        profile_id = "-".join(
+            filter(
+                None,
+                [
+                    datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+                    request.method.lower(),
+                    _UNSAFE.sub("_", route).strip("_"),
+                    uuid.uuid4().hex[:6],
+                ],
+            )
+        )
+        profile_path, meta_path = profile_paths(directory, profile_id)
+        profiler.dump_stats(profile_path)
+
+        stats = getattr(request, "query_stats", None)
+        meta = {
+            "id": profile_id,
+            "trigger": trigger,
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "view": getattr(request, "metrics_view", ""),
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "query_count": stats.count if stats else None,
+            "db_ms": round(stats.duration * 1000, 3) if stats else None,
+        }
+        with open(meta_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+        rotate(directory, config["MAX_FILES"])
+        logger.info(
+            "Perfil %s gravado (%s): %s %s em %.1f ms.",
+            profile_id,
+            trigger,
+            request.method,
+            request.path,
+            meta["duration_ms"],
+        )
+        return profile_id
@@ -0,0 +1,313 @@
+"""
+Rollups diários de ocupação e receita.
+
+ListingDailyStats guarda, por (acomodação, dia), as noites reservadas e a
+receita das reservas ativas; CityDailyStats e UfDailyStats somam essas linhas
+por cidade e por UF. Os relatórios por período leem só essas tabelas.
+
+`update_rollups` (`manage.py update_rollups`, periódico) é incremental:
+
+1. reúne os períodos afetados: as reservas com `updated_at` depois da marca
+   d'água e os RollupInvalidation (reservas excluídas ou movidas, gravados
+   pelos sinais em data/signals.py);
+2. recalcula os dias desses períodos, por acomodação, a partir das reservas;
+3. recalcula cidade e UF nos mesmos dias a partir das linhas por acomodação;
+4. avança a marca d'água e apaga as invalidações processadas.
+
+Cada passo recalcula o dia inteiro a partir da origem, então processar a
+mesma reserva duas vezes é inofensivo. Por isso a busca volta SAFETY_MARGIN
+antes da marca d'água: uma transação que gravou `updated_at` antes da última
+execução, mas só fez commit depois, ainda é vista na execução seguinte.
+
+A receita de uma reserva é dividida igualmente entre as noites (centavos de
+arredondamento na última). Mudar a cidade ou a UF de uma acomodação não
+reprocessa o histórico: use `update_rollups --rebuild`.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_DOWN, Decimal
+from uuid import uuid4
+
+from django.db import router, transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from data.models import (
+    Booking,
+    CityDailyStats,
+    ListingDailyStats,
+    RollupInvalidation,
+    RollupState,
+    UfDailyStats,
+)
+
+from . import bulk
+
+STATE_NAME = "daily_stats"
+
+SAFETY_MARGIN = timedelta(minutes=5)
+
+CENTS = Decimal("0.01")
+
+# Linhas lidas por vez nas varreduras e inseridas por INSERT.
+BATCH_SIZE = 1000
+
+# Tabela, colunas de agrupamento e filtros aceitos (parâmetro -> lookup) de
+# cada nível do relatório.
+REPORT_LEVELS = {
+    "accommodation": (
+        ListingDailyStats,
+        ("accommodation_id",),
+        {
+            "accommodation_id": "accommodation_id",
+            "city": "accommodation__city__iexact",
+            "uf": "accommodation__uf__iexact",
+        },
+    ),
+    "city": (
+        CityDailyStats,
+        ("uf", "city"),
+        {"city": "city__iexact", "uf": "uf__iexact"},
+    ),
+    "uf": (UfDailyStats, ("uf",), {"uf": "uf__iexact"}),
+}
+
+
+def nightly_revenue(check_in_date, check_out_date, price):
+    """(dia, receita) de cada noite da reserva."""
+    nights = (check_out_date - check_in_date).days
+    if nights < 1:
+        return []
+    per_night = (price / nights).quantize(CENTS, rounding=ROUND_DOWN)
+    days = [check_in_date + timedelta(days=offset) for offset in range(nights)]
+    revenues = [per_night] * (nights - 1) + [price - per_night * (nights - 1)]
+    return list(zip(days, revenues))
+
+
+def merge_ranges(ranges):
+    """Une períodos [início, fim) que se sobrepõem ou se tocam."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(period) for period in merged]
+
+
+def affected_ranges(since, until, using=None):
+    """
+    `{acomodação: [(início, fim), ...]}` dos períodos a recalcular e os ids
+    das invalidações usadas.
+    """
+    bookings = Booking.objects.using(using).filter(updated_at__lte=until)
+    if since is not None:
+        bookings = bookings.filter(updated_at__gt=since - SAFETY_MARGIN)
+    # Um só período por acomodação e consulta: o recálculo cobre os dias
+    # intermediários, o que só custa ler as reservas da própria acomodação.
+    stays = (
+        bookings.order_by()
+        .values_list("accommodation_id")
+        .annotate(Min("check_in_date"), Max("check_out_date"))
+    )
+    invalidations = (
+        RollupInvalidation.objects.using(using)
+        .filter(created_at__lte=until)
+        .values_list("pk", "accommodation_id", "check_in_date", "check_out_date")
+    )
+
+    ranges = defaultdict(list)
+    for accommodation_id, start, end in stays.iterator(chunk_size=BATCH_SIZE):
+        ranges[accommodation_id].append((start, end))
+    used = []
+    for pk, accommodation_id, start, end in invalidations.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        ranges[accommodation_id].append((start, end))
+        used.append(pk)
+    return {pk: merge_ranges(periods) for pk, periods in ranges.items()}, used
+
+
+def insert(model, names, rows, using=None):
+    """
+    Insere as linhas com o preparo em lote de bulk.db_rows: o bulk_create
+    instanciaria um modelo e compilaria cada valor de cada linha.
+    """
+    if not rows:
+        return
+    using = using or router.db_for_write(model)
+    columns, rows = bulk.db_rows(
+        model,
+        (model._meta.pk.name, *names),
+        [(uuid4(), *row) for row in rows],
+        using,
+    )
+    bulk.insert_rows(model, columns, rows, using, BATCH_SIZE)
+
+
+def recompute_listing(accommodation_id, start, end, using=None):
+    """Regrava as linhas da acomodação nos dias de [start, end)."""
+    totals = defaultdict(lambda: [0, Decimal("0.00")])
+    bookings = (
+        Booking.objects.using(using)
+        .filter(
+            accommodation_id=accommodation_id,
+            is_active=True,
+            check_in_date__lt=end,
+            check_out_date__gt=start,
+        )
+        .values_list("check_in_date", "check_out_date", "price")
+    )
+    for check_in_date, check_out_date, price in bookings.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        for day, revenue in nightly_revenue(check_in_date, check_out_date, price):
+            if start <= day < end:
+                totals[day][0] += 1
+                totals[day][1] += revenue
+
+    ListingDailyStats.objects.using(using).filter(
+        accommodation_id=accommodation_id, day__gte=start, day__lt=end
+    ).delete()
+    insert(
+        ListingDailyStats,
+        ("accommodation", "day", "nights", "revenue"),
+        [
+            (accommodation_id, day, nights, revenue)
+            for day, (nights, revenue) in sorted(totals.items())
+        ],
+        using,
+    )
+
+
+def recompute_regions(start, end, using=None):
+    """Regrava cidade e UF nos dias de [start, end) a partir das acomodações."""
+    listing_rows = ListingDailyStats.objects.using(using).filter(
+        day__gte=start, day__lt=end
+    )
+    cities = (
+        listing_rows.order_by()
+        .values("day", "accommodation__uf", "accommodation__city")
+        .annotate(total_nights=Sum("nights"), total_revenue=Sum("revenue"))
+    )
+    CityDailyStats.objects.using(using).filter(day__gte=start, day__lt=end).delete()
+    insert(
+        CityDailyStats,
+        ("uf", "city", "day", "nights", "revenue"),
+        [
+            (
+                row["accommodation__uf"],
+                row["accommodation__city"],
+                row["day"],
+                row["total_nights"],
+                Decimal(row["total_revenue"]).quantize(CENTS),
+            )
+            for row in cities.iterator(chunk_size=BATCH_SIZE)
+        ],
+        using,
+    )
+
+    ufs = (
+        CityDailyStats.objects.using(using)
+        .filter(day__gte=start, day__lt=end)
+        .order_by()
+        .values("day", "uf")
+        .annotate(total_nights=Sum("nights"), total_revenue=Sum("revenue"))
+    )
+    UfDailyStats.objects.using(using).filter(day__gte=start, day__lt=end).delete()
+    insert(
+        UfDailyStats,
+        ("uf", "day", "nights", "revenue"),
+        [
+            (
+                row["uf"],
+                row["day"],
+                row["total_nights"],
+                Decimal(row["total_revenue"]).quantize(CENTS),
+            )
+            for row in ufs.iterator(chunk_size=BATCH_SIZE)
+        ],
+        using,
+    )
+
+
+def rebuild(using=None):
+    """Apaga os rollups para que a próxima execução recalcule todo o histórico."""
+    with transaction.atomic(using=using):
+        for model in (ListingDailyStats, CityDailyStats, UfDailyStats):
+            model.objects.using(using).all().delete()
+        RollupInvalidation.objects.using(using).all().delete()
+        RollupState.objects.using(using).filter(name=STATE_NAME).delete()
+
+
+def update_rollups(using=None):
+    """
+    Processa as reservas alteradas desde a última execução e retorna
+    `{"listings": n, "days": n, "high_water_mark": datetime}`.
+    """
+    with transaction.atomic(using=using):
+        # select_for_update impede duas execuções simultâneas (no PostgreSQL).
+        state, _ = RollupState.objects.using(using).get_or_create(name=STATE_NAME)
+        state = RollupState.objects.using(using).select_for_update().get(pk=state.pk)
+        until = timezone.now()
+        ranges, invalidations = affected_ranges(state.high_water_mark, until, using)
+
+        for accommodation_id, periods in ranges.items():
+            for start, end in periods:
+                recompute_listing(accommodation_id, start, end, using)
+        regions = merge_ranges(
+            period for periods in ranges.values() for period in periods
+        )
+        for start, end in regions:
+            recompute_regions(start, end, using)
+
+        RollupInvalidation.objects.using(using).filter(pk__in=invalidations).delete()
+        state.high_water_mark = until
+        state.save(using=using)
+
+    return {
+        "listings": len(ranges),
+        "days": sum((end - start).days for start, end in regions),
+        "high_water_mark": until,
+    }
+
+
+def high_water_mark(using=None):
+    return (
+        RollupState.objects.using(using)
+        .filter(name=STATE_NAME)
+        .values_list("high_water_mark", flat=True)
+        .first()
+    )
+
+
+def report(level, start, end, by_day=False, filters=None, queryset=None):
+    """
+    Noites e receita em [start, end), somadas por chave do nível (e por dia,
+    com `by_day`). No nível de acomodação, o total traz a taxa de ocupação.
+    """
+    model, keys, lookups = REPORT_LEVELS[level]
+    rows = queryset if queryset is not None else model.objects.all()
+    rows = rows.filter(
+        day__gte=start,
+        day__lt=end,
+        **{lookups[name]: value for name, value in (filters or {}).items()},
+    )
+    group = keys + ("day",) if by_day else keys
+    rows = (
+        rows.order_by(*group)
+        .values(*group)
+        .annotate(total_nights=Sum("nights"), total_revenue=Sum("revenue"))
+    )
+
+    days = (end - start).days
+    results = []
+    for row in rows:
+        nights = row.pop("total_nights")
+        row["nights"] = nights
+        row["revenue"] = str(Decimal(row.pop("total_revenue")).quantize(CENTS))
+        if level == "accommodation" and not by_day:
+            row["occupancy_rate"] = round(nights / days, 4)
+        results.append(row)
+    return results
@@ -8,14 +8,20 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework import serializers
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
 from urllib.parse import urlparse
 from django.urls import reverse
 from django.conf import settings
 from datetime import datetime, date
 from decimal import Decimal
+import numpy as np
 from data import models
+from . import counters, dashboard, fees, metrics, pricing, rollups
+from .favorites import CARD_FIELDS
 import os
+import functools
 import uuid
 import logging
 
@@ -81,6 +87,29 @@ def generate_new_filename(original_filename):
     return new_filename
 
 
+def update_last_login_throttled(user):
+    """
+    Atualiza `last_login` no máximo uma vez por intervalo para cada usuário.
+    O login não reescreve a linha do usuário: apenas um UPDATE condicional
+    de `last_login` é emitido quando o valor carregado está desatualizado.
+    """
+    interval = settings.LAST_LOGIN_UPDATE_INTERVAL
+    if interval is None:
+        return False
+
+    now = timezone.now()
+    if user.last_login and now - user.last_login < interval:
+        return False
+
+    updated = (
+        User.objects.filter(pk=user.pk)
+        .filter(Q(last_login__isnull=True) | Q(last_login__lt=now - interval))
+        .update(last_login=now)
+    )
+    user.last_login = now
+    return bool(updated)
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     """Serializer para criação de novos usuários."""
 
@@ -120,7 +149,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
             errors["password"] = password_error
 
         if errors:
-            logger.error(f"Erros de validação encontrados: {errors}")
+            logger.error("Erros de validação encontrados: %s", errors)
             raise serializers.ValidationError(errors)
 
         return attrs
@@ -135,7 +164,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         user.is_active = True
         logger.info(
-            f"Usuário '{user.username}' criado com sucesso. UUID: {user.id_user}"
+            "Usuário '%s' criado com sucesso. UUID: %s", user.username, user.id_user
         )
 
         if profile_picture:
@@ -150,13 +179,20 @@ class UserCreateSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
 
-        logger.debug(f"Usuário criado: {user}")
+        logger.debug("Usuário criado: %s", user)
         return user
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer para atualização de dados do usuário."""
 
+    registered_accommodations = serializers.PrimaryKeyRelatedField(
+        many=True, read_only=True
+    )
+    registered_accommodation_bookings = serializers.PrimaryKeyRelatedField(
+        source="user_bookings", many=True, read_only=True
+    )
+
     class Meta:
         model = models.UserAccount
         fields = [
@@ -207,14 +243,14 @@ class UserUpdateSerializer(serializers.ModelSerializer):
                 errors["cpf"] = cpf_error
 
         if errors:
-            logger.error(f"Erros de validação na atualização: {errors}")
+            logger.error("Erros de validação na atualização: %s", errors)
             raise serializers.ValidationError(errors)
 
         return attrs
 
     def update(self, instance, validated_data):
         """Atualiza os dados do usuário e retorna mensagem apropriada."""
-        logger.debug(f"Iniciando a atualização do usuário: {instance.username}")
+        logger.debug("Iniciando a atualização do usuário: %s", instance.username)
 
         fields_to_update = [
             "username",
@@ -251,13 +287,13 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         try:
             instance.save()
         except serializers.ValidationError as e:
-            logger.error(f"Erro de validação: {e}")
+            logger.error("Erro de validação: %s", e)
             raise e
         except Exception as e:
-            logger.error(f"Erro ao salvar usuário: {e}")
+            logger.error("Erro ao salvar usuário: %s", e)
             raise serializers.ValidationError("Erro ao atualizar os dados do usuário.")
 
-        logger.info(f"Usuário '{instance.username}' atualizado com sucesso.")
+        logger.info("Usuário '%s' atualizado com sucesso.", instance.username)
 
         return {
             "message": "Os dados do usuário foram alterados com sucesso.",
@@ -290,24 +326,38 @@ class TokenObtainPairSerializer(TokenObtainPairSerializer):
         data = super().validate(attrs)
         user = self.user
 
-        user.authenticated = True
-        user.save()
+        update_last_login_throttled(user)
 
         data["user"] = {
             "email": user.email,
             "id_user": user.id_user,
-            "authenticated": user.authenticated,
+            "authenticated": True,
         }
 
-        logger.info(f"Validação bem-sucedida para o usuário: {user.email}.")
+        logger.info("Validação bem-sucedida para o usuário: %s.", user.email)
         return data
 
     def handle_error(self, error):
-        """Método para lidar com erros e definir authenticated como false."""
-        logger.error(f"Erro na validação do token: {error}.")
-        user = self.user
-        user.authenticated = False
-        user.save()
+        """Método para registrar erros de validação do token."""
+        logger.error("Erro na validação do token: %s.", error)
+
+
+def booking_id_rows(accommodation_ids):
+    """
+    `(acomodação, reserva)` de todas as reservas das acomodações, para
+    `registered_user_bookings` sem instanciar as reservas.
+    """
+    return models.Booking.objects.filter(
+        accommodation_id__in=accommodation_ids
+    ).values_list("accommodation_id", "id_booking")
+
+
+def group_booking_ids(rows):
+    """Agrupa as linhas de `booking_id_rows` por acomodação."""
+    grouped = {}
+    for accommodation_id, booking_id in rows:
+        grouped.setdefault(accommodation_id, []).append(booking_id)
+    return grouped
 
 
 class AccommodationSerializer(serializers.ModelSerializer):
@@ -316,6 +366,8 @@ class AccommodationSerializer(serializers.ModelSerializer):
     internal_images = serializers.ListField(
         child=serializers.ImageField(), allow_empty=True
     )
+    registered_user_bookings = serializers.SerializerMethodField()
+    is_favorited = serializers.SerializerMethodField()
 
     class Meta:
         model = models.PropertyListing
@@ -360,10 +412,29 @@ class AccommodationSerializer(serializers.ModelSerializer):
             "price_per_night",
             "price",
             "average_rating",
+            "favorite_count",
+            "booking_count",
+            "bookings_last_30_days",
             "created_at",
             "is_active",
+            "is_favorited",
         ]
 
+    def get_registered_user_bookings(self, obj):
+        """
+        Usa os ids agrupados passados pela view em `booking_ids`; sem eles,
+        consulta as reservas da acomodação.
+        """
+        booking_ids = self.context.get("booking_ids")
+        if booking_ids is None:
+            return list(obj.accommodation_bookings.values_list("pk", flat=True))
+        return booking_ids.get(obj.pk, [])
+
+    def get_is_favorited(self, obj):
+        """Usa os ids em cache passados pela view em `favorite_ids`."""
+        favorite_ids = self.context.get("favorite_ids")
+        return favorite_ids is not None and obj.pk in favorite_ids
+
     def get_fields(self):
         """
         Modifica dinamicamente os campos obrigatórios dependendo do contexto.
@@ -374,7 +445,6 @@ class AccommodationSerializer(serializers.ModelSerializer):
             fields["internal_images"].required = False
             fields["main_cover_image"].required = False
             fields["creator"].required = False
-            fields["registered_user_bookings"].required = False
             fields["created_at"].required = False
             fields["id_accommodation"].required = False
             fields["average_rating"].required = False
@@ -387,7 +457,6 @@ class AccommodationSerializer(serializers.ModelSerializer):
             fields["creator"].required = True
             fields["discount"].required = False
             fields["final_price"].required = False
-            fields["registered_user_bookings"].required = False
             fields["cleaning_fee"].required = True
             fields["consecutive_days_limit"].required = True
             fields["main_cover_image"].required = True
@@ -446,7 +515,6 @@ class AccommodationSerializer(serializers.ModelSerializer):
         try:
             internal_images = validated_data.pop("internal_images", [])
             main_cover_image = validated_data.pop("main_cover_image", None)
-            user = validated_data.get("creator")
 
             consecutive_days_limit = validated_data.get("consecutive_days_limit", 0)
             if consecutive_days_limit <= 0:
@@ -454,39 +522,13 @@ class AccommodationSerializer(serializers.ModelSerializer):
 
             price = validated_data.get("price_per_night", 0)
             validated_data["price"] = round(price, 2)
-            price_per_night = validated_data.get("price_per_night", 0)
-            price_per_night = Decimal(price_per_night)
-            if price_per_night > 0:
-                min_rate = Decimal("0.03")
-                max_rate = Decimal("0.15")
-                max_price_for_max_rate = Decimal("1000")
-                if price_per_night <= max_price_for_max_rate:
-                    rate = min_rate + (max_rate - min_rate) * (
-                        price_per_night / max_price_for_max_rate
-                    )
-                else:
-                    rate = max_rate
-                price_per_night *= 1 - rate
-            validated_data["price_per_night"] = round(price_per_night, 2)
+            validated_data["price_per_night"] = fees.net_price(price)
 
             with transaction.atomic():
 
-                registered_user_bookings_data = validated_data.pop(
-                    "registered_user_bookings", None
-                )
-
                 accommodation = models.PropertyListing.objects.create(**validated_data)
                 accommodation_uuid = accommodation.id_accommodation
-                logger.info(f"Acomodação criada: {accommodation_uuid}")
-
-                if registered_user_bookings_data:
-                    accommodation.registered_user_bookings.set(
-                        registered_user_bookings_data
-                    )
-
-                logger.info(
-                    f"Usuários relacionados adicionados à acomodação {accommodation.id_accommodation}."
-                )
+                logger.info("Acomodação criada: %s", accommodation_uuid)
 
                 image_paths = []
                 for image in internal_images:
@@ -495,7 +537,7 @@ class AccommodationSerializer(serializers.ModelSerializer):
                         image_folder = f"property_images/{accommodation_uuid}/"
                         file_path = os.path.join(image_folder, new_filename)
 
-                        logger.info(f"Salvando imagem {image.name} em {file_path}")
+                        logger.info("Salvando imagem %s em %s", image.name, file_path)
                         if default_storage.save(file_path, image):
                             image_paths.append("media/" + file_path)
 
@@ -508,11 +550,13 @@ class AccommodationSerializer(serializers.ModelSerializer):
                     if 0 <= main_cover_image < len(image_paths):
                         accommodation.main_cover_image = image_paths[main_cover_image]
                         logger.info(
-                            f"Imagem de capa principal definida: {image_paths[main_cover_image]}"
+                            "Imagem de capa principal definida: %s",
+                            image_paths[main_cover_image],
                         )
                     else:
                         logger.info(
-                            f"Índice inválido ({main_cover_image}) para main_cover_image. Deixando vazio."
+                            "Índice inválido (%s) para main_cover_image. Deixando vazio.",
+                            main_cover_image,
                         )
 
                 set_main_cover_image(main_cover_image, image_paths, accommodation)
@@ -520,16 +564,10 @@ class AccommodationSerializer(serializers.ModelSerializer):
                 accommodation.internal_images = list(map(str, image_paths))
                 accommodation.is_active = True
                 accommodation.save()
-                logger.info(f"URLs das imagens armazenadas: {image_paths}.")
-
-                user.registered_accommodations.add(accommodation_uuid)
-                user.save()
-                logger.info(
-                    f"Acomodação {accommodation_uuid} adicionada ao usuário {user.id_user}."
-                )
+                logger.info("URLs das imagens armazenadas: %s.", image_paths)
                 return accommodation
         except Exception as e:
-            logger.error(f"Erro ao criar acomodação: {e}")
+            logger.error("Erro ao criar acomodação: %s", e)
             raise
 
     def update(self, instance, validated_data):
@@ -538,9 +576,9 @@ class AccommodationSerializer(serializers.ModelSerializer):
         Campos não fornecidos explicitamente no `validated_data` mantêm seus valores originais.
         """
         logger.info(
-            f"Iniciando a atualização da acomodação {instance.id_accommodation}."
+            "Iniciando a atualização da acomodação %s.", instance.id_accommodation
         )
-        logger.info(validated_data)
+        logger.debug("Campos recebidos: %s", list(validated_data))
         try:
             # Verificar se foi fornecida nova lista de imagens
             if "internal_images" in validated_data:
@@ -557,7 +595,7 @@ class AccommodationSerializer(serializers.ModelSerializer):
                             )  # Remover prefixo 'media/'
                             if default_storage.exists(image_path):
                                 default_storage.delete(image_path)
-                                logger.info(f"Imagem {image_path} deletada.")
+                                logger.info("Imagem %s deletada.", image_path)
 
                     # Remover a pasta se estiver vazia
                     image_folder = os.path.join(
@@ -566,7 +604,7 @@ class AccommodationSerializer(serializers.ModelSerializer):
                     )
                     if os.path.isdir(image_folder) and not os.listdir(image_folder):
                         os.rmdir(image_folder)
-                        logger.info(f"Pasta {image_folder} deletada, pois está vazia.")
+                        logger.info("Pasta %s deletada, pois está vazia.", image_folder)
 
                     instance.internal_images.clear()  # Limpar a lista de imagens
                     validated_data["internal_images"] = []
@@ -594,7 +632,9 @@ class AccommodationSerializer(serializers.ModelSerializer):
                             )
                             file_path = os.path.join(image_folder, new_filename)
 
-                            logger.info(f"Salvando imagem {image.name} em {file_path}")
+                            logger.info(
+                                "Salvando imagem %s em %s", image.name, file_path
+                            )
                             if default_storage.save(file_path, image):
                                 image_paths.append("media/" + file_path)
 
@@ -614,11 +654,12 @@ class AccommodationSerializer(serializers.ModelSerializer):
                             main_cover_image_index
                         ]
                         logger.info(
-                            f"Imagem de capa atualizada: {instance.main_cover_image}"
+                            "Imagem de capa atualizada: %s", instance.main_cover_image
                         )
                     else:
                         logger.warning(
-                            f"Índice inválido ({main_cover_image_index}) para imagem de capa. Mantendo existente."
+                            "Índice inválido (%s) para imagem de capa. Mantendo existente.",
+                            main_cover_image_index,
                         )
                 except (ValueError, TypeError):
                     logger.warning(
@@ -632,20 +673,9 @@ class AccommodationSerializer(serializers.ModelSerializer):
                     validated_data["price"] = round(price, 2)
 
             if "price_per_night" in validated_data:
-                price_per_night = Decimal(validated_data["price_per_night"])
-                if price_per_night > 0:
-                    min_rate = Decimal("0.03")
-                    max_rate = Decimal("0.15")
-                    max_price_for_max_rate = Decimal("1000")
-                    if price_per_night <= max_price_for_max_rate:
-                        rate = min_rate + (max_rate - min_rate) * (
-                            price_per_night / max_price_for_max_rate
-                        )
-                    else:
-                        rate = max_rate
-                    validated_data["price_per_night"] = round(
-                        price_per_night * (1 - rate), 2
-                    )
+                validated_data["price_per_night"] = fees.net_price(
+                    validated_data["price_per_night"]
+                )
 
             # Preservação de outros campos
             fields_to_preserve = [
@@ -681,13 +711,13 @@ class AccommodationSerializer(serializers.ModelSerializer):
 
             instance.save()
             logger.info(
-                f"Acomodação {instance.id_accommodation} atualizada com sucesso."
+                "Acomodação %s atualizada com sucesso.", instance.id_accommodation
             )
             return instance
 
         except Exception as e:
             logger.error(
-                f"Erro ao atualizar acomodação {instance.id_accommodation}: {e}"
+                "Erro ao atualizar acomodação %s: %s", instance.id_accommodation, e
             )
             raise
 
@@ -770,7 +800,24 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Erro ao atualizar review.")
 
 
+# Restrição de exclusão do PostgreSQL (migração 0003) contra reservas ativas
+# sobrepostas na mesma acomodação.
+BOOKING_OVERLAP_CONSTRAINT = "data_booking_no_overlap"
+
+
+def violated_constraint(error):
+    """Nome da restrição violada, quando o driver informa (psycopg)."""
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None)
+
+
 class BookingSerializer(serializers.ModelSerializer):
+    """
+    O preço é sempre calculado pelo servidor com o calendário de diárias
+    (NightlyRate, taxa por duração e limpeza); o valor enviado pelo cliente
+    é ignorado.
+    """
+
     user_booking = serializers.PrimaryKeyRelatedField(
         queryset=models.UserAccount.objects.all()
     )
@@ -790,8 +837,18 @@ class BookingSerializer(serializers.ModelSerializer):
             "is_active",
             "created_at",
         ]
+        read_only_fields = ["price"]
 
-    def calculate_total_price(self, check_in_date, check_out_date, price):
+    def get_fields(self):
+        fields = super().get_fields()
+        # `?expand=accommodation`: o resumo vem do select_related da view.
+        if "accommodation" in self.context.get("expand", ()):
+            fields["accommodation_card"] = AccommodationCardSerializer(
+                source="accommodation", read_only=True
+            )
+        return fields
+
+    def calculate_total_price(self, accommodation, check_in_date, check_out_date):
         if isinstance(check_in_date, str):
             check_in_date = datetime.strptime(check_in_date, "%Y-%m-%d").date()
         if isinstance(check_out_date, str):
@@ -805,14 +862,12 @@ class BookingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "A quantidade de dias deve ser pelo menos 1."
             )
-        if days_difference <= 3:
-            tax_rate = Decimal("1.05")
-        elif 4 <= days_difference <= 7:
-            tax_rate = Decimal("1.10")
-        else:
-            tax_rate = Decimal("1.15")
-        total_price = Decimal(price) * days_difference * tax_rate
-        return total_price
+        return pricing.stay_price(
+            accommodation,
+            check_in_date,
+            check_out_date,
+            record_cache=functools.partial(metrics.record_cache, "rate_calendar"),
+        )
 
     def create(self, validated_data):
         try:
@@ -822,10 +877,9 @@ class BookingSerializer(serializers.ModelSerializer):
                 accommodation = validated_data["accommodation"]
                 check_in_date = validated_data["check_in_date"]
                 check_out_date = validated_data["check_out_date"]
-                price = validated_data["price"]
 
                 total_price = self.calculate_total_price(
-                    check_in_date, check_out_date, price
+                    accommodation, check_in_date, check_out_date
                 )
 
                 booking = models.Booking.objects.create(
@@ -837,16 +891,19 @@ class BookingSerializer(serializers.ModelSerializer):
                     is_active=validated_data.get("is_active", True),
                 )
 
-                accommodation.registered_user_bookings.add(booking)
-
-                user_booking.registered_accommodation_bookings.add(booking)
-
-                user_booking.registered_accommodations.add(accommodation)
-
                 return booking
 
+        except serializers.ValidationError:
+            raise
+        except IntegrityError as e:
+            if violated_constraint(e) != BOOKING_OVERLAP_CONSTRAINT:
+                raise
+            logger.warning("Reserva sobreposta rejeitada: %s", e)
+            raise serializers.ValidationError(
+                {"detail": "A acomodação já está reservada para estas datas."}
+            )
         except Exception as e:
-            logger.error(f"Erro ao criar reserva: {e}")
+            logger.error("Erro ao criar reserva: %s", e)
             raise serializers.ValidationError(
                 {"detail": f"Erro ao criar reserva: {str(e)}"}
             )
@@ -854,64 +911,241 @@ class BookingSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         try:
             with transaction.atomic():
-
+                previous_accommodation = instance.accommodation_id
                 instance.check_in_date = validated_data.get(
                     "check_in_date", instance.check_in_date
                 )
                 instance.check_out_date = validated_data.get(
                     "check_out_date", instance.check_out_date
                 )
-                instance.price = validated_data.get("price", instance.price)
                 instance.is_active = validated_data.get("is_active", instance.is_active)
-
-                new_accommodation = validated_data.get(
+                instance.accommodation = validated_data.get(
                     "accommodation", instance.accommodation
                 )
-                new_user_booking = validated_data.get(
+                instance.user_booking = validated_data.get(
                     "user_booking", instance.user_booking
                 )
 
-                if new_accommodation != instance.accommodation:
-
-                    instance.accommodation.registered_bookings.remove(instance)
-                    instance.accommodation.registered_user_bookings.remove(instance)
-
-                    new_accommodation.registered_bookings.add(instance)
-                    new_accommodation.registered_user_bookings.add(instance)
-
-                    instance.accommodation = new_accommodation
-
-                if new_user_booking != instance.user_booking:
-
-                    instance.user_booking.registered_accommodation_bookings.remove(
-                        instance
+                if {"accommodation", "check_in_date", "check_out_date"} & set(
+                    validated_data
+                ):
+                    instance.price = self.calculate_total_price(
+                        instance.accommodation,
+                        instance.check_in_date,
+                        instance.check_out_date,
                     )
 
-                    new_user_booking.registered_accommodation_bookings.add(instance)
-
-                    instance.user_booking = new_user_booking
-
                 instance.save()
-
-                new_accommodation.save()
-                new_user_booking.save()
+                if instance.accommodation_id != previous_accommodation:
+                    counters.booking_moved(instance, previous_accommodation)
+                    # post_save só descarta o painel do anfitrião da nova acomodação.
+                    dashboard.invalidate_for_listings([previous_accommodation])
 
                 return instance
 
+        except serializers.ValidationError:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao atualizar reserva: {e}")
+            logger.error("Erro ao atualizar reserva: %s", e)
             raise serializers.ValidationError(
                 {"detail": f"Erro ao atualizar reserva: {str(e)}"}
             )
 
 
+class AccommodationCardSerializer(serializers.ModelSerializer):
+    """Resumo da acomodação embutido nos favoritos e nas reservas."""
+
+    class Meta:
+        model = models.PropertyListing
+        fields = list(CARD_FIELDS)
+        read_only_fields = fields
+
+
 class FavoritePropertySerializer(serializers.ModelSerializer):
+    accommodation_card = AccommodationCardSerializer(
+        source="accommodation", read_only=True
+    )
+
     class Meta:
         model = models.FavoriteProperty
         fields = [
             "id_favorite_property",
             "user_favorite_property",
             "accommodation",
+            "accommodation_card",
             "created_at",
         ]
         read_only_fields = ["id_favorite_property", "created_at"]
+
+
+class FavoriteBulkSerializer(serializers.Serializer):
+    add = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list
+    )
+    remove = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list
+    )
+
+    def validate(self, attrs):
+        if not attrs["add"] and not attrs["remove"]:
+            raise serializers.ValidationError("Informe acomodações em add ou remove.")
+        limit = settings.FAVORITES_BULK_MAX_ITEMS
+        if len(attrs["add"]) + len(attrs["remove"]) > limit:
+            raise serializers.ValidationError(
+                f"Máximo de {limit} acomodações por requisição."
+            )
+        if set(attrs["add"]) & set(attrs["remove"]):
+            raise serializers.ValidationError(
+                "Uma acomodação não pode estar em add e remove ao mesmo tempo."
+            )
+        return attrs
+
+
+class NightlyRateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.NightlyRate
+        fields = ["date", "price", "label"]
+
+
+class StayQuoteSerializer(serializers.Serializer):
+    accommodation = serializers.UUIDField()
+    check_in_date = serializers.DateField()
+    check_out_date = serializers.DateField()
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    """
+    Pedido de cotação: uma lista de estadias em `stays` ou um único período
+    (`check_in_date`/`check_out_date`) aplicado a todas as `accommodations`.
+    """
+
+    stays = StayQuoteSerializer(many=True, required=False)
+    accommodations = serializers.ListField(
+        child=serializers.UUIDField(), required=False
+    )
+    check_in_date = serializers.DateField(required=False)
+    check_out_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if "stays" in attrs:
+            if "accommodations" in attrs:
+                raise serializers.ValidationError(
+                    "Informe `stays` ou `accommodations`, não ambos."
+                )
+            stays = [
+                (
+                    stay["accommodation"],
+                    stay["check_in_date"],
+                    stay["check_out_date"],
+                )
+                for stay in attrs["stays"]
+            ]
+        elif "accommodations" in attrs:
+            if "check_in_date" not in attrs or "check_out_date" not in attrs:
+                raise serializers.ValidationError(
+                    "Informe `check_in_date` e `check_out_date` para as acomodações."
+                )
+            stays = [
+                (accommodation, attrs["check_in_date"], attrs["check_out_date"])
+                for accommodation in attrs["accommodations"]
+            ]
+        else:
+            raise serializers.ValidationError(
+                "Informe `stays` ou `accommodations` para cotar."
+            )
+
+        if len(stays) > settings.QUOTE_MAX_STAYS:
+            raise serializers.ValidationError(
+                f"Máximo de {settings.QUOTE_MAX_STAYS} estadias por cotação."
+            )
+        return {"stays": stays}
+
+
+class FeeSimulationSerializer(serializers.Serializer):
+    """
+    Diárias a simular: uma lista em `prices` ou uma faixa de `min_price` a
+    `max_price` (inclusive) com passo `step`.
+    """
+
+    prices = serializers.ListField(
+        child=serializers.DecimalField(
+            max_digits=10, decimal_places=2, min_value=Decimal("0")
+        ),
+        required=False,
+    )
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    step = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.01"), required=False
+    )
+
+    def validate(self, attrs):
+        limit = settings.FEE_SIMULATION_MAX_PRICES
+        if "prices" in attrs:
+            prices = pricing.to_cents(attrs["prices"])
+        elif {"min_price", "max_price", "step"} <= attrs.keys():
+            if attrs["min_price"] > attrs["max_price"]:
+                raise serializers.ValidationError(
+                    "`min_price` deve ser menor ou igual a `max_price`."
+                )
+            first, last, step = pricing.to_cents(
+                [attrs["min_price"], attrs["max_price"], attrs["step"]]
+            )
+            if (last - first) // step + 1 > limit:
+                raise serializers.ValidationError(
+                    f"Máximo de {limit} diárias por simulação."
+                )
+            prices = np.arange(first, last + 1, step, dtype=np.int64)
+        else:
+            raise serializers.ValidationError(
+                "Informe `prices` ou `min_price`, `max_price` e `step`."
+            )
+
+        if len(prices) > limit:
+            raise serializers.ValidationError(
+                f"Máximo de {limit} diárias por simulação."
+            )
+        return {"price_cents": prices}
+
+
+class DailyReportSerializer(serializers.Serializer):
+    """
+    Relatório dos rollups diários: nível (`accommodation`, `city` ou `uf`),
+    período [start, end), `by_day` para uma linha por dia e filtros opcionais.
+    """
+
+    level = serializers.ChoiceField(
+        choices=list(rollups.REPORT_LEVELS), default="accommodation"
+    )
+    start = serializers.DateField()
+    end = serializers.DateField()
+    by_day = serializers.BooleanField(default=False)
+    accommodation_id = serializers.UUIDField(required=False)
+    city = serializers.CharField(required=False)
+    uf = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError("`start` deve ser anterior a `end`.")
+        limit = settings.DAILY_REPORT_MAX_DAYS
+        if (attrs["end"] - attrs["start"]).days > limit:
+            raise serializers.ValidationError(f"Período máximo de {limit} dias.")
+
+        lookups = rollups.REPORT_LEVELS[attrs["level"]][2]
+        filters = {
+            name: attrs.pop(name)
+            for name in ("accommodation_id", "city", "uf")
+            if name in attrs
+        }
+        unsupported = sorted(set(filters) - set(lookups))
+        if unsupported:
+            raise serializers.ValidationError(
+                f"Filtros não aceitos no nível {attrs['level']}: "
+                f"{', '.join(unsupported)}."
+            )
+        attrs["filters"] = filters
+        return attrs
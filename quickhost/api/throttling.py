@@ -0,0 +1,189 @@
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+import logging
+
+logger = logging.getLogger("my_logger")
+
+PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Converte uma taxa no formato "<requisições>/<período>" (ex.: "10/min")
+    em (capacidade do balde, fichas repostas por segundo).
+    """
+    num, period = rate.split("/")
+    capacity = int(num)
+    seconds = PERIODS[period.strip().lower()]
+    return capacity, capacity / seconds
+
+
+class LocalTokenBucketBackend:
+    """
+    Baldes de fichas mantidos na memória do processo.
+
+    Cada balde é uma tupla imutável (fichas, instante) substituída por uma
+    única atribuição no dicionário, sem locks. Sob concorrência, duas threads
+    podem ler o mesmo estado e uma ficha extra pode ser concedida; em troca,
+    o custo por requisição é apenas uma leitura e uma escrita de dicionário.
+
+    O dicionário é um LRU: cada escrita move o balde para o fim, e acima de
+    MAX_KEYS os menos usados saem do início em O(1). Um balde descartado
+    volta cheio, o que só acontece com um cliente inativo enquanto outros
+    MAX_KEYS clientes fizeram requisições.
+    """
+
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        tokens, last = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_rate)
+
+        if tokens >= 1:
+            self.store(key, (tokens - 1, now))
+            return True, 0.0
+
+        self.store(key, (tokens, now))
+        return False, (1 - tokens) / refill_rate
+
+    def store(self, key, bucket):
+        # Remover e reinserir leva a chave para o fim sem o KeyError que o
+        # move_to_end daria se outra thread a tivesse descartado.
+        self.buckets.pop(key, None)
+        self.buckets[key] = bucket
+        while len(self.buckets) > self.MAX_KEYS:
+            try:
+                self.buckets.popitem(last=False)
+            except KeyError:
+                break
+
+    def reset(self):
+        self.buckets.clear()
+
+
+class CacheTokenBucketBackend:
+    """
+    Baldes de fichas compartilhados entre processos via cache do Django.
+
+    Usa o alias configurado em RATE_LIMITS["CACHE_ALIAS"]; para limitar de
+    fato entre workers o cache precisa ser compartilhado (ex.: DatabaseCache
+    sobre o SQLite ou Redis). Assim como o SimpleRateThrottle do DRF, a
+    leitura e a escrita não são atômicas.
+
+    O alias é dividido com os demais caches da aplicação, então `reset` não
+    pode limpá-lo: ele grava o instante em RESET_KEY, lido junto com o balde
+    (um único get_many), e os baldes anteriores a esse instante voltam
+    cheios. Os antigos expiram sozinhos pelo timeout.
+    """
+
+    RESET_KEY = "ratelimit:reset-at"
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.time()
+        values = self.cache.get_many([key, self.RESET_KEY])
+        tokens, last = values.get(key, (capacity, now))
+        if last < values.get(self.RESET_KEY, 0.0):
+            tokens, last = capacity, now
+        tokens = min(capacity, tokens + max(0.0, now - last) * refill_rate)
+        timeout = int(capacity / refill_rate) + 1
+
+        if tokens >= 1:
+            self.cache.set(key, (tokens - 1, now), timeout)
+            return True, 0.0
+
+        self.cache.set(key, (tokens, now), timeout)
+        return False, (1 - tokens) / refill_rate
+
+    def reset(self):
+        self.cache.set(self.RESET_KEY, time.time(), None)
+
+
+_backends = {}
+
+
+def get_backend():
+    """Retorna o backend configurado em RATE_LIMITS["BACKEND"]."""
+    config = settings.RATE_LIMITS
+    name = config.get("BACKEND", "local")
+    alias = config.get("CACHE_ALIAS", "default")
+    if (name, alias) not in _backends:
+        if name == "local":
+            _backends[(name, alias)] = LocalTokenBucketBackend()
+        elif name == "cache":
+            _backends[(name, alias)] = CacheTokenBucketBackend(alias)
+        else:
+            raise ValueError(f"Backend de rate limiting desconhecido: {name}")
+    return _backends[(name, alias)]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle do DRF baseado em balde de fichas.
+
+    A taxa vem de RATE_LIMITS["SCOPES"][view.throttle_scope]. Quando o
+    escopo não está configurado (ou RATE_LIMITS["ENABLED"] é falso) a
+    requisição é liberada. Ao negar, o DRF responde 429 com `Retry-After`.
+    """
+
+    key_prefix = "ratelimit"
+
+    def __init__(self):
+        self._wait = None
+
+    def get_rate(self, view):
+        config = settings.RATE_LIMITS
+        if not config.get("ENABLED", True):
+            return None
+        scope = getattr(view, "throttle_scope", None)
+        return config.get("SCOPES", {}).get(scope)
+
+    def get_identifier(self, request):
+        """Por padrão, o IP do cliente, como nos throttles do DRF."""
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        key = f"{self.key_prefix}:{view.throttle_scope}:{self.get_identifier(request)}"
+        allowed, self._wait = get_backend().consume(key, capacity, refill_rate)
+        if not allowed:
+            logger.warning("Limite de requisições excedido para %s.", key)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Limita requisições por endereço IP do cliente."""
+
+    key_prefix = "ratelimit:ip"
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Limita por usuário autenticado; requisições anônimas caem no IP."""
+
+    key_prefix = "ratelimit:user"
+
+    def get_identifier(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return f"ip-{self.get_ident(request)}"
@@ -301,7 +301,7 @@ def validate_check_in_date(check_in_date):
         return "Data de check-in inválida. Use o formato YYYY-MM-DD."
 
     if date_obj <= date.today():
-        logger.info(f"Datas: {date_obj, date.today}")
+        logger.info("Datas: %s, %s", date_obj, date.today())
         return "A data de check-in deve ser a partir de amanhã."
 
     return None
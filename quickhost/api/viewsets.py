@@ -1,7 +1,8 @@
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import viewsets, status, response, exceptions, generics
+from rest_framework.decorators import action
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import Cursor, CursorPagination
 from rest_framework.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from rest_framework.response import Response
@@ -16,8 +17,10 @@ from data.models import (
     UserAccount,
     Booking,
     FavoriteProperty,
+    NightlyRate,
 )
-from django.db.models import Avg
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Avg, Q
 
 from .serializers import (
     AccommodationSerializer,
@@ -27,9 +30,22 @@ from .serializers import (
     ReviewSerializer,
     BookingSerializer,
     FavoritePropertySerializer,
+    FavoriteBulkSerializer,
+    QuoteRequestSerializer,
+    NightlyRateSerializer,
+    FeeSimulationSerializer,
+    DailyReportSerializer,
+    booking_id_rows,
+    group_booking_ids,
 )
+from . import dashboard, favorites, fees, metrics, pricing, rollups
+from .filters import filter_accommodations, filter_bookings
+from quickhost.routers import allow_replica_reads
+from .throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
 from data import models
+from datetime import date
 from uuid import UUID
+import functools
 import uuid
 import logging
 import re
@@ -42,16 +58,35 @@ Acommodation = get_user_model()
 User = get_user_model()
 
 
+class ReplicaReadMixin:
+    """Libera as leituras das ações em `replica_actions` para as réplicas do banco."""
+
+    replica_actions = ("list", "retrieve", "search")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            allow_replica_reads()
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """ViewSet para gerenciar usuários."""
 
     queryset = User.objects.all()
+    throttle_scope = "signup"
 
     def get_permissions(self):
         if self.action in ["create", "get_by_uuid"]:
             return [AllowAny()]
+        if self.action == "dashboard":
+            return [IsAuthenticated()]
         return [permission() for permission in self.permission_classes]
 
+    def get_throttles(self):
+        if self.action == "create":
+            return [IPTokenBucketThrottle()]
+        return super().get_throttles()
+
     def get_serializer_class(self):
         """Retorna o serializador apropriado com base na ação."""
         return UserCreateSerializer if self.action == "create" else UserUpdateSerializer
@@ -68,7 +103,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
-        logger.info(f"Novo usuário criado: {serializer.validated_data['username']}")
+        logger.info("Novo usuário criado: %s", serializer.validated_data["username"])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def list(self, request, *args, **kwargs):
@@ -109,11 +144,34 @@ class UserViewSet(viewsets.ModelViewSet):
         user.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=["get"])
+    def dashboard(self, request, pk=None):
+        """Ocupação, receita, próximos check-ins e avaliações das acomodações do anfitrião."""
+        try:
+            host_id = UUID(pk)
+        except ValueError:
+            return Response({"detail": "Usuário não encontrado"}, status=404)
+        if host_id != request.user.pk and not request.user.is_staff:
+            return Response(
+                {"detail": "Você não tem permissão para ver este painel."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        data = dashboard.host_dashboard(host_id)
+        logger.info(
+            "Painel do anfitrião %s: %s acomodações.",
+            host_id,
+            data["totals"]["listings"],
+        )
+        return Response(data)
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """View para obter o par de tokens JWT."""
 
     serializer_class = TokenObtainPairSerializer
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
         """Sobrescreve o método POST para obter tokens."""
@@ -122,7 +180,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         try:
             serializer.is_valid(raise_exception=True)
             logger.info(
-                f"Token obtido com sucesso para o usuário: {serializer.validated_data['user']['email']}"
+                "Token obtido com sucesso para o usuário: %s",
+                serializer.validated_data["user"]["email"],
             )
             return Response(
                 {
@@ -132,7 +191,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                 status=status.HTTP_200_OK,
             )
         except Exception as e:
-            logger.error(f"Erro durante a obtenção do token: {str(e)}")
+            logger.error("Erro durante a obtenção do token: %s", e)
             return Response(
                 {
                     "error": "Erro ao tentar realizar login. Verifique suas credenciais.",
@@ -142,7 +201,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             )
 
 
-class AccommodationViewSet(viewsets.ModelViewSet):
+class AccommodationViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar acomodações."""
 
     serializer_class = AccommodationSerializer
@@ -152,10 +211,18 @@ class AccommodationViewSet(viewsets.ModelViewSet):
         permission_classes = (
             [IsAuthenticated]
             if self.action in ["create", "update", "partial_update", "destroy"]
+            or (self.action == "rates" and self.request.method != "GET")
             else [AllowAny]
         )
         return [permission() for permission in permission_classes]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        if user.is_authenticated:
+            context["favorite_ids"] = favorites.favorite_ids(user.pk)
+        return context
+
     def create(self, request, *args, **kwargs):
         """Cria uma nova acomodação (protegido)."""
         if not request.data:
@@ -181,24 +248,98 @@ class AccommodationViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         """Lista todas as acomodações ou filtra por ID do usuário, se fornecido."""
         user_id = request.query_params.get("user_id")
+        queryset = self.get_queryset()
 
         if user_id:
             try:
                 user_id_uuid = uuid.UUID(user_id)
-                self.queryset = self.queryset.filter(creator__id_user=user_id_uuid)
+                queryset = queryset.filter(creator__id_user=user_id_uuid).order_by(
+                    "-created_at"
+                )
             except ValueError:
                 return Response(
                     {"detail": "O ID do usuário deve estar no formato UUID."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        serializer = self.get_serializer(self.queryset, many=True)
-        data = serializer.data
+        return Response(self.list_data(list(queryset)))
 
-        for item, original in zip(data, self.queryset):
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Busca acomodações ativas por título, cidade, UF, categoria, hóspedes e preço."""
+        queryset = filter_accommodations(self.queryset, request.query_params)
+        return Response(self.list_data(list(queryset)))
+
+    def list_data(self, accommodations):
+        """Serializa as acomodações com os ids das reservas em uma só consulta."""
+        context = self.get_serializer_context()
+        context["booking_ids"] = group_booking_ids(
+            booking_id_rows([accommodation.pk for accommodation in accommodations])
+        )
+        data = self.get_serializer(accommodations, many=True, context=context).data
+        for item, original in zip(data, accommodations):
             item["internal_images"] = original.internal_images or []
+        return data
 
-        return Response(data)
+    @action(detail=True, methods=["get", "post"])
+    def rates(self, request, pk=None):
+        """Lista (GET) ou define (POST) as diárias específicas da acomodação."""
+        try:
+            accommodation = self.queryset.filter(id_accommodation=uuid.UUID(pk)).first()
+        except ValueError:
+            return Response(
+                {"detail": "O ID da acomodação deve estar no formato UUID."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if accommodation is None:
+            return Response(
+                {"detail": "Acomodação não encontrada."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if request.method == "GET":
+            rates = accommodation.nightly_rates.order_by("date")
+            start = request.query_params.get("start")
+            end = request.query_params.get("end")
+            try:
+                if start:
+                    rates = rates.filter(date__gte=date.fromisoformat(start))
+                if end:
+                    rates = rates.filter(date__lt=date.fromisoformat(end))
+            except ValueError:
+                return Response(
+                    {"detail": "As datas devem estar no formato AAAA-MM-DD."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(NightlyRateSerializer(rates, many=True).data)
+
+        if accommodation.creator != request.user:
+            return Response(
+                {"detail": "Você não tem permissão para alterar esta acomodação."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = NightlyRateSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        NightlyRate.objects.bulk_create(
+            [
+                NightlyRate(accommodation=accommodation, **rate)
+                for rate in serializer.validated_data
+            ],
+            update_conflicts=True,
+            unique_fields=["accommodation", "date"],
+            update_fields=["price", "label"],
+        )
+        pricing.invalidate_rate_calendar(
+            accommodation.id_accommodation,
+            [rate["date"] for rate in serializer.validated_data],
+        )
+        logger.info(
+            "%s diárias definidas para a acomodação %s.",
+            len(serializer.validated_data),
+            pk,
+        )
+        return Response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         """Retorna uma acomodação específica ou todas as acomodações."""
@@ -224,12 +365,7 @@ class AccommodationViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
         else:
-            serializer = self.get_serializer(self.queryset, many=True)
-            data = serializer.data
-
-            for item, original in zip(data, self.queryset):
-                item["internal_images"] = original.internal_images or []
-            return Response(data)
+            return Response(self.list_data(list(self.get_queryset())))
 
     def destroy(self, request, *args, **kwargs):
         """Exclui uma acomodação específica."""
@@ -258,7 +394,7 @@ class AccommodationViewSet(viewsets.ModelViewSet):
                             default_storage.delete(image_path)
 
                 accommodation.delete()
-                logger.info(f"Acomodação {id_accommodation} deletada com sucesso.")
+                logger.info("Acomodação %s deletada com sucesso.", id_accommodation)
 
             return Response(
                 {"detail": "Acomodação deletada com sucesso."},
@@ -270,7 +406,7 @@ class AccommodationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
-            logger.error(f"Erro ao deletar a acomodação {id_accommodation}: {e}")
+            logger.error("Erro ao deletar a acomodação %s: %s", id_accommodation, e)
             return Response(
                 {"detail": "Ocorreu um erro ao tentar deletar a acomodação."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -304,15 +440,9 @@ class AccommodationViewSet(viewsets.ModelViewSet):
 
             serializer.is_valid(raise_exception=True)
 
-            validated_data = serializer.validated_data
-            if "registered_user_bookings" in validated_data:
-                accommodation.registered_user_bookings.set(
-                    validated_data.pop("registered_user_bookings")
-                )
-
-            serializer.update(accommodation, validated_data)
+            serializer.update(accommodation, serializer.validated_data)
 
-            logger.info(f"Acomodação {id_accommodation} atualizada com sucesso.")
+            logger.info("Acomodação %s atualizada com sucesso.", id_accommodation)
             return Response(serializer.data)
 
         except ValueError:
@@ -321,7 +451,7 @@ class AccommodationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
-            logger.error(f"Erro ao atualizar a acomodação {id_accommodation}: {e}")
+            logger.error("Erro ao atualizar a acomodação %s: %s", id_accommodation, e)
             return Response(
                 {"detail": "Ocorreu um erro ao tentar atualizar a acomodação."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -346,8 +476,10 @@ class GetByUuidView(APIView):
 
         user = User.objects.filter(id_user=uuid).first()
         if user:
-            favorites = FavoriteProperty.objects.filter(user_favorite_property=user)
-            favorite_data = FavoritePropertySerializer(favorites, many=True).data
+            user_favorites = favorites.with_cards(
+                FavoriteProperty.objects.filter(user_favorite_property=user)
+            )
+            favorite_data = FavoritePropertySerializer(user_favorites, many=True).data
             return Response(
                 {
                     "id_user": str(user.id_user),
@@ -390,7 +522,82 @@ class GetByUuidView(APIView):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class QuoteView(APIView):
+    """Cota o preço total de várias estadias em uma única chamada."""
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quotes = pricing.quote_stays(
+            serializer.validated_data["stays"],
+            record_cache=functools.partial(metrics.record_cache, "rate_calendar"),
+        )
+        logger.info("%s estadias cotadas.", len(quotes))
+        return Response({"quotes": quotes})
+
+
+class FeeSimulationView(APIView):
+    """Simula a comissão e o valor líquido do anfitrião para várias diárias."""
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = FeeSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {"results": fees.simulate(serializer.validated_data["price_cents"])}
+        )
+
+
+class DailyReportView(APIView):
+    """
+    Noites reservadas e receita por período, lidas dos rollups diários.
+    Anfitriões veem apenas as próprias acomodações; cidade e UF são
+    restritos à equipe.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = DailyReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        level = params["level"]
+
+        queryset = None
+        if not request.user.is_staff:
+            if level != "accommodation":
+                return Response(
+                    {"detail": "Relatórios por cidade e UF são restritos à equipe."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            queryset = models.ListingDailyStats.objects.filter(
+                accommodation__creator=request.user
+            )
+
+        results = rollups.report(
+            level,
+            params["start"],
+            params["end"],
+            by_day=params["by_day"],
+            filters=params["filters"],
+            queryset=queryset,
+        )
+        return Response(
+            {
+                "level": level,
+                "start": params["start"],
+                "end": params["end"],
+                # Reservas alteradas depois disso ainda não entraram.
+                "updated_through": rollups.high_water_mark(),
+                "results": results,
+            }
+        )
+
+
+class ReviewViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet para gerenciar as avaliações de acomodações."""
 
     queryset = models.Review.objects.all()
@@ -407,7 +614,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         data = request.data
         serializer = self.get_serializer(data=data)
         if not serializer.is_valid():
-            logger.error(f"Erro na validação dos dados: {serializer.errors}")
+            logger.error("Erro na validação dos dados: %s", serializer.errors)
             return response.Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
@@ -416,15 +623,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         try:
             review = serializer.save(user_comment=request.user)
             logger.info(
-                f"Avaliação criada: {review.id_review} para a acomodação {review.accommodation.id_accommodation}"
+                "Avaliação criada: %s para a acomodação %s",
+                review.id_review,
+                review.accommodation.id_accommodation,
             )
 
             self.update_average_rating(review.accommodation)
             logger.info(
-                f"Média de avaliação atualizada para a acomodação {review.accommodation.id_accommodation}: {review.accommodation.average_rating}"
+                "Média de avaliação atualizada para a acomodação %s: %s",
+                review.accommodation.id_accommodation,
+                review.accommodation.average_rating,
             )
         except Exception as e:
-            logger.error(f"Erro ao criar avaliação: {str(e)}")
+            logger.error("Erro ao criar avaliação: %s", e)
             raise ValidationError("Erro ao criar review.", e)
         return response.Response(
             self.get_serializer(review).data, status=status.HTTP_201_CREATED
@@ -435,8 +646,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
         accommodation_id = request.query_params.get("accommodation_id", None)
 
         if accommodation_id:
-            reviews = self.queryset.filter(accommodation_id=accommodation_id)
-            logger.info(f"Listando avaliações para a acomodação {accommodation_id}")
+            reviews = self.queryset.filter(accommodation_id=accommodation_id).order_by(
+                "-created_at"
+            )
+            logger.info("Listando avaliações para a acomodação %s", accommodation_id)
         else:
             reviews = self.queryset.all()
             logger.info("Listando todas as avaliações.")
@@ -447,27 +660,29 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """Retorna os detalhes de uma avaliação ou todas de uma acomodação."""
         identifier = kwargs.get("pk")
-        logger.info(f"Buscando avaliação com identificador: {identifier}")
+        logger.info("Buscando avaliação com identificador: %s", identifier)
 
         try:
             review = self.queryset.get(id_review=identifier)
             serializer = self.get_serializer(review)
-            logger.info(f"Avaliação encontrada: {review.id_review}")
+            logger.info("Avaliação encontrada: %s", review.id_review)
             return response.Response(serializer.data)
         except models.Review.DoesNotExist:
-            logger.warning(f"Avaliação {identifier} não encontrada.")
+            logger.warning("Avaliação %s não encontrada.", identifier)
 
         try:
             accommodation = models.PropertyListing.objects.get(
                 id_accommodation=identifier
             )
-            reviews = self.queryset.filter(accommodation=accommodation)
+            reviews = self.queryset.filter(accommodation=accommodation).order_by(
+                "-created_at"
+            )
             serializer = self.get_serializer(reviews, many=True)
-            logger.info(f"Acomodações encontradas para o id {identifier}.")
+            logger.info("Acomodações encontradas para o id %s.", identifier)
             new_data = serializer.data
             return response.Response(new_data)
         except models.PropertyListing.DoesNotExist:
-            logger.error(f"Acomodação {identifier} não encontrada.")
+            logger.error("Acomodação %s não encontrada.", identifier)
             return response.Response(
                 {"detail": "Nenhuma avaliação ou acomodação encontrada."},
                 status=status.HTTP_404_NOT_FOUND,
@@ -488,26 +703,32 @@ class ReviewViewSet(viewsets.ModelViewSet):
                 )
                 review.accommodation = accommodation
                 logger.info(
-                    f"Acomodação {accommodation_id} associada à avaliação {review.id_review}"
+                    "Acomodação %s associada à avaliação %s",
+                    accommodation_id,
+                    review.id_review,
                 )
             except models.PropertyListing.DoesNotExist:
-                logger.error(f"Acomodação {accommodation_id} não encontrada.")
+                logger.error("Acomodação %s não encontrada.", accommodation_id)
                 raise ValidationError({"detail": "Acomodação não encontrada."})
 
         if rating is not None:
             review.rating = rating
             logger.info(
-                f"Avaliação {review.id_review} atualizada com novo rating: {rating}"
+                "Avaliação %s atualizada com novo rating: %s", review.id_review, rating
             )
         if comment:
             review.comment = comment
-            logger.info(f"Avaliação {review.id_review} atualizada com novo comentário.")
+            logger.info(
+                "Avaliação %s atualizada com novo comentário.", review.id_review
+            )
 
         review.save()
 
         self.update_average_rating(review.accommodation)
         logger.info(
-            f"Média de avaliação atualizada para a acomodação {review.accommodation.id_accommodation}: {review.accommodation.average_rating}"
+            "Média de avaliação atualizada para a acomodação %s: %s",
+            review.accommodation.id_accommodation,
+            review.accommodation.average_rating,
         )
 
         return response.Response(self.get_serializer(review).data)
@@ -525,7 +746,9 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
         self.update_average_rating(accommodation)
         logger.info(
-            f"Avaliação {review.id_review} excluída e média atualizada para a acomodação {accommodation.id_accommodation}."
+            "Avaliação %s excluída e média atualizada para a acomodação %s.",
+            review.id_review,
+            accommodation.id_accommodation,
         )
 
         return response.Response(status=status.HTTP_204_NO_CONTENT)
@@ -537,18 +760,103 @@ class ReviewViewSet(viewsets.ModelViewSet):
             average = reviews.aggregate(Avg("rating"))["rating__avg"]
             accommodation.average_rating = round(average, 2)
             logger.info(
-                f"Nova média calculada para acomodação {accommodation.id_accommodation}: {accommodation.average_rating}"
+                "Nova média calculada para acomodação %s: %s",
+                accommodation.id_accommodation,
+                accommodation.average_rating,
             )
         else:
             accommodation.average_rating = 0.00
             logger.info(
-                f"Nenhuma avaliação encontrada. Média definida como 0 para a acomodação {accommodation.id_accommodation}."
+                "Nenhuma avaliação encontrada. Média definida como 0 para a acomodação %s.",
+                accommodation.id_accommodation,
             )
         accommodation.save()
 
 
-class BookingPagination(PageNumberPagination):
+class BookingPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset): cada página é uma consulta pelo índice a
+    partir da última reserva vista, sem COUNT(*) nem OFFSET.
+
+    O CursorPagination do DRF posiciona o cursor só pelo primeiro campo da
+    ordenação e desempata com um deslocamento, o que repete ou pula reservas
+    quando várias têm o mesmo check-in. Aqui o cursor guarda todos os campos
+    da ordenação (o último é sempre o id_booking, único), e a página seguinte
+    é `(campo, id) > (valor, id)` na direção da ordenação.
+    """
+
     page_size = 10
+    ordering = ("-created_at", "-id_booking")
+
+    def get_ordering(self, request, queryset, view):
+        # A ordem depende do período escolhido (filter_bookings).
+        return tuple(queryset.query.order_by) or self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = self.after(queryset, ordering, self.cursor.position)
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def after(self, queryset, ordering, position):
+        """Reservas depois de `position` na ordem de `ordering`."""
+        values = (position or "").split("|")
+        if len(values) != len(ordering):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {
+                previous.lstrip("-"): value
+                for previous, value in zip(ordering[:index], values)
+            }
+            condition |= Q(**equal, **{f"{name}__{lookup}": values[index]})
+        try:
+            return queryset.filter(condition)
+        except (ValueError, DjangoValidationError):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+
+    def position(self, booking):
+        return "|".join(
+            str(getattr(booking, field.lstrip("-"))) for field in self.ordering
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.position(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.position(self.page[0]))
+        )
 
 
 class BookingViewSet(viewsets.ModelViewSet):
@@ -556,10 +864,41 @@ class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = BookingPagination
+    throttle_scope = "booking_create"
+    expansions = ("accommodation",)
+
+    def get_throttles(self):
+        if self.action == "create":
+            return [UserTokenBucketThrottle()]
+        return super().get_throttles()
+
+    def get_expand(self):
+        """Relações pedidas em `?expand=` (hoje só `accommodation`)."""
+        expand = {
+            name
+            for name in self.request.query_params.get("expand", "").split(",")
+            if name
+        }
+        unknown = expand.difference(self.expansions)
+        if unknown:
+            raise ValidationError(
+                {"expand": f"Use uma destas expansões: {', '.join(self.expansions)}."}
+            )
+        return expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
 
     def get_queryset(self):
         """Filtra as reservas pelo usuário autenticado."""
-        return self.queryset.filter(user_booking=self.request.user)
+        queryset = self.queryset.filter(user_booking=self.request.user).order_by(
+            "-created_at", "-id_booking"
+        )
+        if "accommodation" in self.get_expand():
+            queryset = favorites.with_cards(queryset)
+        return queryset
 
     def perform_create(self, serializer):
         """Define o usuário autenticado como `user_booking` ao salvar a reserva."""
@@ -568,9 +907,9 @@ class BookingViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         """Lista todas as reservas do usuário autenticado."""
         logger.info(
-            f"Usuário {request.user.username} solicitou a listagem de reservas."
+            "Usuário %s solicitou a listagem de reservas.", request.user.username
         )
-        queryset = self.get_queryset()
+        queryset = filter_bookings(self.get_queryset(), request.query_params)
         page = self.paginate_queryset(queryset)
 
         if page is not None:
@@ -579,7 +918,9 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(queryset, many=True)
         logger.info(
-            f"Retornando {len(serializer.data)} reservas para o usuário {request.user.username}."
+            "Retornando %s reservas para o usuário %s.",
+            len(serializer.data),
+            request.user.username,
         )
         return Response(serializer.data)
 
@@ -589,7 +930,9 @@ class BookingViewSet(viewsets.ModelViewSet):
             booking = self.get_queryset().get(pk=kwargs["pk"])
         except models.Booking.DoesNotExist:
             logger.warning(
-                f"Reserva {kwargs['pk']} não encontrada para o usuário {request.user.username}."
+                "Reserva %s não encontrada para o usuário %s.",
+                kwargs["pk"],
+                request.user.username,
             )
             return Response(
                 {"detail": "Reserva não encontrada. Verifique o ID fornecido."},
@@ -598,14 +941,16 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(booking)
         logger.info(
-            f"Detalhes da reserva {kwargs['pk']} retornados para o usuário {request.user.username}."
+            "Detalhes da reserva %s retornados para o usuário %s.",
+            kwargs["pk"],
+            request.user.username,
         )
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         """Cria uma nova reserva para uma acomodação."""
         logger.info(
-            f"Usuário {request.user.username} está tentando criar uma nova reserva."
+            "Usuário %s está tentando criar uma nova reserva.", request.user.username
         )
         serializer = self.get_serializer(data=request.data)
         try:
@@ -613,11 +958,11 @@ class BookingViewSet(viewsets.ModelViewSet):
             self.perform_create(serializer)
 
             logger.info(
-                f"Reserva criada com sucesso para o usuário {request.user.username}."
+                "Reserva criada com sucesso para o usuário %s.", request.user.username
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        except serializers.ValidationError as e:
-            logger.warning(f"Erro de validação ao criar reserva: {e}")
+        except ValidationError as e:
+            logger.warning("Erro de validação ao criar reserva: %s", e)
             return Response(
                 {
                     "detail": "Erro de validação nos dados fornecidos.",
@@ -626,7 +971,7 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
-            logger.error(f"Erro interno ao criar reserva: {e}")
+            logger.error("Erro interno ao criar reserva: %s", e)
             return Response(
                 {"detail": "Erro interno ao tentar criar a reserva."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -636,7 +981,9 @@ class BookingViewSet(viewsets.ModelViewSet):
         """Atualiza os detalhes de uma reserva específica."""
         booking = self.get_object()
         logger.info(
-            f"Usuário {request.user.username} está tentando atualizar a reserva {booking.id_booking}."
+            "Usuário %s está tentando atualizar a reserva %s.",
+            request.user.username,
+            booking.id_booking,
         )
         serializer = self.get_serializer(booking, data=request.data, partial=True)
 
@@ -644,11 +991,11 @@ class BookingViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
 
-            logger.info(f"Reserva {booking.id_booking} atualizada com sucesso.")
+            logger.info("Reserva %s atualizada com sucesso.", booking.id_booking)
             return Response(serializer.data)
-        except serializers.ValidationError as e:
+        except ValidationError as e:
             logger.warning(
-                f"Erro de validação ao atualizar a reserva {booking.id_booking}: {e}"
+                "Erro de validação ao atualizar a reserva %s: %s", booking.id_booking, e
             )
             return Response(
                 {
@@ -659,7 +1006,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             )
         except Exception as e:
             logger.error(
-                f"Erro interno ao atualizar a reserva {booking.id_booking}: {e}"
+                "Erro interno ao atualizar a reserva %s: %s", booking.id_booking, e
             )
             return Response(
                 {"detail": "Erro interno ao tentar atualizar a reserva."},
@@ -670,17 +1017,19 @@ class BookingViewSet(viewsets.ModelViewSet):
         """Exclui uma reserva específica."""
         booking = self.get_object()
         logger.info(
-            f"Usuário {request.user.username} está tentando excluir a reserva {booking.id_booking}."
+            "Usuário %s está tentando excluir a reserva %s.",
+            request.user.username,
+            booking.id_booking,
         )
         try:
             booking.delete()
-            logger.info(f"Reserva {booking.id_booking} excluída com sucesso.")
+            logger.info("Reserva %s excluída com sucesso.", booking.id_booking)
             return Response(
                 {"detail": f"Reserva {booking.id_booking} excluída com sucesso."},
                 status=status.HTTP_204_NO_CONTENT,
             )
         except Exception as e:
-            logger.error(f"Erro ao excluir a reserva {booking.id_booking}: {e}")
+            logger.error("Erro ao excluir a reserva %s: %s", booking.id_booking, e)
             return Response(
                 {"detail": "Erro interno ao tentar excluir a reserva."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -692,15 +1041,16 @@ class FavoritePropertyViewSet(viewsets.ModelViewSet):
     serializer_class = FavoritePropertySerializer
 
     def get_queryset(self):
-
-        return models.FavoriteProperty.objects.filter(
-            user_favorite_property=self.request.user
+        return favorites.with_cards(
+            models.FavoriteProperty.objects.filter(
+                user_favorite_property=self.request.user
+            ).order_by("-created_at")
         )
 
     def list(self, request):
-        logger.info(f"User {request.user.username} is fetching their favorites.")
-        favorites = self.get_queryset()
-        serializer = self.serializer_class(favorites, many=True)
+        logger.info("User %s is fetching their favorites.", request.user.username)
+        user_favorites = self.get_queryset()
+        serializer = self.serializer_class(user_favorites, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def retrieve(self, request, *args, **kwargs):
@@ -729,11 +1079,42 @@ class FavoritePropertyViewSet(viewsets.ModelViewSet):
 
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            serializer.save(user_favorite_property=request.user)
+            # O post_save (contador e cache de favoritos) roda na mesma transação.
+            with transaction.atomic():
+                serializer.save(user_favorite_property=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Adiciona (`add`) e remove (`remove`) vários favoritos de uma vez."""
+        serializer = FavoriteBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add = serializer.validated_data["add"]
+        remove = serializer.validated_data["remove"]
+
+        found = set(
+            PropertyListing.objects.filter(pk__in=add).values_list("pk", flat=True)
+        )
+        missing = [str(pk) for pk in add if pk not in found]
+        if missing:
+            return Response(
+                {"detail": "Acomodações não encontradas.", "missing": missing},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            added = favorites.add_favorites(request.user.pk, add)
+            removed = favorites.remove_favorites(request.user.pk, remove)
+        logger.info(
+            "Usuário %s: %s favoritos adicionados, %s removidos.",
+            request.user.username,
+            len(added),
+            len(removed),
+        )
+        return Response({"added": added, "removed": removed})
+
     def destroy(self, request, *args, **kwargs):
         favorite_id = kwargs.get("pk")
         try:
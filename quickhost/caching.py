@@ -0,0 +1,63 @@
+"""
+Cache do Django configurado por variáveis de ambiente.
+
+CACHE_BACKEND escolhe o backend:
+
+- `locmem` (padrão): um cache na memória de cada processo;
+- `redis`: Redis em CACHE_URL (padrão redis://localhost:6379/0);
+- `database`: tabela CACHE_TABLE (padrão quickhost_cache), criada com
+  `manage.py createcachetable`.
+
+O calendário de diárias, os favoritos, o painel do anfitrião, os baldes do
+rate limiting e a fixação no primário após uma escrita são invalidados ou
+atualizados pelo processo que atendeu a escrita e lidos por todos. Com mais
+de um worker (WEB_CONCURRENCY > 1, a mesma variável lida pelo uvicorn), um
+cache por processo serviria dados velhos nos demais e multiplicaria os
+limites de requisição, por isso essa combinação é recusada na inicialização.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def worker_count(env=os.environ):
+    value = env.get("WEB_CONCURRENCY")
+    return int(value) if value else 1
+
+
+def is_shared(cache):
+    """Se a entrada de CACHES é vista por todos os processos."""
+    return cache["BACKEND"] not in LOCAL_BACKENDS
+
+
+def caches_from_env(env=os.environ):
+    """Retorna o dicionário CACHES."""
+    backend = env.get("CACHE_BACKEND", "locmem")
+
+    if backend == "locmem":
+        cache = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    elif backend == "redis":
+        cache = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env.get("CACHE_URL", "redis://localhost:6379/0"),
+        }
+    elif backend == "database":
+        cache = {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": env.get("CACHE_TABLE", "quickhost_cache"),
+        }
+    else:
+        raise ValueError(f"CACHE_BACKEND desconhecido: {backend}")
+
+    if not is_shared(cache) and worker_count(env) > 1:
+        raise ImproperlyConfigured(
+            "CACHE_BACKEND=locmem não é compartilhado entre os "
+            f"{worker_count(env)} workers (WEB_CONCURRENCY): use redis ou database."
+        )
+    return {"default": cache}
@@ -0,0 +1,145 @@
+"""
+Perfis de banco de dados configurados por variáveis de ambiente.
+
+DB_ENGINE escolhe o backend: `sqlite` (padrão) ou `postgres`.
+
+No SQLite, DB_PROFILE=tuned (padrão) habilita synchronous=NORMAL, busy timeout,
+mmap e cache do SQLite em cada nova conexão, além de conexões persistentes.
+DB_PROFILE=basic mantém a configuração mínima original do SQLite.
+
+O WAL só é ligado com SQLITE_JOURNAL_MODE=WAL: o modo fica gravado no arquivo
+e cria os arquivos -wal e -shm ao lado dele, o que alteraria o db.sqlite3
+versionado no repositório. Ligue-o nos bancos de produção e de benchmark.
+
+DB_REPLICA_PATHS (caminhos separados por vírgula) adiciona réplicas de
+leitura `replica1`, `replica2`, ... usadas pelo PrimaryReplicaRouter.
+
+No PostgreSQL, a conexão vem de POSTGRES_DB/USER/PASSWORD/HOST/PORT e usa o
+pool nativo do Django 5.1 (psycopg_pool), dimensionado por DB_POOL_MIN_SIZE,
+DB_POOL_MAX_SIZE e DB_POOL_TIMEOUT. POSTGRES_REPLICA_HOSTS adiciona réplicas.
+Para rodar os testes no PostgreSQL local (docker-compose.yml):
+
+    docker compose up -d postgres
+    DB_ENGINE=postgres python manage.py test
+"""
+
+import os
+
+
+def env_int(env, name, default):
+    value = env.get(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def env_conn_max_age(env, default):
+    """CONN_MAX_AGE em segundos; "none" mantém a conexão aberta indefinidamente."""
+    value = env.get("DB_CONN_MAX_AGE")
+    if value is None or value == "":
+        return default
+    if value.lower() == "none":
+        return None
+    return int(value)
+
+
+def sqlite_pragmas(env=os.environ):
+    """PRAGMAs aplicados a cada nova conexão SQLite no perfil `tuned`."""
+    return {
+        "journal_mode": env.get("SQLITE_JOURNAL_MODE", "DELETE"),
+        "synchronous": env.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": env_int(env, "SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": env_int(env, "SQLITE_MMAP_SIZE", 128 * 1024 * 1024),
+        # Valores negativos são interpretados pelo SQLite como KiB.
+        "cache_size": env_int(env, "SQLITE_CACHE_SIZE", -32000),
+        "temp_store": env.get("SQLITE_TEMP_STORE", "MEMORY"),
+    }
+
+
+def sqlite_database(name, env=os.environ):
+    """Monta a entrada de DATABASES para um arquivo SQLite."""
+    profile = env.get("DB_PROFILE", "tuned")
+
+    if profile == "basic":
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": name,
+        }
+    if profile != "tuned":
+        raise ValueError(f"DB_PROFILE desconhecido para SQLite: {profile}")
+
+    pragmas = sqlite_pragmas(env)
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "CONN_MAX_AGE": env_conn_max_age(env, 600),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": ";".join(
+                f"PRAGMA {pragma} = {value}" for pragma, value in pragmas.items()
+            ),
+            # Transações de escrita pegam o lock logo no BEGIN, para que
+            # o busy timeout se aplique em vez de falhar no meio da transação.
+            "transaction_mode": env.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+            "timeout": pragmas["busy_timeout"] / 1000,
+        },
+    }
+
+
+def sqlite_replicas(env=os.environ):
+    """Retorna as entradas de DATABASES das réplicas SQLite configuradas."""
+    paths = [path.strip() for path in env.get("DB_REPLICA_PATHS", "").split(",")]
+    replicas = {}
+    for index, path in enumerate(filter(None, paths), start=1):
+        replica = sqlite_database(path, env)
+        replica["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica{index}"] = replica
+    return replicas
+
+
+def postgres_database(env=os.environ, host=None):
+    """Monta a entrada de DATABASES para o PostgreSQL com pool de conexões."""
+    options = {}
+    if env.get("DB_POOL", "1") == "1":
+        options["pool"] = {
+            "min_size": env_int(env, "DB_POOL_MIN_SIZE", 2),
+            "max_size": env_int(env, "DB_POOL_MAX_SIZE", 10),
+            "timeout": env_int(env, "DB_POOL_TIMEOUT", 10),
+        }
+
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("POSTGRES_DB", "quickhost"),
+        "USER": env.get("POSTGRES_USER", "quickhost"),
+        "PASSWORD": env.get("POSTGRES_PASSWORD", ""),
+        "HOST": host or env.get("POSTGRES_HOST", "localhost"),
+        "PORT": env.get("POSTGRES_PORT", "5432"),
+        # O pool substitui as conexões persistentes; o Django exige 0 aqui.
+        "CONN_MAX_AGE": 0 if options else env_conn_max_age(env, 60),
+        "CONN_HEALTH_CHECKS": True,
+        # Desligue atrás de um PgBouncer em modo transaction.
+        "DISABLE_SERVER_SIDE_CURSORS": env.get("DB_DISABLE_SERVER_SIDE_CURSORS") == "1",
+        "OPTIONS": options,
+    }
+
+
+def databases_from_env(sqlite_path, env=os.environ):
+    """Retorna o dicionário DATABASES completo, incluindo as réplicas."""
+    engine = env.get("DB_ENGINE", "sqlite")
+
+    if engine == "sqlite":
+        return {
+            "default": sqlite_database(env.get("SQLITE_PATH", sqlite_path), env),
+            **sqlite_replicas(env),
+        }
+
+    if engine == "postgres":
+        databases = {"default": postgres_database(env)}
+        hosts = env.get("POSTGRES_REPLICA_HOSTS", "").split(",")
+        for index, host in enumerate(filter(None, map(str.strip, hosts)), start=1):
+            replica = postgres_database(env, host=host)
+            replica["TEST"] = {"MIRROR": "default"}
+            databases[f"replica{index}"] = replica
+        return databases
+
+    raise ValueError(f"DB_ENGINE desconhecido: {engine}")
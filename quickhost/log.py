@@ -0,0 +1,163 @@
+"""
+Logging estruturado que não bloqueia a requisição.
+
+O QueueLogHandler só coloca o registro numa fila limitada; a formatação em
+JSON e a escrita no stream acontecem na thread do QueueListener. A mensagem
+(`msg % args`) é montada antes de entrar na fila, na thread de quem chamou o
+logger: os argumentos podem ser instâncias do ORM, e as conexões com o banco
+são locais à thread. Registros de níveis desativados ou descartados pela
+amostragem nunca chegam a ser formatados, por isso o código deve usar o
+estilo `logger.info("... %s", valor)` e não f-strings.
+
+Sob carga (fila acima de SAMPLE_ABOVE da capacidade), apenas 1 em cada
+SAMPLE_RATE registros DEBUG/INFO é mantido. Com a fila cheia, qualquer
+registro é descartado em vez de esperar. Os descartes são contados por nível
+e motivo em `quickhost_log_records_dropped_total`, exposto em `/metrics`.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from quickhost.api import metrics
+
+# Atributos de todo LogRecord; o que sobra veio de `extra=` e vai para o JSON.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "view",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha."""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+        }
+        view = getattr(record, "view", "")
+        if view:
+            data["view"] = view
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Com a fila cheia, put_nowait perderia o sentinela e stop() travaria.
+        self.queue.put(self._sentinel, timeout=5)
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """
+    Envia os registros para uma fila limitada, esvaziada por um
+    QueueListener que escreve em `stream` (stderr por padrão) ou no handler
+    `target`.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        maxsize=10000,
+        sample_above=0.5,
+        sample_rate=10,
+        target=None,
+    ):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target or logging.StreamHandler(stream or sys.stderr)
+        self.maxsize = maxsize
+        self.sample_above = int(maxsize * sample_above)
+        self.sample_rate = sample_rate
+        self.listener = None
+        self.pid = None
+        self.start_lock = threading.Lock()
+        self.dropped = Counter()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def start(self):
+        # O listener é iniciado no primeiro registro, e de novo após um fork:
+        # o processo filho herda a fila, mas não a thread.
+        with self.start_lock:
+            if self.pid == os.getpid():
+                return
+            if self.pid is not None:
+                self.queue = queue.Queue(self.maxsize)
+                self.dropped = Counter()
+            self.listener = _Listener(self.queue, self.target)
+            self.listener.start()
+            self.pid = os.getpid()
+
+    def stop(self):
+        with self.start_lock:
+            if self.pid == os.getpid() and self.listener is not None:
+                self.listener.stop()
+            self.pid = None
+
+    def emit(self, record):
+        try:
+            if self.pid != os.getpid():
+                self.start()
+            if (
+                record.levelno < logging.WARNING
+                and self.queue.qsize() >= self.sample_above
+                and random.randrange(self.sample_rate) != 0
+            ):
+                self.drop(record, "sampled")
+                return
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.drop(record, "full")
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.view = metrics.current_view.get()
+        return record
+
+    def drop(self, record, reason):
+        self.dropped[record.levelname, reason] += 1
+        metrics.record_log_drop(record.levelname, reason)
+
+
+@atexit.register
+def _stop_listeners():
+    for handler in logging._handlerList:
+        handler = handler()
+        if isinstance(handler, QueueLogHandler):
+            handler.stop()
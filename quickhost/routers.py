@@ -0,0 +1,99 @@
+"""
+Roteamento de leituras para réplicas do banco.
+
+Por padrão todas as consultas vão para o banco primário (`default`). Apenas
+views marcadas explicitamente (ReplicaReadMixin nas ViewSets ou o decorator
+`replica_reads`) liberam suas leituras para os aliases em
+settings.DATABASE_REPLICAS. Qualquer escrita fixa o restante da requisição
+no primário, e o ReplicaRoutingMiddleware estende essa fixação às próximas
+requisições do mesmo usuário por meio de uma marca no cache.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+PRIMARY = "default"
+
+
+@dataclass
+class RoutingState:
+    allow_replica: bool = False
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar("quickhost_db_routing", default=None)
+
+
+@contextmanager
+def request_scope(pinned=False):
+    """Cria o estado de roteamento de uma requisição."""
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def allow_replica_reads():
+    """Libera as leituras seguintes da requisição atual para as réplicas."""
+    state = _state.get()
+    if state is not None:
+        state.allow_replica = True
+
+
+def pin_to_primary():
+    """Força as leituras seguintes da requisição atual para o primário."""
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def replica_reads(view):
+    """Decorator para views (síncronas ou assíncronas) que podem ler das réplicas."""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            allow_replica_reads()
+            return await view(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        allow_replica_reads()
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Envia escritas ao primário e leituras liberadas a uma réplica aleatória."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        state = _state.get()
+        if replicas and state and state.allow_replica and not state.pinned:
+            return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -1,6 +1,9 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
+from quickhost.caching import caches_from_env, is_shared
+from quickhost.database import databases_from_env
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = "django-insecure-@$dlqov(s!z$o1t2=!kp7alf6k_c6e8le8silx_n8=jdc8978m"
@@ -18,17 +21,23 @@ INSTALLED_APPS = [
     "data",
 ]
 MIDDLEWARE = [
+    "quickhost.api.instrumentation.QueryInstrumentationMiddleware",
+    "quickhost.api.metrics.MetricsMiddleware",
+    "quickhost.api.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "quickhost.api.middleware.ReplicaRoutingMiddleware",
+    "quickhost.api.middleware.ApiExemptSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "quickhost.api.middleware.ApiExemptCsrfViewMiddleware",
+    "quickhost.api.middleware.ApiExemptAuthenticationMiddleware",
+    "quickhost.api.middleware.ApiExemptMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "quickhost.api.middleware.UUIDMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "quickhost.api.middleware.AsyncWhiteNoiseMiddleware",
 ]
+# Sessão, CSRF, autenticação por sessão e mensagens só valem nestes
+# prefixos; o restante é a API, autenticada por JWT.
+BROWSER_URL_PREFIXES = ("/admin/",)
 ROOT_URLCONF = "quickhost.urls"
 TEMPLATES = [
     {
@@ -46,12 +55,12 @@ TEMPLATES = [
     },
 ]
 WSGI_APPLICATION = "quickhost.wsgi.application"
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+DATABASES = databases_from_env(BASE_DIR / "db.sqlite3")
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["quickhost.routers.PrimaryReplicaRouter"]
+# Compartilhado entre os workers: veja quickhost/caching.py.
+CACHES = caches_from_env()
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -79,6 +88,76 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=10),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+LAST_LOGIN_UPDATE_INTERVAL = timedelta(minutes=15)
+QUOTE_MAX_STAYS = int(os.environ.get("QUOTE_MAX_STAYS", 500))
+QUOTE_MAX_WINDOW_DAYS = int(os.environ.get("QUOTE_MAX_WINDOW_DAYS", 731))
+DAILY_REPORT_MAX_DAYS = int(os.environ.get("DAILY_REPORT_MAX_DAYS", 731))
+FEE_SIMULATION_MAX_PRICES = int(os.environ.get("FEE_SIMULATION_MAX_PRICES", 10000))
+RATE_CALENDAR_CACHE = {
+    "ALIAS": os.environ.get("RATE_CALENDAR_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("RATE_CALENDAR_CACHE_TIMEOUT", 24 * 60 * 60)),
+}
+FAVORITES_CACHE = {
+    "ALIAS": os.environ.get("FAVORITES_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("FAVORITES_CACHE_TIMEOUT", 60 * 60)),
+}
+FAVORITES_BULK_MAX_ITEMS = int(os.environ.get("FAVORITES_BULK_MAX_ITEMS", 500))
+DASHBOARD_CACHE = {
+    "ALIAS": os.environ.get("DASHBOARD_CACHE_ALIAS", "default"),
+    "TIMEOUT": int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", 15 * 60)),
+}
+QUERY_INSTRUMENTATION = {
+    "ENABLED": os.environ.get("QUERY_INSTRUMENTATION_ENABLED", "1") == "1",
+    "HEADERS": os.environ.get("QUERY_INSTRUMENTATION_HEADERS", "1") == "1",
+    "SLOW_REQUEST_MS": float(os.environ.get("SLOW_REQUEST_MS", 500)),
+    "MAX_QUERIES": int(os.environ.get("SLOW_REQUEST_MAX_QUERIES", 50)),
+    "TOP_SHAPES": int(os.environ.get("SLOW_REQUEST_TOP_SHAPES", 5)),
+}
+SLOW_QUERY_LOG = {
+    "ENABLED": os.environ.get("SLOW_QUERY_LOG_ENABLED", "1") == "1",
+    "THRESHOLD_MS": float(os.environ.get("SLOW_QUERY_MS", 100)),
+    "INTERVAL_SECONDS": float(os.environ.get("SLOW_QUERY_INTERVAL_SECONDS", 60)),
+    "PATH": os.environ.get(
+        "SLOW_QUERY_LOG_PATH",
+        os.path.join(tempfile.gettempdir(), "quickhost-slow-queries.jsonl"),
+    ),
+    "MAX_BYTES": int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024)),
+    "BACKUP_COUNT": int(os.environ.get("SLOW_QUERY_LOG_BACKUP_COUNT", 5)),
+    "QUEUE_SIZE": int(os.environ.get("SLOW_QUERY_LOG_QUEUE_SIZE", 1000)),
+}
+METRICS = {
+    "ENABLED": os.environ.get("METRICS_ENABLED", "1") == "1",
+    # Compartilhado pelos workers de uma mesma máquina.
+    "DIRECTORY": os.environ.get(
+        "METRICS_DIR", os.path.join(tempfile.gettempdir(), "quickhost-metrics")
+    ),
+    "FLUSH_SECONDS": float(os.environ.get("METRICS_FLUSH_SECONDS", 5)),
+    # Exigido por `/metrics` fora do DEBUG.
+    "TOKEN": os.environ.get("METRICS_TOKEN", ""),
+}
+PROFILING = {
+    # Valor do cabeçalho X-Profile que libera o perfil; vazio desativa.
+    "TOKEN": os.environ.get("PROFILING_TOKEN", ""),
+    # Perfila 1 em cada N requisições; 0 desativa a amostragem.
+    "SAMPLE_RATE": int(os.environ.get("PROFILING_SAMPLE_RATE", 0)),
+    "DIRECTORY": os.environ.get(
+        "PROFILING_DIR", os.path.join(tempfile.gettempdir(), "quickhost-profiles")
+    ),
+    "MAX_FILES": int(os.environ.get("PROFILING_MAX_FILES", 50)),
+}
+RATE_LIMITS = {
+    "ENABLED": os.environ.get("RATE_LIMIT_ENABLED", "1") == "1",
+    # Com um cache compartilhado, os limites valem para todos os workers.
+    "BACKEND": os.environ.get(
+        "RATE_LIMIT_BACKEND", "cache" if is_shared(CACHES["default"]) else "local"
+    ),
+    "CACHE_ALIAS": os.environ.get("RATE_LIMIT_CACHE_ALIAS", "default"),
+    "SCOPES": {
+        "login": os.environ.get("RATE_LIMIT_LOGIN", "10/min"),
+        "signup": os.environ.get("RATE_LIMIT_SIGNUP", "5/min"),
+        "booking_create": os.environ.get("RATE_LIMIT_BOOKING_CREATE", "30/min"),
+    },
+}
 AUTH_USER_MODEL = "data.UserAccount"
 LANGUAGE_CODE = "pt-br"
 LANGUAGE_CODE = "pt-br"
@@ -88,6 +167,8 @@ STATIC_URL = "/static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 CORS_ALLOW_ALL_ORIGINS = True
+# Os handlers só enfileiram; a escrita acontece na thread do QueueListener
+# (quickhost/log.py). LOG_FORMAT=text volta ao formato legível.
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -96,11 +177,21 @@ LOGGING = {
             "format": "{levelname} {asctime} {module} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "quickhost.log.JsonFormatter",
+        },
     },
     "handlers": {
         "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "()": "quickhost.log.QueueLogHandler",
+            "formatter": (
+                "verbose" if os.environ.get("LOG_FORMAT") == "text" else "json"
+            ),
+            "maxsize": int(os.environ.get("LOG_QUEUE_SIZE", 10000)),
+            # Acima desta fração da fila, só 1 em LOG_SAMPLE_RATE registros
+            # DEBUG/INFO é mantido.
+            "sample_above": float(os.environ.get("LOG_SAMPLE_ABOVE", 0.5)),
+            "sample_rate": int(os.environ.get("LOG_SAMPLE_RATE", 10)),
         },
     },
     "loggers": {
@@ -116,7 +207,7 @@ LOGGING = {
         },
         "my_logger": {
             "handlers": ["console"],
-            "level": "DEBUG",
+            "level": os.environ.get("LOG_LEVEL", "DEBUG"),
             "propagate": False,
         },
     },
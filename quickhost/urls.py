@@ -4,11 +4,15 @@ from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenRefreshView
+from quickhost.api import async_views, metrics
 from quickhost.api.viewsets import (
     AccommodationViewSet,
     UserViewSet,
     CustomTokenObtainPairView,
     GetByUuidView,
+    QuoteView,
+    FeeSimulationView,
+    DailyReportView,
     ReviewViewSet,
     BookingViewSet,
     FavoritePropertyViewSet,
@@ -49,6 +53,29 @@ urlpatterns = [
         name="create_accommodation",
     ),
     path("details/", GetByUuidView.as_view(), name="details"),
+    path("quotes/", QuoteView.as_view(), name="quotes"),
+    path("metrics", metrics.metrics_view, name="metrics"),
+    path("reports/daily/", DailyReportView.as_view(), name="daily-report"),
+    path(
+        "pricing/simulate/", FeeSimulationView.as_view(), name="pricing-simulate"
+    ),
+    path(
+        "async/accommodations/",
+        async_views.accommodation_list,
+        name="async-accommodation-list",
+    ),
+    path(
+        "async/accommodations/search/",
+        async_views.accommodation_search,
+        name="async-accommodation-search",
+    ),
+    path(
+        "async/accommodations/<uuid:id_accommodation>/",
+        async_views.accommodation_detail,
+        name="async-accommodation-detail",
+    ),
+    path("async/reviews/", async_views.review_list, name="async-review-list"),
+    path("async/details/", async_views.details, name="async-details"),
     path(
         "reviews/",
         ReviewViewSet.as_view({"get": "list", "post": "create"}),